@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import logging
+import argparse
+import tempfile
+from knowledge_graph.crawler.archive import PageArchive
+from knowledge_graph.crawler.replay import ReplayServer
+from knowledge_graph.crawler.spider import KnowledgeGraphCrawler
+from knowledge_graph.crawler.throttle import AdaptiveRateLimiter
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+KEYWORD = '知识图谱'
+
+
+def build_synthetic_archive(archive_dir, pages=40):
+    """构造一个互相链接的百度百科/维基百科/CSDN示例站点并写入归档，在没有真实归档时使用
+
+    Args:
+        archive_dir: 归档目录
+        pages: 每个站点的页面数
+    """
+    archive = PageArchive(archive_dir)
+    content_type = 'text/html; charset=utf-8'
+    names = [KEYWORD] + [f"{KEYWORD}概念{i}" for i in range(1, pages)]
+
+    for i, name in enumerate(names):
+        links = ''.join(f'<a href="/item/{names[(i + k) % pages]}">{names[(i + k) % pages]}</a>' for k in range(1, 6))
+        body = (f'<html><body><h1>{name}</h1><div class="lemma-summary">{name}是知识图谱领域的概念。</div>'
+                f'<div class="main-content"><p>{name}与实体识别、关系抽取、知识推理密切相关。{links}</p>'
+                f'{"<p>知识图谱以三元组表示知识。</p>" * 50}</div></body></html>')
+        archive.put(f"https://baike.baidu.com/item/{name}", body.encode('utf-8'), 200, content_type, 'utf-8')
+
+        links = ''.join(f'<a href="/wiki/{names[(i + k) % pages]}">{names[(i + k) % pages]}</a>' for k in range(1, 6))
+        body = (f'<html><body><h1 id="firstHeading">{name}</h1><div id="mw-content-text">'
+                f'<p>{name}是语义网和知识表示中的概念。{links}</p>{"<p>知识库与本体论。</p>" * 50}</div></body></html>')
+        archive.put(f"https://zh.wikipedia.org/wiki/{name}", body.encode('utf-8'), 200, content_type, 'utf-8')
+
+    blog_urls = [f"https://blog.csdn.net/kg/article/details/{i}" for i in range(pages)]
+    items = ''.join(f'<div class="blog-list-box"><a class="blog-title" href="{url}">博客{i}</a></div>'
+                    for i, url in enumerate(blog_urls))
+    archive.put(f"https://so.csdn.net/so/search/s.do?q={KEYWORD}&t=blog",
+                f'<html><body>{items}</body></html>'.encode('utf-8'), 200, content_type, 'utf-8')
+    for i, url in enumerate(blog_urls):
+        body = (f'<html><body><h1 class="title-article">知识图谱实践{i}</h1><a class="follow-nickName">作者{i}</a>'
+                f'<div id="article_content">{"<p>使用图数据库存储知识图谱。</p>" * 80}</div></body></html>')
+        archive.put(url, body.encode('utf-8'), 200, content_type, 'utf-8')
+
+
+def run_mode(replay_url, concurrent, max_pages, rate):
+    """在指定模式下运行一次抓取
+
+    Returns:
+        (抓取页面数, 耗时秒数)
+    """
+    output_dir = tempfile.mkdtemp(prefix='bench_crawler_')
+    crawler = KnowledgeGraphCrawler(output_dir=output_dir, use_agent=0, concurrent=concurrent,
+                                    use_cache=0, use_archive=0, replay_url=replay_url)
+    # 回放服务器没有真实站点的负载限制，统一使用 rate 次/秒 的主机速率，使结果只反映爬虫自身的调度效率
+    crawler.throttle = AdaptiveRateLimiter(default_interval=1.0 / rate, max_rate=rate,
+                                           robots_fetcher=crawler._fetch_robots)
+    tasks = [
+        (crawler.iter_baidu_baike, {'keyword': KEYWORD, 'max_pages': max_pages}, 'baidu_kg_data.jsonl'),
+        (crawler.iter_wikipedia, {'keyword': KEYWORD, 'max_pages': max_pages}, 'wiki_kg_data.jsonl'),
+        (crawler.iter_csdn_blogs, {'keyword': KEYWORD, 'max_pages': max_pages}, 'csdn_kg_data.jsonl')
+    ]
+
+    start_time = time.perf_counter()
+    if concurrent:
+        pages = sum(crawler.crawl_concurrent(tasks).values())
+    else:
+        pages = sum(crawler._run_task(*task) for task in tasks)
+    elapsed = time.perf_counter() - start_time
+    crawler.sessions.close()
+    return pages, elapsed
+
+
+def main():
+    """使用回放服务器对爬虫的顺序模式和并发模式测速（页面/秒）"""
+    parser = argparse.ArgumentParser(description='爬虫吞吐量基准测试（基于归档回放）')
+    parser.add_argument('--archive-dir', default=None, help='原始页面归档目录，默认构造示例站点')
+    parser.add_argument('--max-pages', type=int, default=20, help='每个抓取任务的最大页面数')
+    parser.add_argument('--latency', type=float, default=0.05, help='回放服务器的固定延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.02, help='回放服务器的随机延迟（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='回放服务器注入错误响应的概率')
+    parser.add_argument('--rate', type=float, default=20.0, help='每个主机的最高请求速率（次/秒）')
+    parser.add_argument('--seed', type=int, default=42, help='随机数种子')
+    args = parser.parse_args()
+
+    archive_dir = args.archive_dir
+    if archive_dir is None or not os.path.exists(os.path.join(archive_dir, 'index.jsonl')):
+        archive_dir = tempfile.mkdtemp(prefix='bench_archive_')
+        logger.info(f"使用构造的示例站点: {archive_dir}")
+        build_synthetic_archive(archive_dir)
+
+    results = {}
+    for mode, concurrent in (('sequential', 0), ('concurrent', 1)):
+        # 每种模式使用相同种子的新服务器，保证注入的延迟和错误序列一致
+        with ReplayServer(archive_dir, latency=args.latency, jitter=args.jitter,
+                          error_rate=args.error_rate, seed=args.seed) as server:
+            pages, elapsed = run_mode(server.url, concurrent, args.max_pages, args.rate)
+        results[mode] = pages / elapsed if elapsed > 0 else 0.0
+        logger.info(f"{mode}: {pages} 页，耗时 {elapsed:.2f} 秒，{results[mode]:.2f} 页/秒")
+
+    if results.get('sequential'):
+        logger.info(f"并发模式相对顺序模式加速 {results['concurrent'] / results['sequential']:.2f} 倍")
+
+if __name__ == "__main__":
+    main()
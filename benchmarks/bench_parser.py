@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+import logging
+import argparse
+from knowledge_graph.crawler.archive import PageArchive
+from knowledge_graph.crawler.extractors import get_backend
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def synthetic_pages(count=50):
+    """构造结构与百度百科/维基百科/CSDN相近的页面，在没有归档时使用
+
+    Returns:
+        (URL, HTML文本) 列表
+    """
+    paragraphs = ''.join(
+        f'<p>知识图谱是一种用图结构表示实体及其关系的知识库，第{i}段介绍了'
+        f'<a href="/item/实体{i}">实体{i}</a>与<a href="/item/关系抽取">关系抽取</a>等技术。</p>'
+        for i in range(40)
+    )
+    wiki_paragraphs = ''.join(
+        f'<p>第{i}段：<a href="/wiki/知识库">知识库</a>、<a href="/wiki/File:KG.png">图</a>和'
+        f'<a href="/wiki/语义网络_{i}">语义网络</a>。<script>var x = {i};</script></p>'
+        for i in range(40)
+    )
+    baidu = (
+        '<html><head><title>知识图谱</title><style>p {color: red}</style></head><body>'
+        '<h1>知识图谱</h1><div class="lemma-summary">知识图谱（Knowledge Graph）是结构化的语义知识库。</div>'
+        '<div class="basic-info"><dl><dt class="basicInfo-item name">中文名</dt>'
+        '<dd class="basicInfo-item value">知识图谱</dd><dt class="basicInfo-item name">外文名</dt>'
+        '<dd class="basicInfo-item value">Knowledge Graph</dd></dl></div>'
+        '<div class="lemmaWgt-lemmaCatalog"><a>定义</a><a>发展历史</a></div>'
+        '<ul class="polysemantList-wrapper"><li><a>知识图谱（图书）</a></li></ul>'
+        f'<div class="main-content">{paragraphs}</div>'
+        '<div><span>相关术语</span><a href="/item/本体">本体</a></div>'
+        '<dl class="lemma-reference"><li>参考资料一</li><li>参考资料二</li></dl>'
+        '</body></html>'
+    )
+    wiki = (
+        '<html><body><h1 id="firstHeading">知识图谱</h1>'
+        '<table class="infobox vcard"><tr><th>类型</th><td>知识库</td></tr></table>'
+        f'<div id="mw-content-text"><p class="mw-empty-elt"></p>{wiki_paragraphs}</div>'
+        '<a href="/wiki/Category:知识表示">知识表示</a><a href="/wiki/Category:语义网">语义网</a>'
+        '</body></html>'
+    )
+    csdn = (
+        '<html><body><h1 class="title-article">知识图谱入门</h1>'
+        '<a class="follow-nickName">作者</a><span class="time">2024-01-01</span>'
+        f'<div id="article_content">{paragraphs}</div>'
+        '<a class="tag-link">知识图谱</a><a class="tag-link">NLP</a></body></html>'
+    )
+    pages = []
+    for i in range(count):
+        pages.append((f'https://baike.baidu.com/item/知识图谱{i}', baidu))
+        pages.append((f'https://zh.wikipedia.org/wiki/知识图谱{i}', wiki))
+        pages.append((f'https://blog.csdn.net/u/article/details/{i}', csdn))
+    return pages
+
+
+def archived_pages(archive_dir, limit=None):
+    """从原始页面归档读取页面
+
+    Returns:
+        (URL, HTML文本) 列表
+    """
+    archive = PageArchive(archive_dir)
+    pages = []
+    for record in archive.load_index().values():
+        if record.get('status') != 200:
+            continue
+        body = archive.read_body(record['digest'])
+        pages.append((record['url'], body.decode(record.get('encoding') or 'utf-8', errors='replace')))
+        if limit and len(pages) >= limit:
+            break
+    return pages
+
+
+def run_backend(name, pages, repeat):
+    """用指定解析后端解析并抽取全部页面
+
+    Returns:
+        (平均每页CPU耗时（毫秒）, (URL, 抽取结果) 列表)
+    """
+    backend = get_backend(name)
+    results = []
+    start = time.process_time()
+    for _ in range(repeat):
+        results = []
+        for url, html in pages:
+            source, extractor = backend.extractor_for_url(url)
+            if extractor is None:
+                continue
+            doc = backend.parse(html)
+            if source == 'baidu_baike':
+                results.append((url, backend.extract_baidu_baike(doc, url)))
+            elif source == 'wikipedia':
+                results.append((url, backend.extract_wikipedia(doc, url)))
+            else:
+                results.append((url, extractor(doc, url)))
+    elapsed = time.process_time() - start
+    return elapsed * 1000 / (repeat * max(1, len(pages))), results
+
+
+def main():
+    """对比BeautifulSoup与lxml/XPath两种解析后端的单页CPU耗时，并校验抽取结果一致"""
+    parser = argparse.ArgumentParser(description='HTML解析后端性能对比')
+    parser.add_argument('--archive-dir', default='knowledge_graph/data/archive', help='原始页面归档目录')
+    parser.add_argument('--limit', type=int, default=200, help='最多使用的归档页面数')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数')
+    args = parser.parse_args()
+
+    pages = archived_pages(args.archive_dir, args.limit)
+    if not pages:
+        logger.info("归档中没有页面，使用构造的示例页面")
+        pages = synthetic_pages()
+    logger.info(f"测试页面数: {len(pages)}，重复 {args.repeat} 次")
+
+    timings = {}
+    outputs = {}
+    for name in ('bs4', 'lxml'):
+        timings[name], outputs[name] = run_backend(name, pages, args.repeat)
+        logger.info(f"{name}: 每页 {timings[name]:.2f} ms CPU")
+
+    mismatches = [url for (url, a), (_, b) in zip(outputs['bs4'], outputs['lxml']) if a != b]
+    if mismatches:
+        logger.warning(f"两种后端的抽取结果不一致: {len(mismatches)} 页，例如 {mismatches[:3]}")
+    else:
+        logger.info("两种后端的抽取结果（字段与候选链接）完全一致")
+    logger.info(f"lxml 相对 bs4 加速 {timings['bs4'] / max(timings['lxml'], 1e-9):.2f} 倍")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import re
+import time
+import logging
+import argparse
+from knowledge_graph.processor.processor import KnowledgeProcessor
+from knowledge_graph.processor.relation_engine import RELATION_PATTERNS, RelationPatternEngine
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def reference_check_relation_pattern(sentence, entity1, relation, entity2):
+    """原有的关系模式检查（KnowledgeProcessor.check_relation_pattern）"""
+    pos1 = sentence.find(entity1)
+    pos2 = sentence.find(entity2)
+    if pos1 == -1 or pos2 == -1:
+        return False
+    rel_pos = sentence.find(relation, pos1 + len(entity1))
+    if rel_pos == -1 or rel_pos > pos2:
+        return False
+    if pos2 - (rel_pos + len(relation)) > 20:
+        return False
+    return True
+
+
+def reference_extract(text, entities, relation_patterns=RELATION_PATTERNS):
+    """原有的逐模式切分句子、逐实体对查找的实现，作为正确性和性能的基准"""
+    relations = []
+    entity_texts = [e['text'] for e in entities]
+    for pattern in relation_patterns:
+        sentences = re.split(r'[。！？.!?]', text)
+        for sentence in sentences:
+            if pattern['pattern'] in sentence:
+                for entity1 in entity_texts:
+                    if entity1 in sentence:
+                        for entity2 in entity_texts:
+                            if entity1 != entity2 and entity2 in sentence:
+                                if reference_check_relation_pattern(sentence, entity1, pattern['pattern'], entity2):
+                                    relations.append({
+                                        'subject': entity1,
+                                        'predicate': pattern['relation'],
+                                        'object': entity2,
+                                        'sentence': sentence.strip(),
+                                        'confidence': 0.8,
+                                        'method': 'pattern'
+                                    })
+    return relations
+
+
+def load_documents(processor, limit):
+    """按 process_file 的方式读取并拼接数据目录中的文档文本"""
+    texts = []
+    for filename in processor.list_data_files():
+        # 只读取爬虫输出的数据文件，跳过实体、关系等处理结果
+        if not any(source in filename for source in ('baidu', 'wiki', 'csdn', 'agent')):
+            continue
+        for item in processor.load_data(filename):
+            summary = processor.clean_text(item.get('summary', ''))
+            content = processor.clean_text(item.get('content', ''))
+            text = f"{item.get('title', '')}. {summary} {content}"
+            if text.strip('. '):
+                texts.append(text)
+            if len(texts) >= limit:
+                return texts
+    return texts
+
+
+def synthetic_documents(count=20):
+    """构造包含大量实体和关系词的长文档，在数据目录为空时使用"""
+    terms = ['知识图谱', '实体识别', '关系抽取', '知识推理', '图数据库', '本体论', '语义网', '知识库',
+             '三元组', '自然语言处理', '机器学习', '深度学习', '神经网络', '信息抽取', '知识融合']
+    cues = [p['pattern'] for p in RELATION_PATTERNS]
+    texts = []
+    for d in range(count):
+        sentences = []
+        for i in range(300):
+            a, b, c = terms[(d + i) % len(terms)], terms[(d + 3 * i + 1) % len(terms)], terms[(i * 7 + 2) % len(terms)]
+            cue = cues[(d + i) % len(cues)]
+            sentences.append(f"{a}{cue}{b}的重要组成部分，并且{c}{cues[i % len(cues)]}{a}")
+        texts.append('。'.join(sentences) + '。')
+    return texts
+
+
+def timed(func, texts, entities_list, repeat):
+    """重复运行抽取函数
+
+    Returns:
+        (平均每文档耗时（毫秒）, 抽取结果列表)
+    """
+    results = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [func(text, entities) for text, entities in zip(texts, entities_list)]
+    elapsed = time.perf_counter() - start
+    return elapsed * 1000 / (repeat * max(1, len(texts))), results
+
+
+def main():
+    """对比原有实现与线性时间引擎的模式关系抽取耗时，并校验结果完全一致"""
+    parser = argparse.ArgumentParser(description='模式关系抽取性能对比')
+    parser.add_argument('--input-dir', default='knowledge_graph/data', help='爬虫数据目录')
+    parser.add_argument('--limit', type=int, default=200, help='最多使用的文档数')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数')
+    args = parser.parse_args()
+
+    processor = KnowledgeProcessor(input_dir=args.input_dir, output_dir=args.input_dir, use_openai=False)
+    texts = load_documents(processor, args.limit)
+    if not texts:
+        logger.info("数据目录中没有文档，使用构造的示例文档")
+        texts = synthetic_documents()
+    entities_list = processor.extract_entities_batch(texts)
+    logger.info(f"测试文档数: {len(texts)}，平均实体数: "
+                f"{sum(map(len, entities_list)) / len(texts):.1f}，重复 {args.repeat} 次")
+
+    engine = RelationPatternEngine(RELATION_PATTERNS)
+    timings = {}
+    outputs = {}
+    for name, func in (('reference', reference_extract), ('engine', engine.extract)):
+        timings[name], outputs[name] = timed(func, texts, entities_list, args.repeat)
+        logger.info(f"{name}: 每文档 {timings[name]:.2f} ms，关系数 {sum(map(len, outputs[name]))}")
+
+    mismatches = [i for i, (a, b) in enumerate(zip(outputs['reference'], outputs['engine'])) if a != b]
+    if mismatches:
+        logger.warning(f"两种实现的抽取结果不一致: {len(mismatches)} 个文档，例如 {mismatches[:3]}")
+    else:
+        logger.info("两种实现的抽取结果（内容与顺序）完全一致")
+    logger.info(f"引擎相对原有实现加速 {timings['reference'] / max(timings['engine'], 1e-9):.2f} 倍")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import os
+import logging
+from knowledge_graph.crawler.urls import canonicalize_url
+from knowledge_graph.utils.jsonl import JsonlSink, iter_jsonl
+
+logger = logging.getLogger(__name__)
+
+
+class AgentResultStore:
+    """Agent抓取结果的持久化存储
+
+    结果逐条追加写入JSONL文件，按规范化URL去重；程序重启后从文件恢复，
+    已有的结果在之后的运行中直接复用，不再交给Agent重新抓取。
+    """
+
+    def __init__(self, filepath):
+        """初始化存储
+
+        Args:
+            filepath: JSONL文件路径
+        """
+        self.filepath = filepath
+        self._records = {}
+        if os.path.exists(filepath):
+            for record in iter_jsonl(filepath):
+                url = record.get('url')
+                if url:
+                    self._records[canonicalize_url(url)] = record
+            logger.info(f"已加载 {len(self._records)} 条Agent抓取结果: {filepath}")
+        self._sink = None
+
+    def __contains__(self, url):
+        return canonicalize_url(url) in self._records
+
+    def __len__(self):
+        return len(self._records)
+
+    def add(self, record):
+        """保存一条结果
+
+        Args:
+            record: 结果字典，必须包含url字段
+
+        Returns:
+            是否为新结果（URL已存在或缺失时返回False）
+        """
+        url = record.get('url')
+        if not url:
+            return False
+        key = canonicalize_url(url)
+        if key in self._records:
+            return False
+        if self._sink is None:
+            self._sink = JsonlSink(self.filepath, append=True)
+        self._sink.write(record)
+        self._records[key] = record
+        return True
+
+    def records(self, topic=None):
+        """返回已保存的结果
+
+        Args:
+            topic: 只返回该主题下抓取的结果，默认返回全部
+
+        Returns:
+            结果字典列表
+        """
+        return [r for r in self._records.values() if topic is None or r.get('topic') == topic]
+
+    def urls(self):
+        """返回已保存结果的URL列表"""
+        return [r['url'] for r in self._records.values()]
+
+    def close(self):
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
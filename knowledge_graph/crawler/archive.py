@@ -0,0 +1,111 @@
+import os
+import gzip
+import json
+import time
+import hashlib
+import logging
+import threading
+from knowledge_graph.crawler.urls import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+
+class PageArchive:
+    """原始响应归档（类似WARC）
+
+    响应正文按内容的SHA-256寻址，gzip压缩后存放在 objects/ 目录下，相同内容只存一份；
+    index.jsonl 逐行记录每次抓取的URL、摘要、状态码、编码和抓取时间。
+    """
+
+    def __init__(self, archive_dir):
+        """初始化归档
+
+        Args:
+            archive_dir: 归档目录
+        """
+        self.archive_dir = archive_dir
+        self.objects_dir = os.path.join(archive_dir, 'objects')
+        self.index_path = os.path.join(archive_dir, 'index.jsonl')
+        self._lock = threading.Lock()
+
+        if not os.path.exists(self.objects_dir):
+            os.makedirs(self.objects_dir)
+
+    def object_path(self, digest):
+        """返回内容摘要对应的对象文件路径"""
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.gz")
+
+    def put(self, url, body, status=200, content_type='', encoding=None):
+        """归档一次响应
+
+        Args:
+            url: 页面URL
+            body: 原始响应字节
+            status: HTTP状态码
+            content_type: 响应的Content-Type
+            encoding: 解码正文使用的编码
+
+        Returns:
+            正文的SHA-256摘要
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        path = self.object_path(digest)
+        record = {
+            'url': url,
+            'canonical_url': canonicalize_url(url),
+            'digest': digest,
+            'status': status,
+            'content_type': content_type,
+            'encoding': encoding,
+            'size': len(body),
+            'fetched_at': time.time()
+        }
+
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                with gzip.open(tmp_path, 'wb') as f:
+                    f.write(body)
+                os.replace(tmp_path, path)
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+        return digest
+
+    def read_body(self, digest):
+        """读取并解压归档的正文字节"""
+        with gzip.open(self.object_path(digest), 'rb') as f:
+            return f.read()
+
+    def load_index(self):
+        """读取索引，每个规范化URL只保留最近一次抓取的记录
+
+        Returns:
+            规范化URL到索引记录的字典
+        """
+        latest = {}
+        if not os.path.exists(self.index_path):
+            return latest
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                latest[record['canonical_url']] = record
+        return latest
+
+    def get(self, url):
+        """按URL读取最近一次归档的响应
+
+        Returns:
+            (索引记录, 正文字节)，未归档时返回None
+        """
+        record = self.load_index().get(canonicalize_url(url))
+        if record is None:
+            return None
+        return record, self.read_body(record['digest'])
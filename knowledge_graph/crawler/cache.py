@@ -0,0 +1,187 @@
+import os
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from knowledge_graph.crawler.urls import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """磁盘HTTP响应缓存
+
+    以规范化URL为键，页面正文保存为文件，ETag/Last-Modified等元数据保存在SQLite索引中。
+    缓存总大小超过上限时按最近访问时间淘汰（LRU），总大小在内存中累计，写入时不必扫描索引。
+    命中率由调用方通过 record() 统计：条目被实际使用（新鲜缓存或304）才算命中，
+    条件请求返回200和新正文时算未命中。
+    """
+
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024):
+        """初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存正文的总大小上限（字节）
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+        self.conn = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite'), check_same_thread=False)
+        self.conn.execute('''
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            url TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            size INTEGER,
+            fetched_at REAL,
+            accessed_at REAL
+        )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_accessed ON responses (accessed_at)')
+        self.conn.commit()
+        self.total_bytes = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    @staticmethod
+    def make_key(url):
+        """由URL生成缓存键"""
+        return hashlib.sha1(canonicalize_url(url).encode('utf-8')).hexdigest()
+
+    def _body_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.html")
+
+    def get(self, url):
+        """读取缓存
+
+        Args:
+            url: 页面URL
+
+        Returns:
+            包含 url/text/etag/last_modified 的字典，未命中时返回None
+        """
+        key = self.make_key(url)
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT url, etag, last_modified, size FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            try:
+                with open(self._body_path(key), 'r', encoding='utf-8') as f:
+                    text = f.read()
+            except OSError:
+                # 正文文件丢失，删除失效的索引记录
+                self.conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self.conn.commit()
+                self.total_bytes -= row[3]
+                return None
+
+            self.conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (time.time(), key))
+            self.conn.commit()
+
+        return {
+            'url': row[0],
+            'text': text,
+            'etag': row[1],
+            'last_modified': row[2]
+        }
+
+    def record(self, hit):
+        """记录一次缓存查询的结果
+
+        Args:
+            hit: 缓存条目是否被实际使用（新鲜缓存或304未修改）
+        """
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def put(self, url, text, etag=None, last_modified=None):
+        """写入缓存
+
+        Args:
+            url: 页面URL
+            text: 解码后的页面正文
+            etag: 响应的ETag头
+            last_modified: 响应的Last-Modified头
+        """
+        key = self.make_key(url)
+        body = text.encode('utf-8')
+        body_path = self._body_path(key)
+        now = time.time()
+
+        with self._lock:
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            with open(body_path, 'wb') as f:
+                f.write(body)
+
+            old = self.conn.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            self.total_bytes += len(body) - (old[0] if old else 0)
+            self.conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, canonicalize_url(url), etag, last_modified, len(body), now, now)
+            )
+            self.conn.commit()
+            self._evict()
+
+    @staticmethod
+    def conditional_headers(entry):
+        """根据缓存条目生成条件请求头
+
+        Args:
+            entry: get() 返回的缓存条目
+
+        Returns:
+            请求头字典
+        """
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def _evict(self):
+        """淘汰最久未访问的条目，直到总大小不超过上限（调用方需持有锁）"""
+        if self.total_bytes <= self.max_bytes:
+            return
+
+        evicted = 0
+        for key, size in self.conn.execute(
+            'SELECT key, size FROM responses ORDER BY accessed_at ASC'
+        ).fetchall():
+            if self.total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(self._body_path(key))
+            except OSError:
+                pass
+            self.conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self.total_bytes -= size
+            evicted += 1
+
+        self.conn.commit()
+        logger.info(f"HTTP缓存超出上限，已淘汰 {evicted} 个条目")
+
+    def stats(self):
+        """返回缓存统计信息"""
+        with self._lock:
+            count = self.conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            return {'entries': count, 'bytes': self.total_bytes, 'hits': self.hits, 'misses': self.misses}
+
+    def close(self):
+        """关闭索引数据库"""
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,303 @@
+import re
+import importlib
+from urllib.parse import urlparse
+from bs4 import BeautifulSoup
+
+# 页面字段抽取规则（BeautifulSoup实现），与抓取过程分离，既用于在线抓取，也用于从归档离线重新抽取。
+# lxml_extractors 提供相同接口的lxml/XPath实现。
+
+# 可选的HTML解析后端，名称到实现模块的映射
+PARSER_BACKENDS = {
+    'bs4': 'knowledge_graph.crawler.extractors',
+    'lxml': 'knowledge_graph.crawler.lxml_extractors'
+}
+
+
+def parse(html):
+    """将HTML文本解析为BeautifulSoup对象"""
+    return BeautifulSoup(html, 'lxml')
+
+
+def link_candidates(links):
+    """将链接元素转换为 (href, 锚文本, 上下文) 列表，上下文为链接所在父元素的文本
+
+    Args:
+        links: 链接元素列表
+
+    Returns:
+        候选链接列表
+    """
+    candidates = []
+    context_cache = {}
+    for link in links:
+        href = link.get('href')
+        if not href:
+            continue
+        parent = link.parent
+        if parent is None:
+            context = ''
+        else:
+            if id(parent) not in context_cache:
+                context_cache[id(parent)] = parent.get_text(' ', strip=True)[:200]
+            context = context_cache[id(parent)]
+        candidates.append((href, link.get_text().strip(), context))
+    return candidates
+
+
+def extract_baidu_baike(soup, url):
+    """从百度百科页面中抽取字段
+
+    Args:
+        soup: 页面的BeautifulSoup对象
+        url: 页面URL
+
+    Returns:
+        (页面数据字典, 相关链接列表)，链接为 (href, 锚文本, 上下文)
+    """
+    # 获取标题
+    title = soup.find('h1').get_text().strip() if soup.find('h1') else "Unknown Title"
+
+    # 获取摘要
+    summary_elem = soup.find('div', class_='lemma-summary')
+    summary = summary_elem.get_text().strip() if summary_elem else ""
+
+    # 获取正文内容
+    content_elem = soup.find('div', class_='main-content')
+    content = content_elem.get_text().strip() if content_elem else ""
+
+    # 获取基本信息表
+    info_box = {}
+    info_elem = soup.find('div', class_='basic-info')
+    if info_elem:
+        dt_elems = info_elem.find_all('dt', class_='basicInfo-item name')
+        dd_elems = info_elem.find_all('dd', class_='basicInfo-item value')
+
+        for dt, dd in zip(dt_elems, dd_elems):
+            key = dt.get_text().strip()
+            value = dd.get_text().strip()
+            info_box[key] = value
+
+    # 获取分类信息
+    categories = []
+    category_elem = soup.find('div', class_='lemmaWgt-lemmaCatalog')
+    if category_elem:
+        category_links = category_elem.find_all('a')
+        for link in category_links:
+            categories.append(link.get_text().strip())
+
+    # 获取同义词和相关术语
+    synonyms = []
+    polysemant_elem = soup.find('ul', class_='polysemantList-wrapper')
+    if polysemant_elem:
+        synonym_links = polysemant_elem.find_all('a')
+        for link in synonym_links:
+            synonyms.append(link.get_text().strip())
+
+    # 获取参考资料和引用
+    references = []
+    reference_elem = soup.find('dl', class_='lemma-reference')
+    if reference_elem:
+        ref_items = reference_elem.find_all('li')
+        for item in ref_items:
+            ref_text = item.get_text().strip()
+            references.append(ref_text)
+
+    # 存储数据
+    page_data = {
+        'title': title,
+        'url': url,
+        'summary': summary,
+        'content': content,
+        'info_box': info_box,
+        'categories': categories,
+        'synonyms': synonyms,
+        'references': references,
+        'source': 'baidu_baike'
+    }
+
+    # 获取相关链接
+    related_links = []
+
+    # 获取正文中的链接
+    if content_elem:
+        content_links = content_elem.find_all('a', href=re.compile('^/item/'))
+        related_links.extend(content_links)
+
+    # 获取"参见"部分的链接
+    see_also_elem = soup.find('span', string=re.compile('参见|参考|相关|另见'))
+    if see_also_elem and see_also_elem.parent:
+        see_also_links = see_also_elem.parent.find_all('a', href=re.compile('^/item/'))
+        related_links.extend(see_also_links)
+
+    # 获取底部相关链接
+    bottom_related = soup.find('div', class_='lemma-reference')
+    if bottom_related:
+        bottom_links = bottom_related.find_all('a', href=re.compile('^/item/'))
+        related_links.extend(bottom_links)
+
+    return page_data, link_candidates(related_links)
+
+
+def extract_wikipedia(soup, url):
+    """从维基百科页面中抽取字段
+
+    Args:
+        soup: 页面的BeautifulSoup对象
+        url: 页面URL
+
+    Returns:
+        (页面数据字典, 相关链接列表)，链接为 (href, 锚文本, 上下文)
+    """
+    # 获取标题
+    title = soup.find('h1', id='firstHeading').get_text().strip() if soup.find('h1', id='firstHeading') else "Unknown Title"
+
+    # 获取摘要
+    summary = ""
+    content_div = soup.find('div', id='mw-content-text')
+    if content_div:
+        first_p = content_div.find('p', class_=None)
+        if first_p:
+            summary = first_p.get_text().strip()
+
+    # 获取正文内容
+    content = ""
+    if content_div:
+        paragraphs = content_div.find_all('p')
+        content = "\n".join([p.get_text().strip() for p in paragraphs])
+
+    # 获取信息框
+    info_box = {}
+    infobox = soup.find('table', class_='infobox')
+    if infobox:
+        rows = infobox.find_all('tr')
+        for row in rows:
+            header = row.find('th')
+            data = row.find('td')
+            if header and data:
+                key = header.get_text().strip()
+                value = data.get_text().strip()
+                info_box[key] = value
+
+    # 获取分类
+    categories = []
+    category_links = soup.find_all('a', href=re.compile('^/wiki/Category:'))
+    for link in category_links:
+        categories.append(link.get_text().strip())
+
+    # 存储数据
+    page_data = {
+        'title': title,
+        'url': url,
+        'summary': summary,
+        'content': content,
+        'info_box': info_box,
+        'categories': categories,
+        'source': 'wikipedia'
+    }
+
+    # 获取相关链接
+    content_links = []
+    if content_div:
+        content_links = content_div.find_all('a', href=re.compile('^/wiki/(?!File:|Wikipedia:|Help:|Special:|Talk:)'))
+
+    return page_data, link_candidates(content_links)
+
+
+def extract_csdn_search(soup):
+    """从CSDN搜索结果页中抽取博客链接
+
+    Args:
+        soup: 搜索结果页的BeautifulSoup对象
+
+    Returns:
+        博客URL列表
+    """
+    blog_links = []
+    article_items = soup.find_all('div', class_='blog-list-box')
+    for item in article_items:
+        link_elem = item.find('a', class_='blog-title')
+        if link_elem and link_elem.get('href'):
+            blog_links.append(link_elem.get('href'))
+    return blog_links
+
+
+def extract_csdn_blog(soup, url):
+    """从CSDN博客文章页中抽取字段
+
+    Args:
+        soup: 页面的BeautifulSoup对象
+        url: 页面URL
+
+    Returns:
+        博客数据字典
+    """
+    # 获取标题
+    title = soup.find('h1', class_='title-article').get_text().strip() if soup.find('h1', class_='title-article') else "Unknown Title"
+
+    # 获取作者
+    author = ""
+    author_elem = soup.find('a', class_='follow-nickName')
+    if author_elem:
+        author = author_elem.get_text().strip()
+
+    # 获取发布时间
+    publish_time = ""
+    time_elem = soup.find('span', class_='time')
+    if time_elem:
+        publish_time = time_elem.get_text().strip()
+
+    # 获取正文内容
+    content = ""
+    content_elem = soup.find('div', id='article_content')
+    if content_elem:
+        content = content_elem.get_text().strip()
+
+    # 获取标签
+    tags = []
+    tag_elems = soup.find_all('a', class_='tag-link')
+    for tag in tag_elems:
+        tags.append(tag.get_text().strip())
+
+    # 存储数据
+    return {
+        'title': title,
+        'url': url,
+        'author': author,
+        'publish_time': publish_time,
+        'content': content,
+        'tags': tags,
+        'source': 'csdn_blog'
+    }
+
+
+def extractor_for_url(url):
+    """根据URL所在站点选择页面抽取函数
+
+    Args:
+        url: 页面URL
+
+    Returns:
+        (数据源名称, 抽取函数)，不支持的页面（如搜索结果页）返回 (None, None)
+    """
+    host = urlparse(url).netloc
+    if host.endswith('baike.baidu.com'):
+        return 'baidu_baike', lambda soup, page_url: extract_baidu_baike(soup, page_url)[0]
+    if host.endswith('wikipedia.org'):
+        return 'wikipedia', lambda soup, page_url: extract_wikipedia(soup, page_url)[0]
+    if host == 'blog.csdn.net':
+        return 'csdn_blog', extract_csdn_blog
+    return None, None
+
+
+def get_backend(name='bs4'):
+    """获取HTML解析后端
+
+    Args:
+        name: 后端名称，'bs4'（BeautifulSoup）或 'lxml'（lxml/XPath）
+
+    Returns:
+        实现了 parse / extract_* / extractor_for_url 接口的模块
+    """
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"未知的HTML解析后端: {name}，可选: {', '.join(PARSER_BACKENDS)}")
+    return importlib.import_module(PARSER_BACKENDS[name])
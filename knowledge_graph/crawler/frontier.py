@@ -0,0 +1,229 @@
+import os
+import json
+import logging
+import heapq
+import itertools
+import threading
+from collections import deque
+from knowledge_graph.crawler.urls import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlFrontier:
+    """可持久化、可恢复的抓取队列
+
+    每个抓取任务（如某个关键词的百度百科抓取）拥有一个命名队列，所有队列共享同一个
+    已访问URL集合（按规范化URL去重）。队列和已访问集合定期保存到磁盘，
+    程序中断后可以从检查点继续抓取。
+
+    prioritized 为真时队列按链接得分出队（最高分优先，同分按入队顺序），
+    否则按先进先出顺序出队。
+
+    抓取结果的输出（如延迟写入的 JsonlSink）可以通过 add_flush_hook 注册，
+    每次保存检查点前先把已抓取的页面写入磁盘，中断恢复后既不丢页面也不重复写入。
+    """
+
+    def __init__(self, checkpoint_path=None, checkpoint_interval=10, prioritized=False):
+        """初始化抓取队列
+
+        Args:
+            checkpoint_path: 检查点文件路径，为None时不持久化
+            checkpoint_interval: 每抓取多少个页面保存一次检查点
+            prioritized: 是否按链接得分优先出队
+        """
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.prioritized = prioritized
+        self._seq = itertools.count()
+        self.visited = set()
+        self.queues = {}
+        self._pending = {}
+        self.page_counts = {}
+        self.finished = set()
+        self._since_checkpoint = 0
+        self._flush_hooks = []
+        self._lock = threading.RLock()
+
+    def start(self, name, seeds):
+        """创建命名队列；若队列已存在（从检查点恢复），保持原有进度
+
+        Args:
+            name: 队列名称
+            seeds: 初始URL列表
+        """
+        with self._lock:
+            if name in self.queues:
+                logger.info(f"从检查点恢复队列 {name}: 待抓取 {len(self.queues[name])}，已抓取 {self.page_counts.get(name, 0)}")
+                return
+            self.queues[name] = [] if self.prioritized else deque()
+            self._pending[name] = set()
+            self.page_counts[name] = 0
+            for url in seeds:
+                self.push(name, url)
+
+    def push(self, name, url, score=0.0, depth=0):
+        """将URL加入队列（已访问或已在队列中的URL会被忽略）
+
+        Args:
+            name: 队列名称
+            url: 要加入的URL
+            score: 链接得分，仅在 prioritized 模式下影响出队顺序
+            depth: 链接深度（起始页面为0）
+
+        Returns:
+            是否成功加入
+        """
+        key = canonicalize_url(url)
+        with self._lock:
+            if key in self.visited or key in self._pending[name]:
+                return False
+            self._pending[name].add(key)
+            if self.prioritized:
+                heapq.heappush(self.queues[name], (-score, next(self._seq), url, depth))
+            else:
+                self.queues[name].append((-score, next(self._seq), url, depth))
+            return True
+
+    def pop(self, name):
+        """取出下一个未访问的URL，FIFO模式O(1)，优先级模式O(log n)
+
+        Returns:
+            (URL, 链接深度)，队列为空时返回None
+        """
+        with self._lock:
+            queue = self.queues[name]
+            while queue:
+                if self.prioritized:
+                    _, _, url, depth = heapq.heappop(queue)
+                else:
+                    _, _, url, depth = queue.popleft()
+                key = canonicalize_url(url)
+                self._pending[name].discard(key)
+                if key not in self.visited:
+                    return url, depth
+            return None
+
+    def queue_size(self, name):
+        """返回队列中待抓取的URL数"""
+        with self._lock:
+            return len(self.queues.get(name, ()))
+
+    def mark_visited(self, url):
+        """将URL标记为已访问
+
+        Returns:
+            是否为首次访问
+        """
+        key = canonicalize_url(url)
+        with self._lock:
+            if key in self.visited:
+                return False
+            self.visited.add(key)
+            return True
+
+    def is_visited(self, url):
+        with self._lock:
+            return canonicalize_url(url) in self.visited
+
+    def record_page(self, name):
+        """记录队列成功抓取一个页面，必要时保存检查点
+
+        Returns:
+            该队列已抓取的页面数
+        """
+        with self._lock:
+            self.page_counts[name] = self.page_counts.get(name, 0) + 1
+            self._since_checkpoint += 1
+            if self._since_checkpoint >= self.checkpoint_interval:
+                self.checkpoint()
+            return self.page_counts[name]
+
+    def page_count(self, name):
+        with self._lock:
+            return self.page_counts.get(name, 0)
+
+    def finish(self, name):
+        """标记队列已完成"""
+        with self._lock:
+            self.finished.add(name)
+            self.checkpoint()
+
+    def is_finished(self, name):
+        with self._lock:
+            return name in self.finished
+
+    def add_flush_hook(self, hook):
+        """注册保存检查点前调用的函数（如输出文件的 flush）"""
+        with self._lock:
+            self._flush_hooks.append(hook)
+
+    def remove_flush_hook(self, hook):
+        with self._lock:
+            if hook in self._flush_hooks:
+                self._flush_hooks.remove(hook)
+
+    def checkpoint(self):
+        """保存检查点（先写临时文件再替换，避免中断时损坏）
+
+        保存前先调用已注册的输出刷新函数，检查点中记录的已抓取页面都已写入输出文件。
+        """
+        with self._lock:
+            for hook in self._flush_hooks:
+                hook()
+            if not self.checkpoint_path:
+                return
+            state = {
+                'visited': sorted(self.visited),
+                'queues': {
+                    name: {
+                        'pending': [[url, depth, -neg_score] for neg_score, _, url, depth in sorted(queue)]
+                        if self.prioritized else
+                        [[url, depth, -neg_score] for neg_score, _, url, depth in queue],
+                        'pages': self.page_counts.get(name, 0),
+                        'finished': name in self.finished
+                    }
+                    for name, queue in self.queues.items()
+                }
+            }
+            tmp_path = f"{self.checkpoint_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp_path, self.checkpoint_path)
+            self._since_checkpoint = 0
+
+    def load(self):
+        """从检查点恢复状态
+
+        Returns:
+            是否成功加载
+        """
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return False
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except Exception as e:
+            logger.error(f"加载抓取检查点 {self.checkpoint_path} 失败: {str(e)}")
+            return False
+
+        with self._lock:
+            self.visited = set(state.get('visited', []))
+            self.queues = {}
+            self._pending = {}
+            self.page_counts = {}
+            self.finished = set()
+            for name, queue_state in state.get('queues', {}).items():
+                entries = [(-score, next(self._seq), url, depth) for url, depth, score in queue_state.get('pending', [])]
+                if self.prioritized:
+                    heapq.heapify(entries)
+                    self.queues[name] = entries
+                else:
+                    self.queues[name] = deque(entries)
+                self._pending[name] = {canonicalize_url(entry[2]) for entry in entries}
+                self.page_counts[name] = queue_state.get('pages', 0)
+                if queue_state.get('finished'):
+                    self.finished.add(name)
+
+        logger.info(f"已从检查点恢复: {len(self.visited)} 个已访问URL，{len(self.queues)} 个队列")
+        return True
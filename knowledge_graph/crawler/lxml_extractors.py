@@ -0,0 +1,284 @@
+import re
+from urllib.parse import urlparse
+import lxml.html
+from lxml import etree
+
+# 页面字段抽取规则的lxml/XPath实现，接口和输出与 extractors（BeautifulSoup实现）一致。
+# 由libxml2直接构建文档树，字段定位使用预编译的XPath表达式，避免BeautifulSoup逐节点构建
+# Python对象以及多次全树 find/find_all 扫描的开销。
+
+_PARSER = lxml.html.HTMLParser(encoding='utf-8')
+
+
+def _has_class(name):
+    """生成匹配class属性中包含指定类名的XPath条件"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# 文本节点（不包括script/style中的内容，与BeautifulSoup的get_text()保持一致）
+_TEXT = etree.XPath('.//text()[not(ancestor::script) and not(ancestor::style) and not(ancestor::template)]')
+
+# 百度百科
+_BAIDU_TITLE = etree.XPath('(//h1)[1]')
+_BAIDU_SUMMARY = etree.XPath(f"(//div[{_has_class('lemma-summary')}])[1]")
+_BAIDU_CONTENT = etree.XPath(f"(//div[{_has_class('main-content')}])[1]")
+_BAIDU_INFO = etree.XPath(f"(//div[{_has_class('basic-info')}])[1]")
+_BAIDU_INFO_NAMES = etree.XPath(".//dt[@class='basicInfo-item name']")
+_BAIDU_INFO_VALUES = etree.XPath(".//dd[@class='basicInfo-item value']")
+_BAIDU_CATALOG = etree.XPath(f"(//div[{_has_class('lemmaWgt-lemmaCatalog')}])[1]")
+_BAIDU_POLYSEMANT = etree.XPath(f"(//ul[{_has_class('polysemantList-wrapper')}])[1]")
+_BAIDU_REFERENCE_LIST = etree.XPath(f"(//dl[{_has_class('lemma-reference')}])[1]")
+_BAIDU_REFERENCE_DIV = etree.XPath(f"(//div[{_has_class('lemma-reference')}])[1]")
+_BAIDU_SPANS = etree.XPath('//span')
+_ITEM_LINKS = etree.XPath(".//a[starts-with(@href, '/item/')]")
+_SEE_ALSO = re.compile('参见|参考|相关|另见')
+
+# 维基百科
+_WIKI_TITLE = etree.XPath("(//h1[@id='firstHeading'])[1]")
+_WIKI_CONTENT = etree.XPath("(//div[@id='mw-content-text'])[1]")
+_WIKI_FIRST_P = etree.XPath('(.//p[not(@class)])[1]')
+_WIKI_INFOBOX = etree.XPath(f"(//table[{_has_class('infobox')}])[1]")
+_WIKI_CATEGORIES = etree.XPath("//a[starts-with(@href, '/wiki/Category:')]")
+_WIKI_LINKS = etree.XPath(".//a[starts-with(@href, '/wiki/')]")
+_WIKI_EXCLUDED = ('/wiki/File:', '/wiki/Wikipedia:', '/wiki/Help:', '/wiki/Special:', '/wiki/Talk:')
+
+# CSDN
+_CSDN_SEARCH_ITEMS = etree.XPath(f"//div[{_has_class('blog-list-box')}]")
+_CSDN_SEARCH_LINK = etree.XPath(f"(.//a[{_has_class('blog-title')}])[1]")
+_CSDN_TITLE = etree.XPath(f"(//h1[{_has_class('title-article')}])[1]")
+_CSDN_AUTHOR = etree.XPath(f"(//a[{_has_class('follow-nickName')}])[1]")
+_CSDN_TIME = etree.XPath(f"(//span[{_has_class('time')}])[1]")
+_CSDN_CONTENT = etree.XPath("(//div[@id='article_content'])[1]")
+_CSDN_TAGS = etree.XPath(f"//a[{_has_class('tag-link')}]")
+
+
+def parse(html):
+    """将HTML文本解析为lxml文档树"""
+    if not html or not html.strip():
+        html = '<html></html>'
+    return lxml.html.fromstring(html.encode('utf-8'), parser=_PARSER)
+
+
+def text_of(elem, separator='', strip=False):
+    """获取元素的文本，等价于BeautifulSoup的 get_text(separator, strip=strip)"""
+    texts = _TEXT(elem)
+    if strip:
+        texts = [t.strip() for t in texts if t.strip()]
+    return separator.join(texts)
+
+
+def _first(xpath, node):
+    result = xpath(node)
+    return result[0] if result else None
+
+
+def _bs4_string(elem):
+    """等价于BeautifulSoup的 tag.string：只有唯一子节点时返回其文本"""
+    children = list(elem)
+    if elem.text:
+        return elem.text if not children else None
+    if len(children) == 1 and not children[0].tail and isinstance(children[0].tag, str):
+        return _bs4_string(children[0])
+    return None
+
+
+def link_candidates(links):
+    """将链接元素转换为 (href, 锚文本, 上下文) 列表，上下文为链接所在父元素的文本"""
+    candidates = []
+    context_cache = {}
+    for link in links:
+        href = link.get('href')
+        if not href:
+            continue
+        parent = link.getparent()
+        if parent is None:
+            context = ''
+        else:
+            if parent not in context_cache:
+                context_cache[parent] = text_of(parent, ' ', strip=True)[:200]
+            context = context_cache[parent]
+        candidates.append((href, text_of(link).strip(), context))
+    return candidates
+
+
+def extract_baidu_baike(doc, url):
+    """从百度百科页面中抽取字段
+
+    Args:
+        doc: 页面的lxml文档树
+        url: 页面URL
+
+    Returns:
+        (页面数据字典, 相关链接列表)，链接为 (href, 锚文本, 上下文)
+    """
+    title_elem = _first(_BAIDU_TITLE, doc)
+    title = text_of(title_elem).strip() if title_elem is not None else "Unknown Title"
+
+    summary_elem = _first(_BAIDU_SUMMARY, doc)
+    summary = text_of(summary_elem).strip() if summary_elem is not None else ""
+
+    content_elem = _first(_BAIDU_CONTENT, doc)
+    content = text_of(content_elem).strip() if content_elem is not None else ""
+
+    info_box = {}
+    info_elem = _first(_BAIDU_INFO, doc)
+    if info_elem is not None:
+        for dt, dd in zip(_BAIDU_INFO_NAMES(info_elem), _BAIDU_INFO_VALUES(info_elem)):
+            info_box[text_of(dt).strip()] = text_of(dd).strip()
+
+    categories = []
+    category_elem = _first(_BAIDU_CATALOG, doc)
+    if category_elem is not None:
+        categories = [text_of(link).strip() for link in category_elem.iter('a')]
+
+    synonyms = []
+    polysemant_elem = _first(_BAIDU_POLYSEMANT, doc)
+    if polysemant_elem is not None:
+        synonyms = [text_of(link).strip() for link in polysemant_elem.iter('a')]
+
+    references = []
+    reference_elem = _first(_BAIDU_REFERENCE_LIST, doc)
+    if reference_elem is not None:
+        references = [text_of(item).strip() for item in reference_elem.iter('li')]
+
+    page_data = {
+        'title': title,
+        'url': url,
+        'summary': summary,
+        'content': content,
+        'info_box': info_box,
+        'categories': categories,
+        'synonyms': synonyms,
+        'references': references,
+        'source': 'baidu_baike'
+    }
+
+    related_links = []
+    if content_elem is not None:
+        related_links.extend(_ITEM_LINKS(content_elem))
+
+    for span in _BAIDU_SPANS(doc):
+        string = _bs4_string(span)
+        if string is not None and _SEE_ALSO.search(string):
+            if span.getparent() is not None:
+                related_links.extend(_ITEM_LINKS(span.getparent()))
+            break
+
+    bottom_related = _first(_BAIDU_REFERENCE_DIV, doc)
+    if bottom_related is not None:
+        related_links.extend(_ITEM_LINKS(bottom_related))
+
+    return page_data, link_candidates(related_links)
+
+
+def extract_wikipedia(doc, url):
+    """从维基百科页面中抽取字段
+
+    Args:
+        doc: 页面的lxml文档树
+        url: 页面URL
+
+    Returns:
+        (页面数据字典, 相关链接列表)，链接为 (href, 锚文本, 上下文)
+    """
+    title_elem = _first(_WIKI_TITLE, doc)
+    title = text_of(title_elem).strip() if title_elem is not None else "Unknown Title"
+
+    summary = ""
+    content = ""
+    content_div = _first(_WIKI_CONTENT, doc)
+    if content_div is not None:
+        first_p = _first(_WIKI_FIRST_P, content_div)
+        if first_p is not None:
+            summary = text_of(first_p).strip()
+        content = "\n".join(text_of(p).strip() for p in content_div.iter('p'))
+
+    info_box = {}
+    infobox = _first(_WIKI_INFOBOX, doc)
+    if infobox is not None:
+        for row in infobox.iter('tr'):
+            header = next(row.iter('th'), None)
+            data = next(row.iter('td'), None)
+            if header is not None and data is not None:
+                info_box[text_of(header).strip()] = text_of(data).strip()
+
+    categories = [text_of(link).strip() for link in _WIKI_CATEGORIES(doc)]
+
+    page_data = {
+        'title': title,
+        'url': url,
+        'summary': summary,
+        'content': content,
+        'info_box': info_box,
+        'categories': categories,
+        'source': 'wikipedia'
+    }
+
+    content_links = []
+    if content_div is not None:
+        content_links = [link for link in _WIKI_LINKS(content_div)
+                         if not link.get('href').startswith(_WIKI_EXCLUDED)]
+
+    return page_data, link_candidates(content_links)
+
+
+def extract_csdn_search(doc):
+    """从CSDN搜索结果页中抽取博客链接
+
+    Args:
+        doc: 搜索结果页的lxml文档树
+
+    Returns:
+        博客URL列表
+    """
+    blog_links = []
+    for item in _CSDN_SEARCH_ITEMS(doc):
+        link_elem = _first(_CSDN_SEARCH_LINK, item)
+        if link_elem is not None and link_elem.get('href'):
+            blog_links.append(link_elem.get('href'))
+    return blog_links
+
+
+def extract_csdn_blog(doc, url):
+    """从CSDN博客文章页中抽取字段
+
+    Args:
+        doc: 页面的lxml文档树
+        url: 页面URL
+
+    Returns:
+        博客数据字典
+    """
+    title_elem = _first(_CSDN_TITLE, doc)
+    author_elem = _first(_CSDN_AUTHOR, doc)
+    time_elem = _first(_CSDN_TIME, doc)
+    content_elem = _first(_CSDN_CONTENT, doc)
+
+    return {
+        'title': text_of(title_elem).strip() if title_elem is not None else "Unknown Title",
+        'url': url,
+        'author': text_of(author_elem).strip() if author_elem is not None else "",
+        'publish_time': text_of(time_elem).strip() if time_elem is not None else "",
+        'content': text_of(content_elem).strip() if content_elem is not None else "",
+        'tags': [text_of(tag).strip() for tag in _CSDN_TAGS(doc)],
+        'source': 'csdn_blog'
+    }
+
+
+def extractor_for_url(url):
+    """根据URL所在站点选择页面抽取函数
+
+    Args:
+        url: 页面URL
+
+    Returns:
+        (数据源名称, 抽取函数)，不支持的页面（如搜索结果页）返回 (None, None)
+    """
+    host = urlparse(url).netloc
+    if host.endswith('baike.baidu.com'):
+        return 'baidu_baike', lambda doc, page_url: extract_baidu_baike(doc, page_url)[0]
+    if host.endswith('wikipedia.org'):
+        return 'wikipedia', lambda doc, page_url: extract_wikipedia(doc, page_url)[0]
+    if host == 'blog.csdn.net':
+        return 'csdn_blog', extract_csdn_blog
+    return None, None
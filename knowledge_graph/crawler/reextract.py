@@ -0,0 +1,97 @@
+import os
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from knowledge_graph.crawler.archive import PageArchive
+from knowledge_graph.crawler.extractors import get_backend
+from knowledge_graph.utils.jsonl import JsonlSink
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# 各数据源重新抽取结果的输出文件名，与爬虫的输出文件保持一致
+SOURCE_FILES = {
+    'baidu_baike': 'baidu_kg_data.jsonl',
+    'wikipedia': 'wiki_kg_data.jsonl',
+    'csdn_blog': 'csdn_kg_data.jsonl'
+}
+
+
+def _extract_record(args):
+    """在子进程中解压归档正文并运行字段抽取规则
+
+    Args:
+        args: (归档目录, 索引记录, 解析后端名称)
+
+    Returns:
+        (数据源名称, 页面数据字典)，无法抽取时返回 (None, None)
+    """
+    archive_dir, record, parser = args
+    backend = get_backend(parser)
+    source, extractor = backend.extractor_for_url(record['url'])
+    if extractor is None:
+        return None, None
+    try:
+        body = PageArchive(archive_dir).read_body(record['digest'])
+        html = body.decode(record.get('encoding') or 'utf-8', errors='replace')
+        return source, extractor(backend.parse(html), record['url'])
+    except Exception as e:
+        logger.error(f"重新抽取 {record['url']} 失败: {str(e)}")
+        return None, None
+
+
+def reextract_archive(archive_dir='knowledge_graph/data/archive', output_dir='knowledge_graph/data/reextracted',
+                      processes=None, chunksize=8, parser='lxml'):
+    """使用当前的抽取规则，对归档中的全部页面并行重新抽取字段
+
+    Args:
+        archive_dir: 归档目录
+        output_dir: 重新抽取结果的输出目录
+        processes: 进程数，默认使用全部CPU核心
+        chunksize: 每次分发给子进程的页面数
+        parser: HTML解析后端，'bs4' 或 'lxml'
+
+    Returns:
+        数据源名称到页面数的映射
+    """
+    start_time = time.time()
+    records = [r for r in PageArchive(archive_dir).load_index().values() if r.get('status') == 200]
+    logger.info(f"开始重新抽取归档页面: {len(records)} 个")
+
+    sinks = {}
+    counts = {}
+    try:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            tasks = ((archive_dir, record, parser) for record in records)
+            for source, page_data in executor.map(_extract_record, tasks, chunksize=chunksize):
+                if source is None:
+                    continue
+                if source not in sinks:
+                    sinks[source] = JsonlSink(os.path.join(output_dir, SOURCE_FILES.get(source, f"{source}_data.jsonl")))
+                sinks[source].write(page_data)
+                counts[source] = counts.get(source, 0) + 1
+    finally:
+        for sink in sinks.values():
+            sink.close()
+
+    logger.info(f"重新抽取完成，耗时 {time.time() - start_time:.2f} 秒，结果: {counts}，输出目录: {output_dir}")
+    return counts
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='从原始页面归档离线重新抽取字段')
+    parser.add_argument('--archive-dir', default='knowledge_graph/data/archive', help='归档目录')
+    parser.add_argument('--output-dir', default='knowledge_graph/data/reextracted', help='输出目录')
+    parser.add_argument('--processes', type=int, default=None, help='进程数，默认使用全部CPU核心')
+    parser.add_argument('--parser', default='lxml', choices=['bs4', 'lxml'], help='HTML解析后端')
+    args = parser.parse_args()
+    reextract_archive(args.archive_dir, args.output_dir, args.processes, parser=args.parser)
+
+if __name__ == "__main__":
+    main()
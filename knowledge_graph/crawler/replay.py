@@ -0,0 +1,164 @@
+import time
+import random
+import logging
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from knowledge_graph.crawler.archive import PageArchive
+from knowledge_graph.crawler.session import REPLAY_SCHEME_HEADER
+from knowledge_graph.crawler.urls import canonicalize_url
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class ReplayServer:
+    """从原始页面归档回放响应的本地HTTP服务器
+
+    按请求的Host头和路径还原原始URL，返回归档中该URL最近一次抓取的响应，
+    使爬虫可以在离线、可重复的条件下运行和测速。支持注入固定延迟、随机抖动和错误响应。
+    爬虫通过 replay_url 参数（SessionPool）将请求发往本服务器。
+    """
+
+    def __init__(self, archive_dir='knowledge_graph/data/archive', host='127.0.0.1', port=0,
+                 latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, seed=None):
+        """初始化回放服务器
+
+        Args:
+            archive_dir: 归档目录
+            host: 监听地址
+            port: 监听端口，0表示自动分配
+            latency: 每个响应的固定延迟（秒）
+            jitter: 在固定延迟上附加的最大随机延迟（秒）
+            error_rate: 返回错误响应的概率
+            error_status: 注入错误时返回的状态码
+            seed: 随机数种子，用于复现同样的延迟和错误序列
+        """
+        self.archive = PageArchive(archive_dir)
+        self.records = self.archive.load_index()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.stats = {'served': 0, 'missing': 0, 'errors': 0}
+        self._stats_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _draw(self):
+        """返回本次响应的 (延迟秒数, 是否注入错误)"""
+        with self._random_lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            failed = self.error_rate > 0 and self._random.random() < self.error_rate
+        return delay, failed
+
+    def lookup(self, url):
+        """查找URL对应的归档记录，未找到时尝试另一协议"""
+        key = canonicalize_url(url)
+        record = self.records.get(key)
+        if record is None:
+            if key.startswith('https://'):
+                record = self.records.get('http://' + key[len('https://'):])
+            elif key.startswith('http://'):
+                record = self.records.get('https://' + key[len('http://'):])
+        return record
+
+    def _handler_class(self):
+        server = self
+
+        class ReplayHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                delay, failed = server._draw()
+                if delay:
+                    time.sleep(delay)
+                if failed:
+                    server._count('errors')
+                    self._send(server.error_status, b'', 'text/plain')
+                    return
+
+                scheme = self.headers.get(REPLAY_SCHEME_HEADER, 'https')
+                url = f"{scheme}://{self.headers.get('Host', '')}{self.path}"
+                record = server.lookup(url)
+                if record is None:
+                    server._count('missing')
+                    self._send(404, b'', 'text/plain')
+                    return
+                body = server.archive.read_body(record['digest'])
+                server._count('served')
+                self._send(record.get('status') or 200, body, record.get('content_type') or 'text/html')
+
+            def _send(self, status, body, content_type):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return ReplayHandler
+
+    def start(self):
+        """在后台线程中启动服务器"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"回放服务器已启动: {self.url}，归档页面 {len(self.records)} 个")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+        logger.info(f"回放服务器已停止，统计: {self.stats}")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='从原始页面归档回放HTTP响应')
+    parser.add_argument('--archive-dir', default='knowledge_graph/data/archive', help='归档目录')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址')
+    parser.add_argument('--port', type=int, default=8000, help='监听端口')
+    parser.add_argument('--latency', type=float, default=0.0, help='每个响应的固定延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='附加的最大随机延迟（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回错误响应的概率')
+    parser.add_argument('--error-status', type=int, default=503, help='注入错误时返回的状态码')
+    parser.add_argument('--seed', type=int, default=None, help='随机数种子')
+    args = parser.parse_args()
+
+    server = ReplayServer(args.archive_dir, args.host, args.port, args.latency, args.jitter,
+                          args.error_rate, args.error_status, args.seed)
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
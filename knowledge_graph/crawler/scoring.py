@@ -0,0 +1,65 @@
+from knowledge_graph.utils.terms import KG_TERMS, load_terms
+from knowledge_graph.utils.term_matcher import TermMatcher
+
+
+class LinkScorer:
+    """根据锚文本、上下文与知识图谱术语的匹配程度以及链接深度为候选链接打分"""
+
+    def __init__(self, terms, anchor_weight=2.0, context_weight=0.5, exact_bonus=3.0, depth_penalty=1.0):
+        """初始化链接评分器
+
+        Args:
+            terms: 领域术语列表（通常为处理器的 kg_terms）
+            anchor_weight: 锚文本每命中一个术语的得分
+            context_weight: 上下文每命中一个术语的得分
+            exact_bonus: 锚文本恰好是某个术语时的额外得分
+            depth_penalty: 每增加一层链接深度扣除的分数
+        """
+        # 长术语优先，且忽略单字术语，避免噪声匹配
+        self.terms = sorted({t for t in terms if len(t) > 1}, key=len, reverse=True)
+        self.term_set = set(self.terms)
+        self.matcher = TermMatcher(self.terms)
+        self.anchor_weight = anchor_weight
+        self.context_weight = context_weight
+        self.exact_bonus = exact_bonus
+        self.depth_penalty = depth_penalty
+
+    @classmethod
+    def from_dict_file(cls, dict_path, **kwargs):
+        """使用预定义术语和领域词典创建评分器
+
+        词典文件可能为空（如仓库中的 kg_dict.txt），预定义术语保证评分器总有可匹配的术语。
+
+        Args:
+            dict_path: jieba格式的词典文件路径
+            **kwargs: 其余构造参数
+
+        Returns:
+            LinkScorer实例
+        """
+        return cls(list(dict.fromkeys(KG_TERMS + load_terms(dict_path))), **kwargs)
+
+    def count_terms(self, text):
+        """统计文本中出现的不同术语数量"""
+        if not text:
+            return 0
+        return len({term_id for _, _, term_id in self.matcher.finditer(text)})
+
+    def score(self, anchor_text, context='', depth=0):
+        """计算候选链接得分，分数越高越优先抓取
+
+        Args:
+            anchor_text: 链接锚文本
+            context: 链接所在段落等上下文文本
+            depth: 目标页面距离起始页面的链接深度
+
+        Returns:
+            链接得分
+        """
+        anchor_text = (anchor_text or '').strip()
+        score = self.anchor_weight * self.count_terms(anchor_text)
+        if anchor_text in self.term_set:
+            score += self.exact_bonus
+        score += self.context_weight * self.count_terms(context)
+        score -= self.depth_penalty * depth
+        return score
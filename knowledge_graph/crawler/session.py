@@ -0,0 +1,219 @@
+import re
+import threading
+import logging
+import requests
+from charset_normalizer import from_bytes
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlparse, urlsplit
+
+logger = logging.getLogger(__name__)
+
+# 回放模式下传递原始URL协议的请求头
+REPLAY_SCHEME_HEADER = 'X-Replay-Scheme'
+# 允许下载正文的Content-Type（缺少Content-Type时同样允许）
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/xml', 'application/xml', 'text/plain')
+# 检测页面编码时读取的正文前缀长度
+ENCODING_SNIFF_BYTES = 64 * 1024
+# <meta charset=...> / <meta http-equiv="Content-Type" content="...; charset=...">
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([a-zA-Z0-9_.:-]+)', re.I)
+
+
+def is_html_content_type(content_type):
+    """Content-Type 是否为可抽取的文本页面"""
+    if not content_type:
+        return True
+    return content_type.split(';', 1)[0].strip().lower() in HTML_CONTENT_TYPES
+
+
+def read_limited(response, max_bytes, chunk_size=64 * 1024):
+    """以流式方式读取响应正文，超过 max_bytes 时停止下载并关闭连接
+
+    Args:
+        response: 以 stream=True 发送请求得到的响应
+        max_bytes: 最多读取的字节数
+        chunk_size: 每次读取的块大小
+
+    Returns:
+        (正文字节, 是否因超过上限被截断)
+    """
+    body = bytearray()
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        body.extend(chunk)
+        if len(body) > max_bytes:
+            del body[max_bytes:]
+            response.close()
+            return bytes(body), True
+    return bytes(body), False
+
+
+def detect_encoding(body, declared=None):
+    """确定正文编码：优先使用响应头声明的编码，其次是页面<meta>声明，最后对正文前缀做统计检测
+
+    Args:
+        body: 正文字节
+        declared: 响应头声明的编码（requests对未声明charset的text/*默认返回ISO-8859-1，视为未声明）
+
+    Returns:
+        编码名称
+    """
+    if declared and declared.lower() != 'iso-8859-1':
+        return declared
+    prefix = body[:ENCODING_SNIFF_BYTES]
+    match = META_CHARSET_RE.search(prefix[:4096])
+    if match:
+        encoding = match.group(1).decode('ascii', errors='ignore')
+        # 与浏览器一致，将GB2312/GBK按其超集GB18030解码
+        if encoding.lower() in ('gb2312', 'gbk'):
+            encoding = 'gb18030'
+        try:
+            ''.encode(encoding)
+            return encoding
+        except LookupError:
+            pass
+    best = from_bytes(prefix).best()
+    return best.encoding if best else (declared or 'utf-8')
+
+
+class ConnectionStats:
+    """统计HTTP请求数与新建连接数，用于计算连接复用率"""
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.new_connections += 1
+
+    @property
+    def reused_connections(self):
+        return max(0, self.requests - self.new_connections)
+
+    def to_dict(self):
+        return {
+            'requests': self.requests,
+            'new_connections': self.new_connections,
+            'reused_connections': self.reused_connections
+        }
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """在连接池中统计新建TCP/TLS连接次数的HTTPAdapter"""
+
+    def __init__(self, stats, *args, **kwargs):
+        # HTTPAdapter.__init__ 会调用 init_poolmanager，因此需先设置stats
+        self.stats = stats
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        stats = self.stats
+
+        def counting_pool(pool_cls):
+            class CountingConnection(pool_cls.ConnectionCls):
+                def connect(self):
+                    stats.record_connect()
+                    return super().connect()
+
+            return type(pool_cls.__name__, (pool_cls,), {'ConnectionCls': CountingConnection})
+
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: counting_pool(pool_cls)
+            for scheme, pool_cls in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+    def send(self, request, **kwargs):
+        self.stats.record_request()
+        return super().send(request, **kwargs)
+
+
+class SessionPool:
+    """按主机复用的requests会话池，支持keep-alive、连接池和指数退避重试"""
+
+    def __init__(self, headers=None, pool_maxsize=10, retries=3, backoff_factor=0.5,
+                 backoff_jitter=0.5, status_forcelist=(429, 500, 502, 503, 504), replay_url=None):
+        """初始化会话池
+
+        Args:
+            headers: 每个会话的默认请求头
+            pool_maxsize: 每个主机的最大连接数
+            retries: 最大重试次数
+            backoff_factor: 指数退避系数，第n次重试前等待 backoff_factor * 2^(n-1) 秒
+            backoff_jitter: 退避时间上附加的最大随机抖动（秒）
+            status_forcelist: 需要重试的HTTP状态码
+            replay_url: 回放服务器地址（如 http://127.0.0.1:8000），设置后所有请求改发到回放服务器，
+                原始主机通过Host请求头传递
+        """
+        self.headers = dict(headers or {})
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.backoff_jitter = backoff_jitter
+        self.status_forcelist = tuple(status_forcelist)
+        self.replay_url = replay_url.rstrip('/') if replay_url else None
+        self.stats = ConnectionStats()
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _create_session(self):
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            backoff_jitter=self.backoff_jitter,
+            status_forcelist=self.status_forcelist,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = CountingHTTPAdapter(
+            self.stats,
+            pool_connections=1,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry
+        )
+        session = requests.Session()
+        session.headers.update(self.headers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def get_session(self, url):
+        """获取url所在主机的会话，不存在时创建
+
+        Args:
+            url: 请求的URL
+
+        Returns:
+            requests.Session对象
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._sessions:
+                self._sessions[host] = self._create_session()
+            return self._sessions[host]
+
+    def get(self, url, **kwargs):
+        """使用主机对应的会话发送GET请求"""
+        session = self.get_session(url)
+        if self.replay_url:
+            parts = urlsplit(url)
+            headers = dict(kwargs.pop('headers', None) or {})
+            headers['Host'] = parts.netloc
+            headers[REPLAY_SCHEME_HEADER] = parts.scheme
+            target = f"{self.replay_url}{parts.path or '/'}" + (f"?{parts.query}" if parts.query else '')
+            return session.get(target, headers=headers, **kwargs)
+        return session.get(url, **kwargs)
+
+    def close(self):
+        """关闭所有会话"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+        logger.info(f"HTTP连接统计: {self.stats.to_dict()}")
@@ -6,8 +6,20 @@ import requests
 from bs4 import BeautifulSoup
 import logging
 import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urljoin, urlparse
-from knowledge_graph.utils.agent import agent_crawler
+from knowledge_graph.utils.agent import agent_crawler, parallel_agent_crawler
+from knowledge_graph.crawler.throttle import AdaptiveRateLimiter, THROTTLE_STATUSES
+from knowledge_graph.crawler.session import SessionPool, is_html_content_type, read_limited, detect_encoding
+from knowledge_graph.crawler.cache import ResponseCache
+from knowledge_graph.crawler.frontier import CrawlFrontier
+from knowledge_graph.crawler.archive import PageArchive
+from knowledge_graph.crawler.agent_store import AgentResultStore
+from knowledge_graph.crawler.telemetry import CrawlTelemetry
+from knowledge_graph.crawler.scoring import LinkScorer
+from knowledge_graph.crawler.urls import canonicalize_url
+from knowledge_graph.crawler.extractors import get_backend
+from knowledge_graph.utils.jsonl import JsonlSink, iter_jsonl
 
 # 配置日志
 logging.basicConfig(
@@ -18,11 +30,34 @@ logger = logging.getLogger(__name__)
 
 class KnowledgeGraphCrawler:
     """知识图谱爬虫类，用于抓取关于知识图谱的数据"""
-    def __init__(self, output_dir='knowledge_graph/data', use_agent=1, use_trad_method=1):
+    def __init__(self, output_dir='knowledge_graph/data', use_agent=1, use_trad_method=1, concurrent=0, max_workers=4,
+                 retries=3, backoff_factor=0.5, pool_maxsize=10,
+                 use_cache=1, cache_only=0, cache_max_mb=512,
+                 resume=0, checkpoint_interval=10, prioritize_links=1, export_json=0,
+                 use_archive=1, parser='lxml', agent_workers=1, max_page_mb=5, replay_url=None):
         """初始化爬虫
         
         Args:
             output_dir: 数据保存目录
+            use_agent: 是否使用Agent爬虫
+            use_trad_method: 是否使用传统爬虫
+            concurrent: 是否并发抓取不同站点
+            max_workers: 并发模式下的最大线程数
+            retries: 请求失败（429/5xx/连接错误）时的最大重试次数
+            backoff_factor: 重试的指数退避系数
+            pool_maxsize: 每个主机的连接池大小
+            use_cache: 是否使用磁盘HTTP缓存（条件请求，304时直接读缓存）
+            cache_only: 离线模式，只从缓存读取页面，不访问网络
+            cache_max_mb: HTTP缓存大小上限（MB）
+            resume: 是否从上次中断的检查点继续抓取
+            checkpoint_interval: 每抓取多少个页面保存一次抓取队列检查点
+            prioritize_links: 是否按与知识图谱术语的相关度优先抓取链接
+            export_json: 抓取结束后是否额外导出格式化的JSON文件（默认只写JSONL流）
+            use_archive: 是否将原始响应压缩归档，供修改抽取规则后离线重新抽取
+            parser: HTML解析后端，'bs4'（BeautifulSoup）或 'lxml'（lxml/XPath，速度更快）
+            agent_workers: 并行运行的Agent数，大于1时拆分主题并共享浏览器池和LLM客户端
+            max_page_mb: 单个页面最多下载的大小（MB），超过时停止下载并只保留已下载部分
+            replay_url: 回放服务器地址（见 replay.ReplayServer），设置后从归档回放响应而不访问真实站点
         """
         self.output_dir = output_dir
         self.headers = {
@@ -32,354 +67,490 @@ class KnowledgeGraphCrawler:
         self.wiki_base_url = 'https://zh.wikipedia.org'
         self.zhihu_base_url = 'https://www.zhihu.com'
         self.csdn_base_url = 'https://blog.csdn.net'
-        self.visited_urls = set()
+        # 所有抓取方法共享的抓取队列和已访问URL集合
+        self.resume = resume
+        self.frontier = CrawlFrontier(
+            checkpoint_path=os.path.join(output_dir, 'crawl_frontier.json'),
+            checkpoint_interval=checkpoint_interval,
+            prioritized=bool(prioritize_links)
+        )
+        # 链接相关度评分器，与处理器一样使用预定义术语加上领域词典（词典可能为空）
+        self.link_scorer = None
+        if prioritize_links:
+            self.link_scorer = LinkScorer.from_dict_file(os.path.join(output_dir, 'kg_dict.txt'))
         self.use_agent = use_agent
         self.use_trad_method = use_trad_method
+        self.agent_workers = agent_workers
+        self.concurrent = concurrent
+        self.export_json = export_json
+        self.max_page_bytes = int(max_page_mb * 1024 * 1024)
+        self.max_workers = max_workers
+        # 按主机自适应限速（初始请求间隔，单位秒），所有抓取方法共用，并发模式下同样生效
+        self.throttle = AdaptiveRateLimiter({
+            'baike.baidu.com': 1,
+            'zh.wikipedia.org': 1.5,
+            'so.csdn.net': 2,
+            'blog.csdn.net': 2
+        }, robots_fetcher=self._fetch_robots)
+        # 按主机和抓取方法统计的运行指标，run() 结束时导出
+        self.telemetry = CrawlTelemetry()
+        # 按主机复用的HTTP会话（keep-alive + 重试退避）
+        self.sessions = SessionPool(
+            headers=self.headers,
+            pool_maxsize=pool_maxsize,
+            retries=retries,
+            backoff_factor=backoff_factor,
+            replay_url=replay_url
+        )
         # 确保输出目录存在
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
+        if resume:
+            self.frontier.load()
+        self.visited_urls = self.frontier.visited
+        # 磁盘HTTP响应缓存
+        self.cache_only = cache_only
+        self.cache = None
+        if use_cache or cache_only:
+            self.cache = ResponseCache(os.path.join(output_dir, 'http_cache'), max_bytes=cache_max_mb * 1024 * 1024)
+        # 原始响应归档
+        self.archive = PageArchive(os.path.join(output_dir, 'archive')) if use_archive else None
+        # 页面字段抽取规则的实现（BeautifulSoup或lxml/XPath）
+        self.extractors = get_backend(parser)
+        # Agent抓取结果（按规范化URL去重，跨运行复用）
+        self.agent_store = AgentResultStore(os.path.join(output_dir, 'agent_kg_data.jsonl'))
     
-    def fetch_page(self, url):
-        """获取页面内容
+    def fetch_html(self, url):
+        """获取页面HTML文本，优先使用缓存并发送条件请求
         
         Args:
             url: 要抓取的URL
         
         Returns:
-            BeautifulSoup对象或None（如果请求失败）
+            页面文本或None（如果请求失败）
         """
+        cached = self.cache.get(url) if self.cache else None
+        if self.cache_only:
+            self._record_cache(url, cached is not None)
+            if cached is None:
+                logger.warning(f"离线模式下缓存中没有页面: {url}")
+                return None
+            return cached['text']
+
+        # 按主机限速，代替抓取后固定休眠
+        self.telemetry.observe_phase(url, 'sleep', self.throttle.wait(url))
+        start_time = time.time()
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()  # 检查请求是否成功
-            
-            # 检测并设置正确的编码
-            if response.encoding == 'ISO-8859-1':
-                response.encoding = response.apparent_encoding
-                
-            return BeautifulSoup(response.text, 'lxml')
+            # 流式请求：先检查状态码和响应头，再按上限读取正文
+            response = self.sessions.get(url, headers=ResponseCache.conditional_headers(cached), timeout=10, stream=True)
+            latency = time.time() - start_time
+            # 将延迟、状态码和Retry-After反馈给限速器（包括连接池内部重试时遇到的429/503）
+            retries = getattr(response.raw, 'retries', None)
+            throttled = any(h.status in THROTTLE_STATUSES for h in (retries.history if retries else ()))
+            self.throttle.record(url, latency, response.status_code,
+                                 response.headers.get('Retry-After'), throttled)
+            with response:
+                if response.status_code == 304 and cached:
+                    self._record_cache(url, True)
+                    self.telemetry.observe_request(url, latency, 0, response.status_code)
+                    self.telemetry.observe_phase(url, 'fetch', latency)
+                    logger.info(f"页面未修改，使用缓存: {url}")
+                    return cached['text']
+                # 没有缓存或条件请求返回了新内容，缓存条目未被使用
+                self._record_cache(url, False)
+                response.raise_for_status()  # 检查请求是否成功
+
+                # 下载正文之前按Content-Type和Content-Length过滤
+                content_type = response.headers.get('Content-Type', '')
+                if not is_html_content_type(content_type):
+                    self.telemetry.observe_request(url, latency, 0, response.status_code)
+                    self.telemetry.observe_skip(url, 'content_type')
+                    logger.warning(f"跳过非HTML页面 ({content_type}): {url}")
+                    return None
+                content_length = response.headers.get('Content-Length')
+                if content_length and content_length.isdigit() and int(content_length) > self.max_page_bytes:
+                    self.telemetry.observe_request(url, latency, 0, response.status_code)
+                    self.telemetry.observe_skip(url, 'too_large')
+                    logger.warning(f"跳过过大的页面 ({int(content_length)} 字节): {url}")
+                    return None
+
+                body, truncated = read_limited(response, self.max_page_bytes)
+                latency = time.time() - start_time
+                self.telemetry.observe_request(url, latency, len(body), response.status_code)
+                self.telemetry.observe_phase(url, 'fetch', latency)
+                if truncated:
+                    self.telemetry.observe_skip(url, 'truncated')
+                    logger.warning(f"页面超过 {self.max_page_bytes} 字节，只保留已下载部分: {url}")
+
+                # 检测编码（只检查正文前缀）
+                encoding = detect_encoding(body, response.encoding)
+                text = body.decode(encoding, errors='replace')
+                if self.archive:
+                    self.archive.put(url, body, response.status_code, content_type, encoding)
+                # 截断的页面不写入HTTP缓存，避免之后以304复用不完整的内容
+                if self.cache and not truncated:
+                    self.cache.put(url, text, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+                return text
+        except requests.exceptions.RequestException as e:
+            latency = time.time() - start_time
+            if e.response is None:
+                # 连接失败或超时
+                self.throttle.record(url, latency, None)
+                self._record_cache(url, False)
+            # 4xx/5xx 由 raise_for_status 抛出，同样计入状态码和延迟统计
+            status = e.response.status_code if e.response is not None else None
+            self.telemetry.observe_request(url, latency, 0 if status is not None else None, status)
+            self.telemetry.observe_phase(url, 'fetch', latency)
+            logger.error(f"抓取页面 {url} 失败: {str(e)}")
+            return None
         except Exception as e:
             logger.error(f"抓取页面 {url} 失败: {str(e)}")
             return None
     
-    def crawl_baidu_baike(self, keyword='知识图谱', max_pages=20):
+    def _fetch_robots(self, robots_url):
+        """获取robots.txt文本，供限速器读取Crawl-delay
+        
+        Args:
+            robots_url: robots.txt的URL
+        
+        Returns:
+            robots.txt文本或None
+        """
+        try:
+            response = self.sessions.get(robots_url, timeout=10)
+            if response.status_code == 200:
+                return response.text
+        except Exception as e:
+            logger.warning(f"获取 {robots_url} 失败: {str(e)}")
+        return None
+    
+    def fetch_page(self, url):
+        """获取页面内容
+        
+        Args:
+            url: 要抓取的URL
+        
+        Returns:
+            BeautifulSoup对象或None（如果请求失败）
+        """
+        html = self.fetch_html(url)
+        if html is None:
+            return None
+        return BeautifulSoup(html, 'lxml')
+
+    def _record_cache(self, url, hit):
+        """记录HTTP缓存命中情况，只有缓存内容被实际使用（新鲜缓存或304）时才算命中"""
+        if self.cache:
+            self.cache.record(hit)
+            self.telemetry.observe_cache(url, hit)
+
+    def fetch_document(self, url):
+        """获取页面并使用当前解析后端解析
+
+        Args:
+            url: 要抓取的URL
+
+        Returns:
+            解析后端的文档对象或None（如果请求失败）
+        """
+        html = self.fetch_html(url)
+        if html is None:
+            return None
+        with self.telemetry.timer(url, 'parse'):
+            return self.extractors.parse(html)
+    
+    def _mark_visited(self, url):
+        """将URL标记为已访问
+
+        Args:
+            url: 要标记的URL
+
+        Returns:
+            是否为首次访问
+        """
+        return self.frontier.mark_visited(url)
+
+    def _enqueue_links(self, queue_name, links, base_url, depth, limit):
+        """将页面中的候选链接加入抓取队列
+
+        开启链接优先级时，按锚文本和上下文的相关度选出得分最高的 limit 个链接，
+        否则按文档顺序取前 limit 个。
+
+        Args:
+            queue_name: 队列名称
+            links: 候选链接列表，每个元素为 (href, 锚文本, 上下文)
+            base_url: 用于拼接相对链接的站点地址
+            depth: 目标页面的链接深度
+            limit: 每个页面最多加入的链接数
+        """
+        candidates = []
+        for href, anchor_text, context in links:
+            score = self.link_scorer.score(anchor_text, context, depth) if self.link_scorer else 0.0
+            candidates.append((score, urljoin(base_url, href)))
+
+        if self.link_scorer:
+            # 稳定排序，同分链接保持文档顺序
+            candidates.sort(key=lambda c: -c[0])
+
+        for score, next_url in candidates[:limit]:
+            self.frontier.push(queue_name, next_url, score=score, depth=depth)
+        self.telemetry.observe_queue(queue_name, self.frontier.queue_size(queue_name))
+
+    def iter_baidu_baike(self, keyword='知识图谱', max_pages=20):
         """抓取百度百科关于知识图谱的内容
         
         Args:
             keyword: 要搜索的关键词
             max_pages: 最大抓取页面数
         
-        Returns:
-            抓取的数据列表
+        Yields:
+            每个页面的数据字典
         """
         start_url = f"{self.baidu_base_url}/item/{keyword}"
-        results = []
-        queue = [start_url]
+        crawled = 0
+        queue_name = f"baidu_baike:{keyword}"
+        self.frontier.start(queue_name, [start_url])
+        self.telemetry.set_function('iter_baidu_baike')
         
         logger.info(f"开始抓取百度百科，关键词: {keyword}")
         
-        page_count = 0
-        while queue and page_count < max_pages:
-            current_url = queue.pop(0)
+        page_count = self.frontier.page_count(queue_name)
+        while page_count < max_pages:
+            entry = self.frontier.pop(queue_name)
+            if entry is None:
+                break
+            current_url, depth = entry
             
             # 如果已经访问过，则跳过
-            if current_url in self.visited_urls:
+            if not self._mark_visited(current_url):
                 continue
                 
             logger.info(f"正在抓取: {current_url}")
-            self.visited_urls.add(current_url)
             
-            soup = self.fetch_page(current_url)
-            if not soup:
+            doc = self.fetch_document(current_url)
+            if doc is None:
                 continue
                 
-            # 获取标题
-            title = soup.find('h1').get_text().strip() if soup.find('h1') else "Unknown Title"
-            
-            # 获取摘要
-            summary_elem = soup.find('div', class_='lemma-summary')
-            summary = summary_elem.get_text().strip() if summary_elem else ""
-            
-            # 获取正文内容
-            content_elem = soup.find('div', class_='main-content')
-            content = content_elem.get_text().strip() if content_elem else ""
-            
-            # 获取基本信息表
-            info_box = {}
-            info_elem = soup.find('div', class_='basic-info')
-            if info_elem:
-                dt_elems = info_elem.find_all('dt', class_='basicInfo-item name')
-                dd_elems = info_elem.find_all('dd', class_='basicInfo-item value')
-                
-                for dt, dd in zip(dt_elems, dd_elems):
-                    key = dt.get_text().strip()
-                    value = dd.get_text().strip()
-                    info_box[key] = value
-            
-            # 获取分类信息
-            categories = []
-            category_elem = soup.find('div', class_='lemmaWgt-lemmaCatalog')
-            if category_elem:
-                category_links = category_elem.find_all('a')
-                for link in category_links:
-                    categories.append(link.get_text().strip())
-            
-            # 获取同义词和相关术语
-            synonyms = []
-            polysemant_elem = soup.find('ul', class_='polysemantList-wrapper')
-            if polysemant_elem:
-                synonym_links = polysemant_elem.find_all('a')
-                for link in synonym_links:
-                    synonyms.append(link.get_text().strip())
+            # 抽取页面字段和相关链接
+            with self.telemetry.timer(current_url, 'extract'):
+                page_data, related_links = self.extractors.extract_baidu_baike(doc, current_url)
             
-            # 获取参考资料和引用
-            references = []
-            reference_elem = soup.find('dl', class_='lemma-reference')
-            if reference_elem:
-                ref_items = reference_elem.find_all('li')
-                for item in ref_items:
-                    ref_text = item.get_text().strip()
-                    references.append(ref_text)
-            
-            # 存储数据
-            page_data = {
-                'title': title,
-                'url': current_url,
-                'summary': summary,
-                'content': content,
-                'info_box': info_box,
-                'categories': categories,
-                'synonyms': synonyms,
-                'references': references,
-                'source': 'baidu_baike'
-            }
-            
-            results.append(page_data)
-            page_count += 1
-            
-            # 获取相关链接
-            related_links = []
-            
-            # 获取正文中的链接
-            if content_elem:
-                content_links = content_elem.find_all('a', href=re.compile('^/item/'))
-                related_links.extend(content_links)
-            
-            # 获取"参见"部分的链接
-            see_also_elem = soup.find('span', string=re.compile('参见|参考|相关|另见'))
-            if see_also_elem and see_also_elem.parent:
-                see_also_links = see_also_elem.parent.find_all('a', href=re.compile('^/item/'))
-                related_links.extend(see_also_links)
-            
-            # 获取底部相关链接
-            bottom_related = soup.find('div', class_='lemma-reference')
-            if bottom_related:
-                bottom_links = bottom_related.find_all('a', href=re.compile('^/item/'))
-                related_links.extend(bottom_links)
+            yield page_data
+            crawled += 1
+            page_count = self.frontier.record_page(queue_name)
             
             # 添加到队列
-            for link in related_links[:10]:  # 限制相关链接数量
-                href = link.get('href')
-                if href:
-                    next_url = urljoin(self.baidu_base_url, href)
-                    if next_url not in self.visited_urls:
-                        queue.append(next_url)
-            
-            # 休眠一段时间，避免请求过于频繁
-            time.sleep(1)
+            self._enqueue_links(queue_name, related_links, self.baidu_base_url, depth + 1, limit=10)
         
-        logger.info(f"百度百科抓取完成，共抓取 {len(results)} 页")
-        return results
+        self.frontier.finish(queue_name)
+        logger.info(f"百度百科抓取完成，共抓取 {crawled} 页")
     
-    def crawl_wikipedia(self, keyword='知识图谱', max_pages=10):
+    def iter_wikipedia(self, keyword='知识图谱', max_pages=10):
         """抓取维基百科关于知识图谱的内容
         
         Args:
             keyword: 要搜索的关键词
             max_pages: 最大抓取页面数
         
-        Returns:
-            抓取的数据列表
+        Yields:
+            每个页面的数据字典
         """
         # 构建搜索URL
         search_url = f"{self.wiki_base_url}/wiki/{keyword}"
-        results = []
-        queue = [search_url]
-        wiki_visited = set()
+        crawled = 0
+        queue_name = f"wikipedia:{keyword}"
+        self.frontier.start(queue_name, [search_url])
+        self.telemetry.set_function('iter_wikipedia')
         
         logger.info(f"开始抓取维基百科，关键词: {keyword}")
         
-        page_count = 0
-        while queue and page_count < max_pages:
-            current_url = queue.pop(0)
+        page_count = self.frontier.page_count(queue_name)
+        while page_count < max_pages:
+            entry = self.frontier.pop(queue_name)
+            if entry is None:
+                break
+            current_url, depth = entry
             
             # 如果已经访问过，则跳过
-            if current_url in wiki_visited:
+            if not self._mark_visited(current_url):
                 continue
                 
             logger.info(f"正在抓取: {current_url}")
-            wiki_visited.add(current_url)
             
-            soup = self.fetch_page(current_url)
-            if not soup:
+            doc = self.fetch_document(current_url)
+            if doc is None:
                 continue
                 
-            # 获取标题
-            title = soup.find('h1', id='firstHeading').get_text().strip() if soup.find('h1', id='firstHeading') else "Unknown Title"
-            
-            # 获取摘要
-            summary = ""
-            content_div = soup.find('div', id='mw-content-text')
-            if content_div:
-                first_p = content_div.find('p', class_=None)
-                if first_p:
-                    summary = first_p.get_text().strip()
-            
-            # 获取正文内容
-            content = ""
-            if content_div:
-                paragraphs = content_div.find_all('p')
-                content = "\n".join([p.get_text().strip() for p in paragraphs])
-            
-            # 获取信息框
-            info_box = {}
-            infobox = soup.find('table', class_='infobox')
-            if infobox:
-                rows = infobox.find_all('tr')
-                for row in rows:
-                    header = row.find('th')
-                    data = row.find('td')
-                    if header and data:
-                        key = header.get_text().strip()
-                        value = data.get_text().strip()
-                        info_box[key] = value
-            
-            # 获取分类
-            categories = []
-            category_links = soup.find_all('a', href=re.compile('^/wiki/Category:'))
-            for link in category_links:
-                categories.append(link.get_text().strip())
+            # 抽取页面字段和相关链接
+            with self.telemetry.timer(current_url, 'extract'):
+                page_data, content_links = self.extractors.extract_wikipedia(doc, current_url)
             
-            # 存储数据
-            page_data = {
-                'title': title,
-                'url': current_url,
-                'summary': summary,
-                'content': content,
-                'info_box': info_box,
-                'categories': categories,
-                'source': 'wikipedia'
-            }
+            yield page_data
+            crawled += 1
+            page_count = self.frontier.record_page(queue_name)
             
-            results.append(page_data)
-            page_count += 1
-            
-            # 获取相关链接
-            if content_div:
-                content_links = content_div.find_all('a', href=re.compile('^/wiki/(?!File:|Wikipedia:|Help:|Special:|Talk:)'))
-                for link in content_links[:5]:  # 限制相关链接数量
-                    href = link.get('href')
-                    if href:
-                        next_url = urljoin(self.wiki_base_url, href)
-                        if next_url not in wiki_visited:
-                            queue.append(next_url)
-            
-            # 休眠一段时间，避免请求过于频繁
-            time.sleep(1.5)
+            # 添加到队列
+            self._enqueue_links(queue_name, content_links, self.wiki_base_url, depth + 1, limit=5)
         
-        logger.info(f"维基百科抓取完成，共抓取 {len(results)} 页")
-        return results
+        self.frontier.finish(queue_name)
+        logger.info(f"维基百科抓取完成，共抓取 {crawled} 页")
     
-    def crawl_csdn_blogs(self, keyword='知识图谱', max_pages=5):
+    def iter_csdn_blogs(self, keyword='知识图谱', max_pages=5):
         """抓取CSDN博客关于知识图谱的内容
         
         Args:
             keyword: 要搜索的关键词
             max_pages: 最大抓取页面数
         
-        Returns:
-            抓取的数据列表
+        Yields:
+            每篇博客的数据字典
         """
         search_url = f"https://so.csdn.net/so/search/s.do?q={keyword}&t=blog"
-        results = []
+        crawled = 0
+        queue_name = f"csdn_blog:{keyword}"
+        self.telemetry.set_function('iter_csdn_blogs')
         
         logger.info(f"开始抓取CSDN博客，关键词: {keyword}")
         
-        # 获取搜索结果页
-        soup = self.fetch_page(search_url)
-        if not soup:
-            logger.error("抓取CSDN搜索页失败")
-            return results
-        
-        # 提取博客链接
-        blog_links = []
-        article_items = soup.find_all('div', class_='blog-list-box')
-        for item in article_items:
-            link_elem = item.find('a', class_='blog-title')
-            if link_elem and link_elem.get('href'):
-                blog_links.append(link_elem.get('href'))
-        
-        # 限制抓取数量
-        blog_links = blog_links[:max_pages]
+        # 队列中还没有任何进度时从搜索结果页获取博客链接，从检查点恢复时沿用已保存的队列
+        self.frontier.start(queue_name, [])
+        if not self.frontier.page_count(queue_name) and not self.frontier.queue_size(queue_name):
+            doc = self.fetch_document(search_url)
+            if doc is None:
+                logger.error("抓取CSDN搜索页失败")
+                return
+            
+            # 提取博客链接
+            with self.telemetry.timer(search_url, 'extract'):
+                blog_links = self.extractors.extract_csdn_search(doc)
+            
+            # 限制抓取数量
+            for blog_url in blog_links[:max_pages]:
+                self.frontier.push(queue_name, blog_url)
         
         # 抓取每篇博客
-        for blog_url in blog_links:
+        page_count = self.frontier.page_count(queue_name)
+        while page_count < max_pages:
+            self.telemetry.observe_queue(queue_name, self.frontier.queue_size(queue_name))
+            entry = self.frontier.pop(queue_name)
+            if entry is None:
+                break
+            blog_url, _ = entry
+            
+            # 跳过之前已抓取过的博客
+            if not self._mark_visited(blog_url):
+                continue
             logger.info(f"正在抓取CSDN博客: {blog_url}")
             
-            blog_soup = self.fetch_page(blog_url)
-            if not blog_soup:
+            blog_doc = self.fetch_document(blog_url)
+            if blog_doc is None:
                 continue
             
-            # 获取标题
-            title = blog_soup.find('h1', class_='title-article').get_text().strip() if blog_soup.find('h1', class_='title-article') else "Unknown Title"
-            
-            # 获取作者
-            author = ""
-            author_elem = blog_soup.find('a', class_='follow-nickName')
-            if author_elem:
-                author = author_elem.get_text().strip()
-            
-            # 获取发布时间
-            publish_time = ""
-            time_elem = blog_soup.find('span', class_='time')
-            if time_elem:
-                publish_time = time_elem.get_text().strip()
-            
-            # 获取正文内容
-            content = ""
-            content_elem = blog_soup.find('div', id='article_content')
-            if content_elem:
-                content = content_elem.get_text().strip()
-            
-            # 获取标签
-            tags = []
-            tag_elems = blog_soup.find_all('a', class_='tag-link')
-            for tag in tag_elems:
-                tags.append(tag.get_text().strip())
-            
-            # 存储数据
-            blog_data = {
-                'title': title,
-                'url': blog_url,
-                'author': author,
-                'publish_time': publish_time,
-                'content': content,
-                'tags': tags,
-                'source': 'csdn_blog'
-            }
-            
-            results.append(blog_data)
+            # 抽取博客字段
+            with self.telemetry.timer(blog_url, 'extract'):
+                blog_data = self.extractors.extract_csdn_blog(blog_doc, blog_url)
             
-            # 休眠一段时间，避免请求过于频繁
-            time.sleep(2)
+            yield blog_data
+            crawled += 1
+            page_count = self.frontier.record_page(queue_name)
         
-        logger.info(f"CSDN博客抓取完成，共抓取 {len(results)} 篇")
-        return results
+        self.frontier.finish(queue_name)
+        logger.info(f"CSDN博客抓取完成，共抓取 {crawled} 篇")
+
+    def crawl_baidu_baike(self, keyword='知识图谱', max_pages=20):
+        """抓取百度百科并返回完整数据列表，参数同 iter_baidu_baike"""
+        return list(self.iter_baidu_baike(keyword=keyword, max_pages=max_pages))
+
+    def crawl_wikipedia(self, keyword='知识图谱', max_pages=10):
+        """抓取维基百科并返回完整数据列表，参数同 iter_wikipedia"""
+        return list(self.iter_wikipedia(keyword=keyword, max_pages=max_pages))
+
+    def crawl_csdn_blogs(self, keyword='知识图谱', max_pages=5):
+        """抓取CSDN博客并返回完整数据列表，参数同 iter_csdn_blogs"""
+        return list(self.iter_csdn_blogs(keyword=keyword, max_pages=max_pages))
     
-    def crawl_browser_use(self, keyword='知识图谱', max_pages=5):
-        results = asyncio.run(agent_crawler(topic=keyword, pages=max_pages))
-        # results = await agent_crawler(topic=keyword, pages=max_pages)
-        logger.info(f"Agent 运行完毕，共抓取 {len(results)} 篇")
-        return results
+    def crawled_urls(self):
+        """返回传统爬虫已经抓取过（已访问或已归档）的网址
+
+        Returns:
+            规范化URL到原始网址的字典
+        """
+        urls = {}
+        if self.archive:
+            for key, record in self.archive.load_index().items():
+                urls[key] = record['url']
+        for key in self.visited_urls:
+            urls.setdefault(key, key)
+        return urls
+
+    def iter_browser_use(self, keyword='知识图谱', max_pages=10, agents=3, covered_urls=None):
+        """并行运行多个Agent抓取，每个Agent完成后立即产出其结果
+
+        Args:
+            keyword: 主题
+            max_pages: 总共需要抓取的网页数
+            agents: 并行Agent数
+            covered_urls: 已经抓取过的网址，Agent应跳过这些网页
+
+        Yields:
+            Post对象
+        """
+        loop = asyncio.new_event_loop()
+        posts = parallel_agent_crawler(topic=keyword, pages=max_pages, agents=agents, covered_urls=covered_urls)
+        crawled = 0
+        try:
+            while True:
+                try:
+                    post = loop.run_until_complete(posts.__anext__())
+                except StopAsyncIteration:
+                    break
+                yield post
+                crawled += 1
+        finally:
+            loop.run_until_complete(posts.aclose())
+            loop.close()
+        logger.info(f"并行Agent运行完毕，共抓取 {crawled} 篇")
+
+    def crawl_browser_use(self, keyword='知识图谱', max_pages=5, parallel=None):
+        """使用Agent抓取，已保存的结果直接复用，只为缺少的网页数运行Agent
+
+        Args:
+            keyword: 主题
+            max_pages: 需要的网页数
+            parallel: 并行Agent数，默认使用 agent_workers
+
+        Returns:
+            结果字典列表（已保存的结果在前）
+        """
+        cached = self.agent_store.records(topic=keyword)
+        needed = max_pages - len(cached)
+        if needed <= 0:
+            logger.info(f"复用已保存的 {len(cached)} 条Agent结果，跳过Agent抓取")
+            return cached
+
+        # 传统爬虫已抓取的网址和已保存的Agent结果网址都交给Agent跳过
+        crawled = self.crawled_urls()
+        covered = list(crawled.values()) + [url for url in self.agent_store.urls() if canonicalize_url(url) not in crawled]
+        logger.info(f"已保存 {len(cached)} 条Agent结果，还需抓取 {needed} 篇，已覆盖网址 {len(covered)} 个")
+        parallel = self.agent_workers if parallel is None else parallel
+        if parallel > 1:
+            posts = self.iter_browser_use(keyword=keyword, max_pages=needed, agents=parallel, covered_urls=covered)
+        else:
+            posts = asyncio.run(agent_crawler(topic=keyword, pages=needed, covered_urls=covered)) or []
+            # results = await agent_crawler(topic=keyword, pages=max_pages)
+
+        results = []
+        skipped = 0
+        for post in posts:
+            record = post.model_dump()
+            record['topic'] = keyword
+            # 跳过传统爬虫已经抓取过的网页和重复结果
+            if canonicalize_url(record['url']) in crawled or not self.agent_store.add(record):
+                skipped += 1
+                continue
+            results.append(record)
+        logger.info(f"Agent 运行完毕，新增 {len(results)} 篇，跳过已覆盖的 {skipped} 篇")
+        return cached + results
 
     def save_data(self, data, filename):
         """保存抓取的数据到文件
@@ -394,26 +565,23 @@ class KnowledgeGraphCrawler:
         
         logger.info(f"数据已保存到: {filepath}")
     
-    def run(self):
-        """运行爬虫"""
-        # 抓取百度百科
-        baidu_data = self.crawl_baidu_baike(keyword='知识图谱', max_pages=10)
-        self.save_data(baidu_data, 'baidu_kg_data.json')
-        
+    def build_tasks(self):
+        """构建本次运行的抓取任务列表
+
+        Returns:
+            任务列表，每个任务为 (页面生成器方法, 参数字典, JSONL输出文件名)
+        """
+        tasks = [
+            # 抓取百度百科
+            (self.iter_baidu_baike, {'keyword': '知识图谱', 'max_pages': 10}, 'baidu_kg_data.jsonl')
+        ]
+
         if(self.use_trad_method):
             # 抓取维基百科
-            try:
-                wiki_data = self.crawl_wikipedia(keyword='知识图谱', max_pages=5)
-                self.save_data(wiki_data, 'wiki_kg_data.json')
-            except Exception as e:
-                logger.error(f"抓取维基百科失败: {str(e)}")
-            
+            tasks.append((self.iter_wikipedia, {'keyword': '知识图谱', 'max_pages': 5}, 'wiki_kg_data.jsonl'))
+
             # 抓取CSDN博客
-            try:
-                csdn_data = self.crawl_csdn_blogs(keyword='知识图谱', max_pages=5)
-                self.save_data(csdn_data, 'csdn_kg_data.json')
-            except Exception as e:
-                logger.error(f"抓取CSDN博客失败: {str(e)}")
+            tasks.append((self.iter_csdn_blogs, {'keyword': '知识图谱', 'max_pages': 5}, 'csdn_kg_data.jsonl'))
 
             # 抓取相关概念的数据
             related_keywords = [
@@ -421,22 +589,109 @@ class KnowledgeGraphCrawler:
                 '知识推理', '知识抽取', '实体识别', '关系抽取', '知识融合', 
                 '链接数据', '知识问答', '知识计算', '知识工程'
             ]
-        
+
             for keyword in related_keywords:
-                logger.info(f"抓取相关概念: {keyword}")
-                self.visited_urls = set()  # 重置已访问URL集合
-                related_data = self.crawl_wikipedia(keyword=keyword, max_pages=1)
-                # related_data = self.crawl_baidu_baike(keyword=keyword, max_pages=5)
-                self.save_data(related_data, f'wikipedia_{keyword}_data.json')
+                tasks.append((self.iter_wikipedia, {'keyword': keyword, 'max_pages': 1}, f'wikipedia_{keyword}_data.jsonl'))
+                # tasks.append((self.iter_baidu_baike, {'keyword': keyword, 'max_pages': 5}, f'baidu_{keyword}_data.jsonl'))
+
+        return tasks
+
+    def _task_host(self, crawl_func):
+        """获取抓取任务的主站点，用于并发分组"""
+        host_by_func = {
+            'iter_baidu_baike': self.baidu_base_url,
+            'iter_wikipedia': self.wiki_base_url,
+            'iter_csdn_blogs': self.csdn_base_url
+        }
+        return urlparse(host_by_func.get(crawl_func.__name__, '')).netloc
+
+    def _run_task(self, crawl_func, kwargs, filename):
+        """执行单个抓取任务，抓取的页面追加写入JSONL文件
+
+        页面先缓存在内存中，与抓取队列检查点同时写入磁盘：检查点记录的已抓取页面都已在文件中，
+        检查点之后的页面在中断后重新抓取，恢复模式下追加到已有文件时不会丢失或重复。
+
+        Returns:
+            本次写入的页面数
+        """
+        logger.info(f"抓取任务: {crawl_func.__name__}, 关键词: {kwargs.get('keyword')}")
+        filepath = os.path.join(self.output_dir, filename)
+        with JsonlSink(filepath, append=bool(self.resume), deferred=True) as sink:
+            self.frontier.add_flush_hook(sink.flush)
+            try:
+                for page in crawl_func(**kwargs):
+                    sink.write(page)
+            except Exception as e:
+                logger.error(f"{crawl_func.__name__} 抓取 {kwargs.get('keyword')} 失败: {str(e)}")
+            finally:
+                self.frontier.remove_flush_hook(sink.flush)
+        logger.info(f"数据已写入: {filepath}, 本次 {sink.count} 条")
+
+        if self.export_json:
+            self.save_data(list(iter_jsonl(filepath)), f"{os.path.splitext(filename)[0]}.json")
+        return sink.count
+
+    def crawl_concurrent(self, tasks):
+        """并发执行抓取任务
+
+        同一站点的任务在同一线程内顺序执行，不同站点的任务并行执行；
+        同一主机的请求间隔由 self.throttle 保证。
+
+        Args:
+            tasks: build_tasks() 返回的任务列表
+
+        Returns:
+            文件名到写入页面数的映射
+        """
+        groups = {}
+        for task in tasks:
+            groups.setdefault(self._task_host(task[0]), []).append(task)
+
+        def run_group(group):
+            return [(task[2], self._run_task(*task)) for task in group]
+
+        results = {}
+        max_workers = max(1, min(self.max_workers, len(groups)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(run_group, group) for group in groups.values()]
+            for future in as_completed(futures):
+                results.update(future.result())
+        return results
+
+    def run(self):
+        """运行爬虫"""
+        start_time = time.time()
+        tasks = self.build_tasks()
+
+        if self.concurrent:
+            logger.info(f"并发抓取 {len(tasks)} 个任务，最大线程数: {self.max_workers}")
+            self.crawl_concurrent(tasks)
+        else:
+            for task in tasks:
+                self._run_task(*task)
+
+        logger.info(f"传统爬虫运行完毕，耗时 {time.time() - start_time:.2f} 秒")
+        self.frontier.checkpoint()
+        logger.info(f"各主机限速状态: {self.throttle.snapshot()}")
+        self.sessions.close()
+        if self.cache:
+            logger.info(f"HTTP缓存统计: {self.cache.stats()}")
 
         if(self.use_agent):
             try:
                 agent_data = self.crawl_browser_use(keyword='知识图谱', max_pages=10)
-                with open('agent_kg_data.json', 'w', encoding='utf-8') as f:
-                    f.write(agent_data)
-                logger.info(f"数据已保存到: agent_kg_data.json")
+                logger.info(f"Agent数据已保存到: {self.agent_store.filepath}（本主题 {len(agent_data)} 条）")
+                if self.export_json:
+                    self.save_data(self.agent_store.records(), 'agent_kg_data.json')
             except Exception as e:
                 logger.error(f"Agent运行失败: {str(e)}")
+            finally:
+                self.agent_store.close()
+
+        # 导出运行指标（JSON + Prometheus文本格式）
+        json_path, prom_path = self.telemetry.export(self.output_dir)
+        logger.info(f"各主机休眠/请求/解析耗时（秒）: {self.telemetry.summary()}")
+        logger.info(f"爬虫运行指标已导出: {json_path}, {prom_path}")
         
 
 def main():
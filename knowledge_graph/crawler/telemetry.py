@@ -0,0 +1,251 @@
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# 请求延迟与各阶段耗时的直方图分桶（秒）
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 响应大小的直方图分桶（字节）
+SIZE_BUCKETS = (1024, 10 * 1024, 50 * 1024, 100 * 1024, 500 * 1024, 1024 * 1024, 5 * 1024 * 1024)
+# 每个队列最多保留的队列长度采样点数
+MAX_QUEUE_SAMPLES = 1000
+
+# 抓取阶段：限速休眠、网络请求、HTML解析（构建文档树）、字段抽取，每个页面每个阶段记录一次
+PHASES = ('sleep', 'fetch', 'parse', 'extract')
+
+
+class Histogram:
+    """固定分桶的直方图"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        """按分桶估算分位数（返回所在分桶的上界，不超过观测到的最大值）"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'min': self.min,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'buckets': {str(bound): count for bound, count in zip(self.buckets + ('+Inf',), self.counts)}
+        }
+
+
+class CrawlTelemetry:
+    """爬虫运行指标：按主机和抓取方法统计请求延迟、响应大小、状态码、
+    休眠/请求/解析耗时，并记录各抓取队列的长度随时间的变化。线程安全。
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.sizes = defaultdict(lambda: Histogram(SIZE_BUCKETS))
+        self.statuses = defaultdict(int)
+        self.phases = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.cache = defaultdict(int)
+        self.skipped = defaultdict(int)
+        self.queue_depth = defaultdict(list)
+
+    def set_function(self, name):
+        """设置当前线程正在运行的抓取方法，之后记录的指标都归入该方法"""
+        self._local.function = name
+
+    @property
+    def function(self):
+        return getattr(self._local, 'function', 'other')
+
+    @staticmethod
+    def host_of(url):
+        return urlparse(url).netloc
+
+    def observe_request(self, url, latency, size=None, status=None):
+        """记录一次HTTP请求
+
+        Args:
+            url: 请求的URL
+            latency: 请求耗时（秒）
+            size: 响应正文字节数
+            status: HTTP状态码，连接失败时为None
+        """
+        key = (self.host_of(url), self.function)
+        with self._lock:
+            self.latency[key].observe(latency)
+            if size is not None:
+                self.sizes[key].observe(size)
+            self.statuses[key + (str(status) if status is not None else 'error',)] += 1
+
+    def observe_phase(self, url, phase, seconds):
+        """记录一个抓取阶段的耗时
+
+        Args:
+            url: 页面URL
+            phase: 阶段名称，见 PHASES
+            seconds: 耗时（秒）
+        """
+        key = (self.host_of(url), self.function, phase)
+        with self._lock:
+            self.phases[key].observe(seconds)
+
+    @contextmanager
+    def timer(self, url, phase):
+        """统计代码块耗时的上下文管理器"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_phase(url, phase, time.perf_counter() - start)
+
+    def observe_cache(self, url, hit):
+        """记录一次HTTP缓存查询"""
+        key = (self.host_of(url), self.function, 'hit' if hit else 'miss')
+        with self._lock:
+            self.cache[key] += 1
+
+    def observe_skip(self, url, reason):
+        """记录一次未完整下载的页面
+
+        Args:
+            url: 页面URL
+            reason: 原因，content_type（非HTML）、too_large（Content-Length超过上限）或 truncated（下载时超过上限被截断）
+        """
+        key = (self.host_of(url), self.function, reason)
+        with self._lock:
+            self.skipped[key] += 1
+
+    def observe_queue(self, name, depth):
+        """记录抓取队列的当前长度"""
+        with self._lock:
+            samples = self.queue_depth[name]
+            if len(samples) >= MAX_QUEUE_SAMPLES:
+                # 采样点过多时隔点抽稀，保留整体变化趋势
+                del samples[::2]
+            samples.append((round(time.time() - self.started, 3), depth))
+
+    def snapshot(self):
+        """返回全部指标的字典"""
+        with self._lock:
+            requests = {}
+            for (host, function), hist in self.latency.items():
+                entry = requests.setdefault(host, {}).setdefault(function, {})
+                entry['latency'] = hist.to_dict()
+                if (host, function) in self.sizes:
+                    entry['bytes'] = self.sizes[(host, function)].to_dict()
+            for (host, function, status), count in self.statuses.items():
+                requests.setdefault(host, {}).setdefault(function, {}).setdefault('status', {})[status] = count
+            for (host, function, result), count in self.cache.items():
+                requests.setdefault(host, {}).setdefault(function, {}).setdefault('cache', {})[result] = count
+            for (host, function, reason), count in self.skipped.items():
+                requests.setdefault(host, {}).setdefault(function, {}).setdefault('skipped', {})[reason] = count
+            for (host, function, phase), hist in self.phases.items():
+                requests.setdefault(host, {}).setdefault(function, {}).setdefault('phases', {})[phase] = hist.to_dict()
+            return {
+                'elapsed': round(time.time() - self.started, 3),
+                'hosts': requests,
+                'queue_depth': {name: list(samples) for name, samples in self.queue_depth.items()}
+            }
+
+    def summary(self):
+        """按主机汇总各阶段总耗时（秒），用于日志输出"""
+        totals = defaultdict(lambda: dict.fromkeys(PHASES, 0.0))
+        with self._lock:
+            for (host, _, phase), hist in self.phases.items():
+                totals[host][phase] = round(totals[host][phase] + hist.sum, 3)
+        return dict(totals)
+
+    def to_prometheus(self):
+        """导出Prometheus文本格式"""
+        lines = []
+
+        def labels(**kwargs):
+            escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"') for v in kwargs.values())
+            return '{' + ','.join(f'{k}="{v}"' for k, v in zip(kwargs, escaped)) + '}'
+
+        def histogram(name, help_text, items, label_names):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, hist in items:
+                base = dict(zip(label_names, key))
+                cumulative = 0
+                for bound, count in zip(hist.buckets + ('+Inf',), hist.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{labels(**base, le=bound)} {cumulative}")
+                lines.append(f"{name}_sum{labels(**base)} {hist.sum}")
+                lines.append(f"{name}_count{labels(**base)} {hist.count}")
+
+        with self._lock:
+            histogram('crawler_request_latency_seconds', 'HTTP request latency',
+                      self.latency.items(), ('host', 'function'))
+            histogram('crawler_response_bytes', 'HTTP response body size',
+                      self.sizes.items(), ('host', 'function'))
+            histogram('crawler_phase_seconds', 'Time spent sleeping, fetching, parsing and extracting',
+                      self.phases.items(), ('host', 'function', 'phase'))
+
+            lines.append("# HELP crawler_responses_total HTTP responses by status code")
+            lines.append("# TYPE crawler_responses_total counter")
+            for (host, function, status), count in self.statuses.items():
+                lines.append(f"crawler_responses_total{labels(host=host, function=function, status=status)} {count}")
+
+            lines.append("# HELP crawler_cache_lookups_total HTTP cache lookups")
+            lines.append("# TYPE crawler_cache_lookups_total counter")
+            for (host, function, result), count in self.cache.items():
+                lines.append(f"crawler_cache_lookups_total{labels(host=host, function=function, result=result)} {count}")
+
+            lines.append("# HELP crawler_pages_skipped_total Pages not fully downloaded (content type or size limit)")
+            lines.append("# TYPE crawler_pages_skipped_total counter")
+            for (host, function, reason), count in self.skipped.items():
+                lines.append(f"crawler_pages_skipped_total{labels(host=host, function=function, reason=reason)} {count}")
+
+            lines.append("# HELP crawler_queue_depth Current number of pending URLs per crawl queue")
+            lines.append("# TYPE crawler_queue_depth gauge")
+            for name, samples in self.queue_depth.items():
+                if samples:
+                    lines.append(f"crawler_queue_depth{labels(queue=name)} {samples[-1][1]}")
+        return '\n'.join(lines) + '\n'
+
+    def export(self, output_dir, basename='crawl_metrics'):
+        """将指标快照写入 JSON 和 Prometheus 文本文件
+
+        Returns:
+            (JSON文件路径, Prometheus文件路径)
+        """
+        json_path = os.path.join(output_dir, f"{basename}.json")
+        prom_path = os.path.join(output_dir, f"{basename}.prom")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        with open(prom_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        return json_path, prom_path
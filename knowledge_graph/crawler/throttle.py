@@ -0,0 +1,202 @@
+import time
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+logger = logging.getLogger(__name__)
+
+# 视为主机过载、需要降速的状态码
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value):
+    """解析Retry-After响应头（秒数或HTTP日期）
+
+    Returns:
+        需要等待的秒数，无法解析时返回None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostState:
+    """单个主机的令牌桶与统计状态"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.max_rate = None
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.crawl_delay = None
+        self.error_rate = 0.0
+        self.latency = None
+        self.lock = threading.Lock()
+
+
+class AdaptiveRateLimiter:
+    """按主机自适应限速
+
+    每个主机一个令牌桶，速率按AIMD调整，依据为最近请求的错误率（指数移动平均）：
+    错误率不高于 error_threshold 且延迟正常时，成功请求线性加速，偶发的连接错误或5xx不减速；
+    错误率超过阈值时失败请求乘性减速、成功请求不再加速。429/503表示主机明确要求降速，总是乘性减速；
+    延迟过高时适度减速；Retry-After会暂停该主机的请求。
+    robots.txt 中的 Crawl-delay 作为该主机的速率上限。所有抓取方法共用一个实例。
+    """
+
+    def __init__(self, host_intervals=None, default_interval=1.0, min_rate=0.1, max_rate=2.0,
+                 burst=1, increase=0.1, decrease=0.5, latency_target=2.0, error_threshold=0.2,
+                 robots_fetcher=None, user_agent='*'):
+        """初始化限速器
+
+        Args:
+            host_intervals: 主机到初始请求间隔（秒）的映射
+            default_interval: 未配置主机的初始请求间隔（秒）
+            min_rate: 最低请求速率（次/秒）
+            max_rate: 最高请求速率（次/秒）
+            burst: 令牌桶容量，即允许的突发请求数
+            increase: 每次成功请求后速率的加性增量（次/秒）
+            decrease: 主机过载时速率的乘性系数
+            latency_target: 超过该延迟（秒）时视为主机变慢并适度减速
+            error_threshold: 错误率阈值，超过时失败请求减速，不超过时成功请求加速
+            robots_fetcher: 获取robots.txt文本的函数，参数为robots.txt的URL，失败时返回None
+            user_agent: 查询robots.txt规则时使用的User-Agent
+        """
+        self.host_intervals = dict(host_intervals or {})
+        self.default_interval = default_interval
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.error_threshold = error_threshold
+        self.robots_fetcher = robots_fetcher
+        self.user_agent = user_agent
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _state(self, url):
+        parsed = urlparse(url)
+        host = parsed.netloc
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                interval = self.host_intervals.get(host, self.default_interval)
+                rate = 1.0 / interval if interval > 0 else self.max_rate
+                state = HostState(min(self.max_rate, max(self.min_rate, rate)), self.burst)
+                state.max_rate = self.max_rate
+                self._hosts[host] = state
+                new_host = True
+            else:
+                new_host = False
+        if new_host:
+            self._load_robots(state, f"{parsed.scheme}://{host}/robots.txt")
+        return state
+
+    def _load_robots(self, state, robots_url):
+        """读取robots.txt中的Crawl-delay / Request-rate，作为该主机的速率上限"""
+        if self.robots_fetcher is None:
+            return
+        text = self.robots_fetcher(robots_url)
+        if not text:
+            return
+        parser = RobotFileParser(robots_url)
+        parser.parse(text.splitlines())
+        # 未调用modified()时RobotFileParser会认为规则尚未加载
+        parser.modified()
+
+        delay = parser.crawl_delay(self.user_agent)
+        request_rate = parser.request_rate(self.user_agent)
+        if request_rate and request_rate.requests:
+            delay = max(delay or 0, request_rate.seconds / request_rate.requests)
+        if delay:
+            with state.lock:
+                state.crawl_delay = float(delay)
+                state.max_rate = min(self.max_rate, 1.0 / float(delay))
+                state.rate = min(state.rate, state.max_rate)
+            logger.info(f"{robots_url} 要求抓取间隔 {float(delay):.2f} 秒")
+
+    def wait(self, url):
+        """在请求url之前调用，必要时休眠直到该主机有可用令牌
+
+        Args:
+            url: 即将请求的URL
+
+        Returns:
+            实际休眠的秒数
+        """
+        state = self._state(url)
+        slept = 0.0
+        # 同一主机的等待串行化，不同主机之间互不阻塞
+        with state.lock:
+            now = time.monotonic()
+            if state.blocked_until > now:
+                time.sleep(state.blocked_until - now)
+                slept += state.blocked_until - now
+                now = time.monotonic()
+
+            state.tokens = min(self.burst, state.tokens + (now - state.updated) * state.rate)
+            state.updated = now
+            if state.tokens < 1:
+                delay = (1 - state.tokens) / state.rate
+                time.sleep(delay)
+                slept += delay
+                state.tokens = 1.0
+                state.updated = time.monotonic()
+            state.tokens -= 1
+        return slept
+
+    def record(self, url, latency=None, status=None, retry_after=None, throttled=False):
+        """根据请求结果调整该主机的速率
+
+        Args:
+            url: 请求的URL
+            latency: 请求耗时（秒）
+            status: HTTP状态码，连接失败时为None
+            retry_after: Retry-After响应头的值
+            throttled: 请求在重试过程中是否遇到过429/503
+        """
+        state = self._state(url)
+        failed = status is None or status in THROTTLE_STATUSES or status >= 500
+        overloaded = throttled or status in THROTTLE_STATUSES
+        with state.lock:
+            state.error_rate = 0.8 * state.error_rate + 0.2 * (1.0 if failed else 0.0)
+            if latency is not None:
+                state.latency = latency if state.latency is None else 0.8 * state.latency + 0.2 * latency
+
+            error_prone = state.error_rate > self.error_threshold
+            if overloaded or (failed and error_prone):
+                state.rate = max(self.min_rate, state.rate * self.decrease)
+            elif state.latency is not None and state.latency > self.latency_target:
+                state.rate = max(self.min_rate, state.rate * (1 + self.decrease) / 2)
+            elif not failed and not error_prone:
+                state.rate = min(state.max_rate, state.rate + self.increase)
+
+            wait = parse_retry_after(retry_after)
+            if wait:
+                state.blocked_until = max(state.blocked_until, time.monotonic() + wait)
+                logger.warning(f"{urlparse(url).netloc} 要求 {wait:.1f} 秒后重试，暂停该主机的请求")
+
+    def snapshot(self):
+        """返回各主机当前的速率与统计信息"""
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {
+            host: {
+                'rate': round(state.rate, 3),
+                'crawl_delay': state.crawl_delay,
+                'error_rate': round(state.error_rate, 3),
+                'latency': round(state.latency, 3) if state.latency is not None else None
+            }
+            for host, state in hosts.items()
+        }
@@ -0,0 +1,34 @@
+from urllib.parse import urlsplit, urlunsplit, quote, unquote, parse_qsl, urlencode
+
+# 各协议的默认端口，规范化时省略
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# 路径中无需转义的字符
+PATH_SAFE_CHARS = "/:@!$&'()*+,;=-._~"
+
+
+def canonicalize_url(url):
+    """规范化URL，使同一页面的不同写法得到相同的结果
+
+    处理内容: 协议和主机名转小写、去掉默认端口和片段(#...)、
+    路径统一百分号编码（中文路径与已编码路径等价）、查询参数排序。
+
+    Args:
+        url: 原始URL
+
+    Returns:
+        规范化后的URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port is None or DEFAULT_PORTS.get(scheme) == port else f"{host}:{port}"
+
+    path = quote(unquote(parts.path) or '/', safe=PATH_SAFE_CHARS)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)), quote_via=quote)
+
+    return urlunsplit((scheme, netloc, path, query, ''))
@@ -0,0 +1,268 @@
+import os
+import json
+import logging
+import argparse
+import multiprocessing
+from knowledge_graph.utils.jsonl import iter_jsonl
+from knowledge_graph.processor.relation_engine import cooccurring_pairs
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# 预期收益评分中 实体密度、模式未覆盖率、新颖度 的权重
+DEFAULT_WEIGHTS = (0.3, 0.4, 0.3)
+
+
+def pair_of(subject, obj):
+    """无序实体对"""
+    return (subject, obj) if subject < obj else (obj, subject)
+
+
+class SharedBudget:
+    """多个进程共用的大模型调用预算
+
+    剩余次数保存在共享内存中，各子进程按需领取，先到先得，预算不会因进程间平分而浪费或被取整为0。
+    需要在创建进程池之前创建，通过进程参数传给子进程。
+    """
+
+    def __init__(self, total):
+        self._remaining = multiprocessing.Value('q', max(0, total))
+
+    @property
+    def remaining(self):
+        return self._remaining.value
+
+    def take(self, count):
+        """领取最多count次调用
+
+        Returns:
+            实际领取的次数
+        """
+        with self._remaining.get_lock():
+            granted = min(count, self._remaining.value)
+            self._remaining.value -= granted
+            return granted
+
+
+class CascadeSelector:
+    """级联抽取：先运行模式匹配和共现分析，只把预期收益高的文档交给大模型
+
+    每篇文档的预期收益由三部分加权得到：
+    - 实体密度：每百字的实体数（按 density_ref 归一化），实体越密集，可抽取的关系越多；
+    - 模式未覆盖率：同句共现的实体对中，模式匹配未能给出关系的比例；
+    - 新颖度：共现实体对（没有共现时为实体）中不在当前图谱里的比例。
+    得分不低于阈值的文档才调用大模型；设置预算时，每批按得分从高到低分配剩余的调用次数。
+    多进程处理时设置 budget_pool，剩余次数从所有子进程共用的 SharedBudget 中领取。
+    """
+
+    def __init__(self, threshold=0.5, budget=None, weights=DEFAULT_WEIGHTS, density_ref=2.0,
+                 known_entities=(), known_pairs=(), budget_pool=None):
+        """初始化选择器
+
+        Args:
+            threshold: 调用大模型的最低得分
+            budget: 大模型调用次数（文档数）上限，None表示不限制
+            weights: 实体密度、模式未覆盖率、新颖度的权重
+            density_ref: 实体密度的归一化基准（每百字实体数）
+            known_entities: 当前图谱中的实体
+            known_pairs: 当前图谱中已有关系的实体对
+            budget_pool: 多进程共用的 SharedBudget，设置后代替 budget 限制调用次数
+        """
+        self.threshold = threshold
+        self.budget = budget
+        self.weights = weights
+        self.density_ref = density_ref
+        self.known_entities = set(known_entities)
+        self.known_pairs = {pair_of(a, b) for a, b in known_pairs}
+        self.budget_pool = budget_pool
+        self.stats = {'documents': 0, 'llm_calls': 0, 'below_threshold': 0, 'over_budget': 0}
+
+    @classmethod
+    def from_graph(cls, output_dir, **kwargs):
+        """以 output_dir 中已有的 entities.json / relations.json 作为当前图谱创建选择器"""
+        known_entities = []
+        known_pairs = []
+        try:
+            with open(os.path.join(output_dir, 'entities.json'), 'r', encoding='utf-8') as f:
+                known_entities = [e['text'] for e in json.load(f) if isinstance(e, dict) and 'text' in e]
+            with open(os.path.join(output_dir, 'relations.json'), 'r', encoding='utf-8') as f:
+                known_pairs = [(str(r['subject']), str(r['object'])) for r in json.load(f)
+                               if isinstance(r, dict) and 'subject' in r and 'object' in r]
+        except (OSError, ValueError) as e:
+            logger.info(f"未加载当前图谱，新颖度按空图谱计算: {str(e)}")
+        logger.info(f"级联模式当前图谱: {len(known_entities)} 个实体，{len(known_pairs)} 个关系")
+        return cls(known_entities=known_entities, known_pairs=known_pairs, **kwargs)
+
+    def score(self, text, entities, pattern_relations):
+        """计算文档的预期收益
+
+        Args:
+            text: 文档文本
+            entities: 实体列表
+            pattern_relations: 模式匹配得到的关系
+
+        Returns:
+            包含 score/density/uncovered/novelty/pairs 的字典
+        """
+        entity_texts = [e['text'] for e in entities]
+        density = min(1.0, len(entity_texts) * 100 / max(len(text), 1) / self.density_ref)
+
+        pairs = cooccurring_pairs(text, entity_texts)
+        if pairs:
+            covered = {pair_of(r['subject'], r['object']) for r in pattern_relations} & pairs
+            uncovered = 1 - len(covered) / len(pairs)
+            novelty = sum(1 for pair in pairs if pair not in self.known_pairs) / len(pairs)
+        else:
+            uncovered = 0.0
+            novelty = (sum(1 for t in entity_texts if t not in self.known_entities) / len(entity_texts)
+                       if entity_texts else 0.0)
+
+        w_density, w_uncovered, w_novelty = self.weights
+        return {
+            'score': round(w_density * density + w_uncovered * uncovered + w_novelty * novelty, 4),
+            'density': round(density, 4),
+            'uncovered': round(uncovered, 4),
+            'novelty': round(novelty, 4),
+            'pairs': len(pairs)
+        }
+
+    def select(self, documents):
+        """为一批文档决定是否调用大模型
+
+        Args:
+            documents: (文本, 实体列表, 模式关系列表) 列表
+
+        Returns:
+            (与documents一一对应的是否调用大模型, 评分列表)
+        """
+        scores = [self.score(text, entities, relations) for text, entities, relations in documents]
+        candidates = [i for i, s in enumerate(scores) if s['score'] >= self.threshold]
+        self.stats['documents'] += len(documents)
+        self.stats['below_threshold'] += len(documents) - len(candidates)
+
+        if self.budget_pool is not None or self.budget is not None:
+            ranked = sorted(candidates, key=lambda i: scores[i]['score'], reverse=True)
+            if self.budget_pool is not None:
+                remaining = self.budget_pool.take(len(ranked))
+            else:
+                remaining = max(0, self.budget - self.stats['llm_calls'])
+            self.stats['over_budget'] += max(0, len(ranked) - remaining)
+            candidates = ranked[:remaining]
+
+        selected = [False] * len(documents)
+        for i in candidates:
+            selected[i] = True
+        self.stats['llm_calls'] += len(candidates)
+        return selected, scores
+
+    def observe(self, entities, relations):
+        """把处理结果加入当前图谱，之后的文档按更新后的图谱计算新颖度"""
+        self.known_entities.update(e['text'] for e in entities)
+        self.known_pairs.update(pair_of(str(r['subject']), str(r['object'])) for r in relations
+                                if 'subject' in r and 'object' in r)
+
+    def summary(self):
+        """返回节省的大模型调用统计"""
+        documents = self.stats['documents']
+        saved = documents - self.stats['llm_calls']
+        return dict(self.stats, saved=saved, saved_rate=round(saved / documents, 4) if documents else 0.0)
+
+
+def triple_of(relation):
+    return (str(relation.get('subject')), str(relation.get('predicate')), str(relation.get('object')))
+
+
+def recall(gold, predicted):
+    """关系召回率：标注三元组中被抽取到的比例"""
+    gold = {triple_of(r) for r in gold}
+    if not gold:
+        return None
+    return len(gold & {triple_of(r) for r in predicted}) / len(gold)
+
+
+def evaluate_cascade(processor, samples, threshold=0.5, budget=None, weights=DEFAULT_WEIGHTS):
+    """在标注样本上评估级联抽取：节省的大模型调用与损失的召回率
+
+    所有样本都会请求大模型（结果可由大模型缓存复用），以便比较全量抽取与级联抽取的召回率。
+
+    Args:
+        processor: 开启大模型的 KnowledgeProcessor
+        samples: 标注样本列表，每项为 {"text": 文本, "relations": [{"subject", "predicate", "object"}]}
+        threshold: 级联阈值
+        budget: 大模型调用预算
+        weights: 评分权重
+
+    Returns:
+        评估报告字典
+    """
+    texts = [sample['text'] for sample in samples]
+    entities_batch = processor.extract_entities_batch(texts)
+    pattern_batch = [processor.extract_relations_with_patterns(text, entities)
+                     for text, entities in zip(texts, entities_batch)]
+
+    llm_available = processor.use_openai and os.environ.get("OPENAI_API_KEY")
+    if not llm_available:
+        logger.warning("OpenAI API不可用，大模型关系按空计算，召回率只反映模式匹配")
+        llm_batch = [[] for _ in texts]
+    elif processor.llm_extractor is not None:
+        llm_batch = processor.request_relations_batch(texts, entities_batch)
+    else:
+        llm_batch = [processor.extract_relations_with_openai(text, entities)
+                     for text, entities in zip(texts, entities_batch)]
+
+    selector = CascadeSelector.from_graph(processor.output_dir, threshold=threshold, budget=budget, weights=weights)
+    selected, scores = selector.select(list(zip(texts, entities_batch, pattern_batch)))
+
+    def mean_recall(predictions):
+        values = [recall(sample.get('relations', []), predicted) for sample, predicted in zip(samples, predictions)]
+        values = [v for v in values if v is not None]
+        return round(sum(values) / len(values), 4) if values else None
+
+    full = [p + l for p, l in zip(pattern_batch, llm_batch)]
+    cascade = [p + (l if s else []) for p, l, s in zip(pattern_batch, llm_batch, selected)]
+    report = {
+        'documents': len(samples),
+        'threshold': threshold,
+        'budget': budget,
+        'llm_calls_full': len(samples),
+        'llm_calls_cascade': sum(selected),
+        'llm_calls_saved': len(samples) - sum(selected),
+        'recall_patterns_only': mean_recall(pattern_batch),
+        'recall_full': mean_recall(full),
+        'recall_cascade': mean_recall(cascade),
+        'scores': scores
+    }
+    if report['recall_full'] is not None:
+        report['recall_lost'] = round(report['recall_full'] - report['recall_cascade'], 4)
+    return report
+
+
+def main():
+    """主函数"""
+    from knowledge_graph.processor.processor import KnowledgeProcessor
+
+    parser = argparse.ArgumentParser(description='在标注样本上评估级联关系抽取')
+    parser.add_argument('--sample', required=True, help='标注样本（JSONL，每行包含 text 和 relations）')
+    parser.add_argument('--output-dir', default='knowledge_graph/data', help='当前图谱和大模型缓存所在目录')
+    parser.add_argument('--threshold', type=float, default=0.5, help='调用大模型的最低得分')
+    parser.add_argument('--budget', type=int, default=None, help='大模型调用次数上限')
+    args = parser.parse_args()
+
+    samples = list(iter_jsonl(args.sample))
+    processor = KnowledgeProcessor(input_dir=args.output_dir, output_dir=args.output_dir, use_openai=True,
+                                   skip_near_duplicates=False)
+    report = evaluate_cascade(processor, samples, args.threshold, args.budget)
+
+    report_path = os.path.join(args.output_dir, 'cascade_evaluation.json')
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    logger.info(f"级联评估: {report['documents']} 篇文档，大模型调用 {report['llm_calls_cascade']}/"
+                f"{report['llm_calls_full']}（节省 {report['llm_calls_saved']} 次），召回率 全量 {report['recall_full']}，"
+                f"级联 {report['recall_cascade']}，仅模式 {report['recall_patterns_only']}，报告: {report_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import re
+from collections import namedtuple
+
+# 文本块：在原文中的起止位置和文本
+Chunk = namedtuple('Chunk', ['start', 'end', 'text'])
+
+# 句子（连同句末标点）的匹配模式，换行也作为句子边界
+SENTENCE_RE = re.compile(r'[^。！？.!?\n]*(?:[。！？.!?\n]+|$)')
+
+
+def sentence_spans(text, max_chars=None):
+    """把文本切分为首尾相接的句子区间
+
+    Args:
+        text: 输入文本
+        max_chars: 单个句子的最大长度，更长的句子按此长度硬切分
+
+    Returns:
+        [(起始位置, 结束位置)] 列表，覆盖整个文本
+    """
+    spans = []
+    for match in SENTENCE_RE.finditer(text):
+        start, end = match.span()
+        if start == end:
+            continue
+        if max_chars and end - start > max_chars:
+            spans.extend((i, min(i + max_chars, end)) for i in range(start, end, max_chars))
+        else:
+            spans.append((start, end))
+    return spans
+
+
+def sliding_windows(text, max_chars, overlap=200):
+    """按句子边界把长文本切分为互相重叠的窗口
+
+    每个窗口由完整的句子组成，长度不超过 max_chars；相邻窗口重叠末尾不超过 overlap 个字符的句子，
+    使跨窗口边界的实体和关系至少在一个窗口中完整出现。不超过 max_chars 的文本只有一个窗口。
+
+    Args:
+        text: 输入文本
+        max_chars: 窗口的最大长度（字符）
+        overlap: 相邻窗口的最大重叠长度（字符）
+
+    Returns:
+        Chunk 列表，按位置排列并覆盖整个文本
+    """
+    if len(text) <= max_chars:
+        return [Chunk(0, len(text), text)]
+
+    spans = sentence_spans(text, max_chars)
+    chunks = []
+    i = 0
+    while i < len(spans):
+        start = spans[i][0]
+        j = i + 1
+        while j < len(spans) and spans[j][1] - start <= max_chars:
+            j += 1
+        end = spans[j - 1][1]
+        chunks.append(Chunk(start, end, text[start:end]))
+        if j == len(spans):
+            break
+        # 下一个窗口从末尾几个句子开始（重叠部分），且至少前进一个句子
+        k = j
+        while k - 1 > i and end - spans[k - 1][0] <= overlap:
+            k -= 1
+        i = k
+    return chunks
+
+
+def merge_chunk_entities(chunk_results):
+    """合并各窗口的实体，重叠区域中同一位置的同一实体只保留一次
+
+    Args:
+        chunk_results: [(Chunk, [(窗口内起始位置, 窗口内结束位置, 实体字典)])] 列表
+
+    Returns:
+        按原文位置排列的实体列表
+    """
+    seen = set()
+    located = []
+    for chunk, items in chunk_results:
+        for start, end, entity in items:
+            key = (chunk.start + start, chunk.start + end, entity['text'], entity.get('label'))
+            if key not in seen:
+                seen.add(key)
+                located.append((chunk.start + start, chunk.start + end, entity))
+    located.sort(key=lambda item: (item[0], item[1]))
+    return [entity for _, _, entity in located]
+
+
+def merge_chunk_relations(chunk_results):
+    """合并各窗口抽取的关系
+
+    关系按其句子在原文中的位置定位：重叠区域中同一位置的同一三元组只保留一次，
+    不同位置出现的同一三元组仍分别保留。无法定位句子的关系按三元组去重。
+
+    Args:
+        chunk_results: [(Chunk, 关系列表)] 列表
+
+    Returns:
+        按窗口顺序排列的关系列表
+    """
+    seen = set()
+    relations = []
+    for chunk, chunk_relations in chunk_results:
+        for relation in chunk_relations:
+            sentence = relation.get('sentence')
+            pos = chunk.text.find(sentence) if isinstance(sentence, str) and sentence else -1
+            key = (str(relation.get('subject')), str(relation.get('predicate')), str(relation.get('object')),
+                   chunk.start + pos if pos >= 0 else None)
+            if key not in seen:
+                seen.add(key)
+                relations.append(relation)
+    return relations
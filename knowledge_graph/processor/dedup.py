@@ -0,0 +1,108 @@
+import re
+import hashlib
+from collections import Counter, defaultdict
+import numpy as np
+
+
+class NearDuplicateDetector:
+    """基于SimHash指纹和LSH分段索引的近似重复文档检测
+
+    64位SimHash指纹被切分为 bands 段，任意一段完全相同的文档才会进入候选集合，
+    再用汉明距离判断是否近似重复。max_distance < bands 时，
+    距离不超过 max_distance 的两个指纹必然至少有一段相同，不会漏检。
+    """
+
+    FINGERPRINT_BITS = 64
+    # 指纹各位的位移量，用于一次性展开全部shingle哈希的比特
+    _BIT_SHIFTS = np.arange(FINGERPRINT_BITS, dtype=np.uint64)
+
+    def __init__(self, shingle_size=3, bands=4, max_distance=3, min_length=30):
+        """初始化检测器
+
+        Args:
+            shingle_size: 字符n-gram的长度
+            bands: LSH分段数，必须能整除64
+            max_distance: 判定为近似重复的最大汉明距离
+            min_length: 参与近似匹配的最小文本长度，更短的文本只做精确去重
+        """
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.band_bits = self.FINGERPRINT_BITS // bands
+        self.max_distance = max_distance
+        self.min_length = min_length
+        self.fingerprints = []
+        self.doc_ids = []
+        self.exact = {}
+        self.buckets = defaultdict(list)
+
+    @staticmethod
+    def normalize(text):
+        """去除空白和标点、统一小写，使转载时的格式差异不影响指纹"""
+        return re.sub(r'[\W_]+', '', text or '').lower()
+
+    def fingerprint(self, text):
+        """计算文本的64位SimHash指纹
+
+        Args:
+            text: 已规范化的文本
+
+        Returns:
+            指纹整数
+        """
+        size = self.shingle_size
+        shingles = Counter(text[i:i + size] for i in range(max(1, len(text) - size + 1)))
+        hashes = np.fromiter((int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+                              for shingle in shingles), dtype=np.uint64, count=len(shingles))
+        counts = np.fromiter(shingles.values(), dtype=np.int64, count=len(shingles))
+        # 每个shingle的每一位为1时加上其出现次数、为0时减去，按位累加
+        bits = (hashes[:, None] >> self._BIT_SHIFTS & np.uint64(1)).astype(np.int64)
+        weights = counts @ (2 * bits - 1)
+
+        fingerprint = 0
+        for bit in np.flatnonzero(weights > 0):
+            fingerprint |= 1 << int(bit)
+        return fingerprint
+
+    def _band_keys(self, fingerprint):
+        mask = (1 << self.band_bits) - 1
+        return [(band, fingerprint >> (band * self.band_bits) & mask) for band in range(self.bands)]
+
+    def add(self, doc_id, text):
+        """检查文档是否与已加入的文档重复；不重复时将其加入索引
+
+        Args:
+            doc_id: 文档标识（如URL）
+            text: 文档正文
+
+        Returns:
+            重复时返回与之重复的文档标识，否则返回None
+        """
+        normalized = self.normalize(text)
+        if not normalized:
+            return None
+
+        # 精确重复
+        digest = hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+        if digest in self.exact:
+            return self.exact[digest]
+
+        if len(normalized) < self.min_length:
+            self.exact[digest] = doc_id
+            return None
+
+        # 近似重复：只与同一LSH分段桶中的候选比较
+        fingerprint = self.fingerprint(normalized)
+        band_keys = self._band_keys(fingerprint)
+        for key in band_keys:
+            for index in self.buckets[key]:
+                if bin(fingerprint ^ self.fingerprints[index]).count('1') <= self.max_distance:
+                    return self.doc_ids[index]
+
+        # 只登记被接受的文档，之后的精确副本报告为与该文档重复
+        self.exact[digest] = doc_id
+        index = len(self.fingerprints)
+        self.fingerprints.append(fingerprint)
+        self.doc_ids.append(doc_id)
+        for key in band_keys:
+            self.buckets[key].append(index)
+        return None
@@ -0,0 +1,656 @@
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import multiprocessing
+import logging
+from collections import deque
+
+try:
+    import tiktoken
+except ImportError:  # 未安装时按字符数估算token
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# 大模型关系抽取的默认参数
+LLM_MODEL = "gpt-3.5-turbo"
+LLM_TEMPERATURE = 0.3
+LLM_MAX_TOKENS = 2000
+# 多文档打包请求的最大输出token数
+LLM_PACKED_MAX_TOKENS = 4000
+
+SYSTEM_PROMPT = "你是一个专业的知识图谱关系提取助手，擅长从文本中识别实体间的语义关系。"
+
+# 关系类型说明，单文档和多文档提示共用（不含花括号，可直接拼入格式化模板）
+RELATION_TYPES = """关系类型主要包括（尽可能规约到以下关系）:
+- is_a (是一种)
+- includes (包括)
+- contains (包含)
+- belongs_to (属于)
+- composed_of (由...组成)
+- used_for (用于)
+- based_on (基于)
+- applied_to (应用于)
+- defined_as (定义为)
+- equivalent_to (等同于)
+- produces (产生)
+- leads_to (导致)
+- depends_on (依赖于)
+- related_to (相关于)
+- derived_from (源自)
+- affects (影响)
+- supports (支持)
+- implements (实现)
+- extends (扩展)
+- uses (使用)
+注意，所有的关系类型必须使用英文（例如"is_a"是正确的，但是"是一种"则是错误的），括号里的中文仅供你参考。
+"""
+
+RELATION_PROMPT = """
+请从以下文本中提取实体之间的关系，并以JSON格式返回三元组(主体,关系,客体)。
+文本内容: {text}
+
+已识别的实体: {entity_list}
+
+请分析文本，找出这些实体之间的关系。""" + RELATION_TYPES + """请严格按照以下格式返回结果:
+[
+  {{
+    "subject": "实体1",
+    "predicate": "关系类型",
+    "object": "实体2",
+    "sentence": "包含这种关系的原始句子",
+    "confidence": 0.9
+  }}
+]
+注意，所有的关系类型必须使用英文（例如"is_a"是正确的，但是"是一种"则是错误的）
+只返回JSON数组，不要有其他文字说明。
+"""
+
+# 多个短文档合并为一个请求时的提示，每篇文档带有编号，返回按编号分组的关系
+PACKED_RELATION_PROMPT = """
+请分别从以下 {count} 篇文档中提取实体之间的关系，并以JSON格式返回三元组(主体,关系,客体)。每篇文档的关系只能来自该文档本身。
+{documents}
+请分析每篇文档，找出其中实体之间的关系。""" + RELATION_TYPES + """请严格按照以下格式返回结果，键为文档编号，值为该文档的关系数组（没有关系时为空数组）:
+{{
+  "D1": [
+    {{
+      "subject": "实体1",
+      "predicate": "关系类型",
+      "object": "实体2",
+      "sentence": "包含这种关系的原始句子",
+      "confidence": 0.9
+    }}
+  ],
+  "D2": []
+}}
+只返回JSON对象，不要有其他文字说明。
+"""
+
+PACKED_DOCUMENT = """
+文档编号: {doc_id}
+文本内容: {text}
+已识别的实体: {entity_list}
+"""
+
+# 遇到这些HTTP状态码时退避重试
+RETRY_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+def build_relation_prompt(text, entities, max_chars=8000, max_entities=30):
+    """构建关系抽取提示
+
+    Args:
+        text: 输入文本
+        entities: 已提取的实体列表
+        max_chars: 文本截断长度，避免超出token限制
+        max_entities: 提示中最多列出的实体数
+
+    Returns:
+        用户提示文本
+    """
+    entity_list = ", ".join(e['text'] for e in entities[:max_entities])
+    if len(text) > max_chars:
+        text = text[:max_chars]
+    return RELATION_PROMPT.format(text=text, entity_list=entity_list)
+
+
+def build_messages(prompt):
+    """构建聊天消息列表"""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def parse_relations(result):
+    """解析大模型返回的JSON关系数组
+
+    Args:
+        result: 大模型返回的文本
+
+    Returns:
+        关系三元组列表，每个关系带有 method='openai' 标记；无法解析时返回None（不应写入缓存）
+    """
+    result = (result or '').strip()
+    try:
+        # 直接尝试解析整个JSON
+        extracted_relations = json.loads(result)
+    except json.JSONDecodeError:
+        # 尝试提取JSON部分
+        json_match = re.search(r'\[\s*\{.*\}\s*\]', result, re.DOTALL)
+        if not json_match:
+            logger.warning("OpenAI响应中未找到有效的JSON数据")
+            return None
+        try:
+            extracted_relations = json.loads(json_match.group(0))
+        except json.JSONDecodeError as e:
+            logger.error(f"解析OpenAI响应JSON失败: {str(e)}")
+            return None
+    if not isinstance(extracted_relations, list):
+        logger.warning("OpenAI响应不是JSON数组")
+        return None
+
+    relations = []
+    for relation in extracted_relations:
+        if isinstance(relation, dict):
+            # 添加方法标记
+            relation['method'] = 'openai'
+            relations.append(relation)
+    return relations
+
+
+def estimate_tokens(text):
+    """粗略估算文本的token数（中文约每字1个token，其他字符约每4个1个token）"""
+    cjk = len(re.findall(r'[一-鿿]', text))
+    return cjk + (len(text) - cjk) // 4 + 1
+
+
+# 模型名称 -> tiktoken编码器，无法加载时为None
+_encoders = {}
+
+
+def count_tokens(text, model=LLM_MODEL):
+    """计算文本的token数，优先使用tiktoken，不可用（未安装或无法下载词表）时按字符数估算"""
+    if model not in _encoders:
+        encoder = None
+        if tiktoken is not None:
+            try:
+                encoder = tiktoken.encoding_for_model(model)
+            except Exception as e:
+                logger.warning(f"无法加载 {model} 的tiktoken编码器，改为按字符数估算token: {str(e)}")
+        _encoders[model] = encoder
+    encoder = _encoders[model]
+    if encoder is None:
+        return estimate_tokens(text)
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def build_document_block(doc_id, text, entities, max_entities=30):
+    """构建多文档提示中的一篇文档"""
+    entity_list = ", ".join(e['text'] for e in entities[:max_entities])
+    return PACKED_DOCUMENT.format(doc_id=doc_id, text=text, entity_list=entity_list)
+
+
+def build_packed_prompt(documents):
+    """把多篇短文档合并为一个关系抽取提示，文档编号依次为 D1、D2、……
+
+    Args:
+        documents: (文本, 实体列表) 列表
+
+    Returns:
+        用户提示文本
+    """
+    blocks = ''.join(build_document_block(f"D{i}", text, entities)
+                     for i, (text, entities) in enumerate(documents, 1))
+    return PACKED_RELATION_PROMPT.format(count=len(documents), documents=blocks)
+
+
+def parse_packed_relations(result, count):
+    """把多文档请求返回的JSON对象拆分为每篇文档的关系列表
+
+    Args:
+        result: 大模型返回的文本
+        count: 请求中的文档数
+
+    Returns:
+        长度为count的列表，每项为该文档的关系列表；响应中缺少该文档编号或其值不是数组时为None
+        （只需逐篇重新请求这些文档）。整个响应无法解析时返回None
+    """
+    result = (result or '').strip()
+    try:
+        grouped = json.loads(result)
+    except json.JSONDecodeError:
+        json_match = re.search(r'\{.*\}', result, re.DOTALL)
+        if not json_match:
+            logger.warning("OpenAI多文档响应中未找到有效的JSON数据")
+            return None
+        try:
+            grouped = json.loads(json_match.group(0))
+        except json.JSONDecodeError as e:
+            logger.error(f"解析OpenAI多文档响应JSON失败: {str(e)}")
+            return None
+    if not isinstance(grouped, dict):
+        logger.warning("OpenAI多文档响应不是按文档编号分组的JSON对象")
+        return None
+
+    per_document = [None] * count
+    for doc_id, relations in grouped.items():
+        match = re.fullmatch(r'\s*[Dd]?(\d+)\s*', str(doc_id))
+        if not match or not 1 <= int(match.group(1)) <= count or not isinstance(relations, list):
+            logger.warning(f"忽略OpenAI多文档响应中无效的文档编号或关系: {doc_id}")
+            continue
+        index = int(match.group(1)) - 1
+        if per_document[index] is None:
+            per_document[index] = []
+        for relation in relations:
+            if isinstance(relation, dict):
+                relation['method'] = 'openai'
+                per_document[index].append(relation)
+    return per_document
+
+
+def pack_documents(token_counts, budget, max_docs=8, max_doc_tokens=None):
+    """按token预算把短文档分组
+
+    按顺序贪心地把文档放入当前分组，分组的文档token总数不超过budget、文档数不超过max_docs；
+    超过 max_doc_tokens（默认为预算的一半）的文档单独成组。
+
+    Args:
+        token_counts: 每篇文档的token数
+        budget: 每个分组的文档token总数上限
+        max_docs: 每个分组的最多文档数
+        max_doc_tokens: 可以参与打包的单篇文档token上限
+
+    Returns:
+        文档下标分组的列表
+    """
+    if max_doc_tokens is None:
+        max_doc_tokens = budget // 2
+    groups = []
+    current = []
+    used = 0
+    for i, tokens in enumerate(token_counts):
+        if tokens > max_doc_tokens:
+            groups.append([i])
+            continue
+        if current and (used + tokens > budget or len(current) >= max_docs):
+            groups.append(current)
+            current = []
+            used = 0
+        current.append(i)
+        used += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def retry_delay(error, attempt, base_delay, max_delay):
+    """计算重试前的等待时间：优先使用服务端的 Retry-After，否则指数退避加随机抖动"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    retry_after = headers.get('retry-after')
+    if retry_after:
+        try:
+            return min(max_delay, float(retry_after))
+        except ValueError:
+            pass
+    return min(max_delay, base_delay * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+
+def is_retryable(error):
+    """判断异常是否为限流、服务端错误或网络错误，可以重试"""
+    import openai
+    if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRY_STATUS_CODES or error.status_code >= 500
+    return False
+
+
+class RateLimiter:
+    """按滑动一分钟窗口限制请求数（RPM）和token数（TPM）的异步限速器
+
+    窗口内的请求记录与事件循环无关，同一个限速器可以跨多次 asyncio 运行持续生效。
+    """
+
+    def __init__(self, rpm=500, tpm=200000, window=60.0):
+        """初始化限速器
+
+        Args:
+            rpm: 每分钟最多请求数，None表示不限制
+            tpm: 每分钟最多token数，None表示不限制
+            window: 窗口长度（秒）
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = window
+        self._events = deque()
+        self._tokens = 0
+        self._lock = None
+        self._lock_loop = None
+
+    def _get_lock(self):
+        """返回当前事件循环中的锁（asyncio.Lock 绑定事件循环，换循环时重新创建）"""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _purge(self, now):
+        while self._events and now - self._events[0][0] >= self.window:
+            _, tokens = self._events.popleft()
+            self._tokens -= tokens
+
+    async def acquire(self, tokens=0):
+        """等待直到窗口内还有请求和token额度，然后占用
+
+        Args:
+            tokens: 本次请求预计消耗的token数（提示与最大输出之和）
+        """
+        async with self._get_lock():
+            while True:
+                now = time.monotonic()
+                self._purge(now)
+                requests_ok = self.rpm is None or len(self._events) < self.rpm
+                # 单个请求超过TPM时，只要窗口为空就放行，避免永久等待
+                tokens_ok = self.tpm is None or self._tokens + tokens <= self.tpm or not self._events
+                if requests_ok and tokens_ok:
+                    self._events.append((now, tokens))
+                    self._tokens += tokens
+                    return
+                await asyncio.sleep(max(0.01, self.window - (now - self._events[0][0])))
+
+
+class SharedRateLimiter:
+    """多个进程共用的RPM/TPM限速器（令牌桶）
+
+    剩余的请求数和token数保存在共享内存中，按 rpm/tpm 每窗口的速度恢复，
+    所有子进程从同一个桶中取额度，总速率不超过限制。需要在创建进程池之前创建，通过进程参数传给子进程。
+    """
+
+    def __init__(self, rpm=500, tpm=200000, window=60.0):
+        """初始化限速器
+
+        Args:
+            rpm: 每分钟最多请求数，None表示不限制
+            tpm: 每分钟最多token数，None表示不限制
+            window: 窗口长度（秒）
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = window
+        # 剩余请求数、剩余token数、上次更新时间（CLOCK_MONOTONIC 在进程之间一致）
+        self._state = multiprocessing.Array('d', [rpm or 0, tpm or 0, time.monotonic()])
+
+    def try_acquire(self, tokens=0):
+        """尝试占用额度
+
+        Returns:
+            还需等待的秒数，0表示已占用
+        """
+        with self._state.get_lock():
+            requests, available, last = self._state[:]
+            now = time.monotonic()
+            elapsed = max(0.0, now - last)
+            wait = 0.0
+            if self.rpm:
+                requests = min(self.rpm, requests + elapsed * self.rpm / self.window)
+                if requests < 1:
+                    wait = (1 - requests) * self.window / self.rpm
+            if self.tpm:
+                available = min(self.tpm, available + elapsed * self.tpm / self.window)
+                # 单个请求超过TPM时，桶满即放行，避免永久等待
+                needed = min(tokens, self.tpm)
+                if available < needed:
+                    wait = max(wait, (needed - available) * self.window / self.tpm)
+            if not wait:
+                requests -= 1
+                available -= min(tokens, self.tpm or 0)
+            self._state[:] = [requests, available, now]
+            return wait
+
+    async def acquire(self, tokens=0):
+        """等待直到共享的桶中还有请求和token额度，然后占用
+
+        Args:
+            tokens: 本次请求预计消耗的token数（提示与最大输出之和）
+        """
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            await asyncio.sleep(max(0.01, wait))
+
+
+class AsyncRelationExtractor:
+    """并发的大模型关系抽取
+
+    所有批次在同一个事件循环中运行，共用一个 AsyncOpenAI 客户端和一个 RateLimiter，
+    RPM/TPM 限制在整个运行期间持续生效；信号量限制并发数，
+    遇到429和5xx等错误按 Retry-After 或指数退避重试。结果按文档顺序返回。
+    设置 pack_tokens 时，按token预算把多篇短文档合并为一个带文档编号的请求，
+    分摊固定的指令提示，显著减少小页面语料的请求数。
+    """
+
+    def __init__(self, api_key=None, model=LLM_MODEL, temperature=LLM_TEMPERATURE, max_tokens=LLM_MAX_TOKENS,
+                 concurrency=8, rpm=500, tpm=200000, max_retries=5, base_delay=1.0, max_delay=60.0,
+                 timeout=60.0, cache=None, pack_tokens=0, pack_max_docs=8, packed_max_tokens=LLM_PACKED_MAX_TOKENS,
+                 max_chars=8000):
+        """初始化抽取器
+
+        Args:
+            api_key: OpenAI API密钥，默认读取环境变量 OPENAI_API_KEY
+            model: 模型名称
+            temperature: 采样温度
+            max_tokens: 每个请求的最大输出token数
+            concurrency: 最大并发请求数
+            rpm: 每分钟最多请求数
+            tpm: 每分钟最多token数
+            max_retries: 最多重试次数
+            base_delay: 指数退避的初始等待时间（秒）
+            max_delay: 单次等待的上限（秒）
+            timeout: 单个请求的超时时间（秒）
+            cache: LLMCache 实例，命中的文档不再请求大模型
+            pack_tokens: 每个打包请求中文档的token总数上限，0表示不打包
+            pack_max_docs: 每个打包请求的最多文档数
+            packed_max_tokens: 打包请求的最大输出token数
+            max_chars: 单文档提示的文本截断长度，应与文档窗口长度一致，使窗口不被截断
+        """
+        self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.concurrency = concurrency
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.cache = cache
+        self.pack_tokens = pack_tokens
+        self.pack_max_docs = pack_max_docs
+        self.packed_max_tokens = packed_max_tokens
+        self.max_chars = max_chars
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0, 'packed_requests': 0, 'packed_documents': 0}
+        self.limiter = RateLimiter(rpm, tpm)
+        # 客户端的连接池绑定事件循环，由 extract 在同一个持久事件循环中创建和复用
+        self._client = None
+        self._loop = None
+
+    def client(self):
+        """返回共用的 AsyncOpenAI 客户端（首次使用时创建）"""
+        if self._client is None:
+            from openai import AsyncOpenAI
+            # 重试由本类统一控制，客户端自身不再重试
+            self._client = AsyncOpenAI(api_key=self.api_key, max_retries=0, timeout=self.timeout)
+        return self._client
+
+    async def complete(self, client, semaphore, limiter, prompt, max_tokens=None):
+        """发送一个聊天请求，失败时退避重试
+
+        Returns:
+            大模型返回的文本，重试耗尽或遇到不可重试的错误时返回None
+        """
+        max_tokens = max_tokens or self.max_tokens
+        tokens = count_tokens(SYSTEM_PROMPT, self.model) + count_tokens(prompt, self.model) + max_tokens
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+                await limiter.acquire(tokens)
+                try:
+                    self.stats['requests'] += 1
+                    response = await client.chat.completions.create(
+                        model=self.model,
+                        messages=build_messages(prompt),
+                        temperature=self.temperature,
+                        max_tokens=max_tokens
+                    )
+                    return response.choices[0].message.content
+                except Exception as e:
+                    if attempt < self.max_retries and is_retryable(e):
+                        delay = retry_delay(e, attempt, self.base_delay, self.max_delay)
+                        self.stats['retries'] += 1
+                        logger.warning(f"OpenAI API请求失败（{type(e).__name__}），{delay:.1f} 秒后第 {attempt + 1} 次重试")
+                        await asyncio.sleep(delay)
+                        continue
+                    self.stats['failures'] += 1
+                    logger.error(f"调用OpenAI API失败: {str(e)}")
+                    return None
+        return None
+
+    async def extract_prompts_async(self, prompts):
+        """并发发送多个提示
+
+        Args:
+            prompts: (用户提示, 最大输出token数) 列表
+
+        Returns:
+            与prompts一一对应的返回文本（失败为None）
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        client = self.client()
+        return await asyncio.gather(*(self.complete(client, semaphore, self.limiter, prompt, max_tokens)
+                                      for prompt, max_tokens in prompts))
+
+    def pack(self, documents):
+        """按token预算把文档分组，未开启打包时每篇文档单独一组
+
+        Returns:
+            文档下标分组的列表
+        """
+        if not self.pack_tokens or len(documents) < 2:
+            return [[i] for i in range(len(documents))]
+        token_counts = [count_tokens(build_document_block('D0', text, entities), self.model)
+                        for text, entities in documents]
+        return pack_documents(token_counts, self.pack_tokens, self.pack_max_docs)
+
+    async def run_groups(self, documents, groups, relations):
+        """请求各个文档分组，把结果写入relations
+
+        单篇文档使用单文档提示，多篇文档使用带编号的打包提示；每个分组的结果分别缓存。
+
+        Returns:
+            打包响应无法解析或缺少其结果、需要逐篇重新请求的文档下标列表
+        """
+        requests = []
+        for group in groups:
+            if len(group) == 1:
+                text, entities = documents[group[0]]
+                requests.append((group, build_relation_prompt(text, entities, self.max_chars), self.max_tokens))
+            else:
+                requests.append((group, build_packed_prompt([documents[i] for i in group]), self.packed_max_tokens))
+
+        # 只请求缓存未命中的分组（打包分组缓存每篇文档的关系列表）
+        pending = []
+        for group, prompt, max_tokens in requests:
+            cached = None
+            if self.cache is not None:
+                cached = self.cache.get(build_messages(prompt), self.model, self.temperature)
+            if cached is None:
+                pending.append((group, prompt, max_tokens))
+            elif len(group) == 1:
+                relations[group[0]] = cached
+            else:
+                for i, document_relations in zip(group, cached):
+                    relations[i] = document_relations
+
+        retry = []
+        results = await self.extract_prompts_async([(prompt, max_tokens) for _, prompt, max_tokens in pending])
+        for (group, prompt, _), result in zip(pending, results):
+            if result is None:
+                for i in group:
+                    relations[i] = []
+                continue
+            if len(group) == 1:
+                parsed = parse_relations(result)
+                if parsed is None:
+                    # 无法解析的响应不写入缓存，下次运行重新请求
+                    relations[group[0]] = []
+                    continue
+                relations[group[0]] = parsed
+            else:
+                self.stats['packed_requests'] += 1
+                self.stats['packed_documents'] += len(group)
+                parsed = parse_packed_relations(result, len(group))
+                if parsed is None:
+                    retry.extend(group)
+                    continue
+                for i, document_relations in zip(group, parsed):
+                    if document_relations is None:
+                        retry.append(i)
+                    else:
+                        relations[i] = document_relations
+                if None in parsed:
+                    # 部分文档缺少结果时不缓存该分组，缺少的文档逐篇请求后分别缓存
+                    continue
+            if self.cache is not None:
+                self.cache.put(build_messages(prompt), self.model, self.temperature, parsed)
+        return retry
+
+    async def extract_async(self, documents):
+        """并发抽取多个文档的关系
+
+        Args:
+            documents: (文本, 实体列表) 列表
+
+        Returns:
+            与documents一一对应的关系列表
+        """
+        relations = [None] * len(documents)
+        retry = await self.run_groups(documents, self.pack(documents), relations)
+        if retry:
+            logger.warning(f"{len(retry)} 篇文档的打包响应无法解析或缺少其结果，改为逐篇请求")
+            await self.run_groups(documents, [[i] for i in retry], relations)
+        return relations
+
+    def extract(self, documents):
+        """extract_async 的同步入口，各批次在同一个持久事件循环中运行
+
+        Args:
+            documents: (文本, 实体列表) 列表
+
+        Returns:
+            与documents一一对应的关系列表
+        """
+        if not documents:
+            return []
+        start_time = time.time()
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        relations = self._loop.run_until_complete(self.extract_async(documents))
+        logger.info(f"并发大模型关系抽取完成: {len(documents)} 个文档，耗时 {time.time() - start_time:.2f} 秒，"
+                    f"共 {sum(map(len, relations))} 个关系，统计: {self.stats}")
+        return relations
+
+    def close(self):
+        """关闭共用的客户端和事件循环"""
+        if self._loop is None or self._loop.is_closed():
+            return
+        if self._client is not None:
+            self._loop.run_until_complete(self._client.close())
+            self._client = None
+        self._loop.close()
@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """大模型关系抽取结果的持久缓存
+
+    以提示（全部消息）、模型和采样温度的哈希为键，保存解析后的关系列表，存放在SQLite中。
+    超过有效期的条目视为未命中并删除；总大小超过上限时按最近访问时间淘汰（LRU）。
+    多个进程可以共用同一个缓存文件。
+    """
+
+    def __init__(self, db_path, max_bytes=256 * 1024 * 1024, max_age=30 * 24 * 3600):
+        """初始化缓存
+
+        Args:
+            db_path: SQLite数据库文件路径
+            max_bytes: 缓存结果的总大小上限（字节）
+            max_age: 条目的有效期（秒），None表示永不过期
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        # 进程池中的各个子进程会同时读写同一个文件，使用WAL模式并等待锁释放
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+        CREATE TABLE IF NOT EXISTS completions (
+            key TEXT PRIMARY KEY,
+            model TEXT,
+            relations TEXT,
+            size INTEGER,
+            created_at REAL,
+            accessed_at REAL
+        )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_completions_accessed ON completions (accessed_at)')
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(messages, model, temperature):
+        """由提示消息、模型和采样温度生成缓存键"""
+        payload = json.dumps({'messages': messages, 'model': model, 'temperature': temperature},
+                             ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, messages, model, temperature):
+        """读取缓存
+
+        Args:
+            messages: 聊天消息列表
+            model: 模型名称
+            temperature: 采样温度
+
+        Returns:
+            关系列表，未命中或已过期时返回None
+        """
+        key = self.make_key(messages, model, temperature)
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT relations, created_at FROM completions WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            if self.max_age is not None and now - row[1] > self.max_age:
+                self.conn.execute('DELETE FROM completions WHERE key = ?', (key,))
+                self.conn.commit()
+                self.misses += 1
+                return None
+
+            self.conn.execute('UPDATE completions SET accessed_at = ? WHERE key = ?', (now, key))
+            self.conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, messages, model, temperature, relations):
+        """写入缓存
+
+        Args:
+            messages: 聊天消息列表
+            model: 模型名称
+            temperature: 采样温度
+            relations: 解析后的关系列表
+        """
+        key = self.make_key(messages, model, temperature)
+        data = json.dumps(relations, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?, ?)',
+                (key, model, data, len(data.encode('utf-8')), now, now)
+            )
+            self.conn.commit()
+            self._evict()
+
+    def _evict(self):
+        """删除过期条目，并淘汰最久未访问的条目直到总大小不超过上限（调用方需持有锁）"""
+        expired = 0
+        if self.max_age is not None:
+            expired = self.conn.execute(
+                'DELETE FROM completions WHERE created_at < ?', (time.time() - self.max_age,)
+            ).rowcount
+
+        total = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM completions').fetchone()[0]
+        evicted = 0
+        if total > self.max_bytes:
+            for key, size in self.conn.execute(
+                'SELECT key, size FROM completions ORDER BY accessed_at ASC'
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                self.conn.execute('DELETE FROM completions WHERE key = ?', (key,))
+                total -= size
+                evicted += 1
+
+        self.conn.commit()
+        if expired or evicted:
+            logger.info(f"大模型缓存已删除 {expired} 个过期条目，淘汰 {evicted} 个条目")
+
+    def stats(self):
+        """返回缓存统计信息"""
+        with self._lock:
+            count, total = self.conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions'
+            ).fetchone()
+        return {'entries': count, 'bytes': total, 'hits': self.hits, 'misses': self.misses}
+
+    def close(self):
+        """关闭数据库"""
+        with self._lock:
+            self.conn.close()
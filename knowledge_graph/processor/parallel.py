@@ -0,0 +1,200 @@
+import os
+import time
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from knowledge_graph.processor.processor import KnowledgeProcessor
+from knowledge_graph.processor.cascade import SharedBudget
+from knowledge_graph.processor.llm import SharedRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# 子进程中预先加载好模型和词典的处理器，由 _init_worker 在进程启动时创建一次
+_worker_processor = None
+
+
+def _init_worker(kwargs, budget=None, limiter=None):
+    """子进程初始化：加载spaCy模型、jieba和自定义词典，之后的文档块都复用该处理器
+
+    Args:
+        kwargs: KnowledgeProcessor 的构造参数
+        budget: 所有子进程共用的级联抽取预算（SharedBudget）
+        limiter: 所有子进程共用的大模型限速器（SharedRateLimiter）
+    """
+    global _worker_processor
+    _worker_processor = KnowledgeProcessor(**kwargs)
+    if budget is not None and _worker_processor.cascade is not None:
+        _worker_processor.cascade.budget_pool = budget
+    if limiter is not None and _worker_processor.llm_extractor is not None:
+        _worker_processor.llm_extractor.limiter = limiter
+
+
+def _process_chunk(args):
+    """在子进程中对一块文档提取实体和关系
+
+    Args:
+        args: (文件序号, 文档文本列表)
+
+    Returns:
+        (文件序号, 与文档一一对应的 (实体列表, 关系列表), (进程号, 大模型缓存累计(命中数, 未命中数), 级联抽取累计统计))
+    """
+    file_index, texts = args
+    results = _worker_processor.process_texts(texts)
+    cache = _worker_processor.llm_cache
+    cascade = _worker_processor.cascade
+    counters = (os.getpid(), (cache.hits, cache.misses) if cache is not None else None,
+                cascade.summary() if cascade is not None else None)
+    return file_index, results, counters
+
+
+class ParallelProcessor:
+    """使用进程池并行提取实体和关系
+
+    主进程负责读取、清洗和近似重复检测（有状态，需要按顺序进行），
+    并把文档按块分发给子进程；每个子进程启动时只加载一次spaCy、jieba和自定义词典。
+    结果按文件和文档顺序收集，与串行处理的输出一致，最后由 merge_and_deduplicate 合并。
+    """
+
+    def __init__(self, processor, processes=None, chunksize=16, stream=False):
+        """初始化并行处理器
+
+        Args:
+            processor: 主进程中的 KnowledgeProcessor，提供数据读取、去重和合并
+            processes: 进程数，默认使用全部CPU核心
+            chunksize: 每次分发给子进程的文档数
+            stream: 是否逐个元素惰性读取 .json 数据文件
+        """
+        self.processor = processor
+        self.processes = processes or os.cpu_count() or 1
+        self.chunksize = max(1, chunksize)
+        self.stream = stream
+
+    def worker_kwargs(self):
+        """子进程中 KnowledgeProcessor 的构造参数
+
+        近似重复检测已在主进程完成，子进程内的spaCy不再开启多进程；
+        大模型的RPM/TPM额度和级联抽取的调用预算不在子进程之间平分，由 shared_limits 创建的共享对象统一分配。
+        """
+        cache = self.processor.llm_cache
+        return {
+            'input_dir': self.processor.input_dir,
+            'output_dir': self.processor.output_dir,
+            'use_openai': self.processor.use_openai,
+            'skip_near_duplicates': False,
+            'ner_batch_size': self.processor.ner_batch_size,
+            'ner_processes': 1,
+            'llm_concurrency': self.processor.llm_concurrency,
+            'llm_pack_tokens': self.processor.llm_pack_tokens,
+            'llm_cache': cache is not None,
+            'llm_cache_max_mb': cache.max_bytes // (1024 * 1024) if cache is not None else 256,
+            'llm_cache_max_age_days': cache.max_age / (24 * 3600) if cache is not None and cache.max_age else None,
+            'ner_chunk_chars': self.processor.ner_chunk_chars,
+            'llm_chunk_chars': self.processor.llm_chunk_chars,
+            'chunk_overlap': self.processor.chunk_overlap,
+            'cascade': self.processor.cascade is not None,
+            'cascade_threshold': self.processor.cascade_threshold,
+            'cascade_budget': self.processor.cascade_budget,
+            'llm_rpm': self.processor.llm_rpm,
+            'llm_tpm': self.processor.llm_tpm
+        }
+
+    def shared_limits(self):
+        """创建所有子进程共用的级联抽取预算和大模型限速器
+
+        Returns:
+            (SharedBudget 或 None, SharedRateLimiter 或 None)，不需要时为None
+        """
+        processor = self.processor
+        budget = None
+        if processor.cascade is not None and processor.cascade_budget is not None:
+            budget = SharedBudget(processor.cascade_budget)
+        limiter = None
+        if processor.llm_extractor is not None and (processor.llm_rpm or processor.llm_tpm):
+            limiter = SharedRateLimiter(processor.llm_rpm, processor.llm_tpm)
+        return budget, limiter
+
+    def iter_chunks(self, filenames):
+        """按文件顺序读取文档并切分为块
+
+        Yields:
+            (文件序号, 文档文本列表)
+        """
+        for file_index, filename in enumerate(filenames):
+            logger.info(f"处理文件: {filename}")
+            chunk = []
+            for text in self.processor.iter_texts(filename, self.stream):
+                chunk.append(text)
+                if len(chunk) >= self.chunksize:
+                    yield file_index, chunk
+                    chunk = []
+            if chunk:
+                yield file_index, chunk
+
+    def iter_results(self, filenames):
+        """并行处理多个数据文件，按文件和文档顺序逐个产出结果
+
+        同时在途的文档块不超过进程数的两倍，主进程中驻留的文档数与语料规模无关。
+
+        Args:
+            filenames: 文件名列表
+
+        Yields:
+            每篇文档的 (文件序号, 实体列表, 关系列表)
+        """
+        start_time = time.time()
+        documents = 0
+        # 进程号 -> 该子进程最近一次返回的累计统计
+        worker_counters = {}
+
+        def collect(future):
+            file_index, results, counters = future.result()
+            worker_counters[counters[0]] = counters[1:]
+            return file_index, results
+
+        with ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker,
+                                 initargs=(self.worker_kwargs(), *self.shared_limits())) as executor:
+            # 限制同时在途的文档块数量，避免一次读入全部文档；按提交顺序收集结果，与串行处理的顺序一致
+            pending = deque()
+            chunks = self.iter_chunks(filenames)
+            while True:
+                for chunk in chunks:
+                    pending.append(executor.submit(_process_chunk, chunk))
+                    if len(pending) >= self.processes * 2:
+                        break
+                if not pending:
+                    break
+                file_index, results = collect(pending.popleft())
+                documents += len(results)
+                for entities, relations in results:
+                    yield file_index, entities, relations
+
+        elapsed = time.time() - start_time
+        logger.info(f"并行处理完成: {documents} 个文档，{self.processes} 个进程，"
+                    f"耗时 {elapsed:.2f} 秒，{documents / max(elapsed, 1e-9):.2f} 文档/秒")
+        cache_counts = [cache for cache, _ in worker_counters.values() if cache is not None]
+        if cache_counts:
+            hits = sum(h for h, _ in cache_counts)
+            misses = sum(m for _, m in cache_counts)
+            logger.info(f"大模型缓存统计（全部子进程）: 命中 {hits}，未命中 {misses}")
+        cascade_stats = [cascade for _, cascade in worker_counters.values() if cascade is not None]
+        if cascade_stats:
+            documents_seen = sum(c['documents'] for c in cascade_stats)
+            llm_calls = sum(c['llm_calls'] for c in cascade_stats)
+            logger.info(f"级联抽取统计（全部子进程）: {documents_seen} 篇文档，调用大模型 {llm_calls} 篇，"
+                        f"节省 {documents_seen - llm_calls} 次调用")
+
+    def process_files(self, filenames):
+        """并行处理多个数据文件
+
+        Args:
+            filenames: 文件名列表
+
+        Returns:
+            (每个文件的实体列表, 每个文件的关系列表)，与逐个调用 process_file 的结果相同
+        """
+        entities_list = [[] for _ in filenames]
+        relations_list = [[] for _ in filenames]
+        for file_index, entities, relations in self.iter_results(filenames):
+            entities_list[file_index].extend(entities)
+            relations_list[file_index].extend(relations)
+        return entities_list, relations_list
@@ -10,6 +10,16 @@ import openai
 import time
 from collections import defaultdict
 from urllib.parse import quote
+from knowledge_graph.utils.terms import KG_TERMS, load_terms
+from knowledge_graph.utils.term_matcher import TermMatcher
+from knowledge_graph.utils.jsonl import iter_jsonl, iter_json_array
+from knowledge_graph.processor.dedup import NearDuplicateDetector
+from knowledge_graph.processor.relation_engine import RELATION_PATTERNS, RelationPatternEngine
+from knowledge_graph.processor.llm_cache import LLMCache
+from knowledge_graph.processor.cascade import CascadeSelector
+from knowledge_graph.processor.chunking import sliding_windows, merge_chunk_entities, merge_chunk_relations
+from knowledge_graph.processor.llm import (LLM_MODEL, LLM_TEMPERATURE, LLM_MAX_TOKENS, AsyncRelationExtractor,
+                                           build_messages, build_relation_prompt, parse_relations)
 
 # 配置日志
 logging.basicConfig(
@@ -21,17 +31,59 @@ logger = logging.getLogger(__name__)
 class KnowledgeProcessor:
     """知识处理器，用于清洗和处理爬取的数据，并提取实体和关系"""
     
-    def __init__(self, input_dir='knowledge_graph/data', output_dir='knowledge_graph/data', use_openai=True):
+    def __init__(self, input_dir='knowledge_graph/data', output_dir='knowledge_graph/data', use_openai=True,
+                 skip_near_duplicates=True, ner_batch_size=64, ner_processes=1, processes=1,
+                 llm_concurrency=8, llm_rpm=500, llm_tpm=200000, llm_cache=True,
+                 llm_cache_max_mb=256, llm_cache_max_age_days=30, ner_chunk_chars=10000, llm_chunk_chars=8000,
+                 chunk_overlap=200, llm_pack_tokens=3000, cascade=False, cascade_threshold=0.5,
+                 cascade_budget=None, streaming=False, stream_window=64):
         """初始化处理器
         
         Args:
             input_dir: 输入数据目录
             output_dir: 输出数据目录
             use_openai: 是否使用OpenAI API
+            skip_near_duplicates: 是否在抽取前跳过近似重复的文档（跨文件、跨数据源）
+            ner_batch_size: spaCy批量命名实体识别（nlp.pipe）的批大小
+            ner_processes: spaCy命名实体识别的进程数
+            processes: 文档处理的进程数，大于1时使用进程池并行提取实体和关系
+            llm_concurrency: 大模型关系抽取的并发请求数，大于1时每批文档并发请求，否则逐个文档同步请求
+            llm_rpm: 大模型每分钟最多请求数
+            llm_tpm: 大模型每分钟最多token数
+            llm_cache: 是否把大模型抽取结果缓存到 output_dir/llm_cache.sqlite，重复运行时不再请求API
+            llm_cache_max_mb: 大模型缓存的大小上限（MB）
+            llm_cache_max_age_days: 大模型缓存条目的有效期（天）
+            ner_chunk_chars: 命名实体识别的窗口长度，更长的文档按句子切分为重叠窗口
+            llm_chunk_chars: 大模型关系抽取的窗口长度，更长的文档按句子切分为重叠窗口分别请求
+            chunk_overlap: 相邻窗口的最大重叠长度
+            llm_pack_tokens: 并发抽取时把多篇短文档合并为一个请求的token预算，0表示每篇文档单独请求
+            cascade: 是否使用级联抽取，只对模式匹配覆盖不足、预期收益高的文档调用大模型
+            cascade_threshold: 级联抽取调用大模型的最低得分
+            cascade_budget: 级联抽取的大模型调用次数（文档数）上限，None表示不限制
+            streaming: 是否使用流式处理，文档逐个读取和抽取，结果去重后增量写入输出文件
+            stream_window: 流式处理时每次送入抽取的文档数，决定同时驻留内存的文档上限
         """
         self.input_dir = input_dir
         self.output_dir = output_dir
         self.use_openai = use_openai
+        self.ner_batch_size = ner_batch_size
+        self.ner_processes = ner_processes
+        self.processes = processes
+        self.llm_concurrency = llm_concurrency
+        self.llm_rpm = llm_rpm
+        self.llm_tpm = llm_tpm
+        self.ner_chunk_chars = ner_chunk_chars
+        self.llm_chunk_chars = llm_chunk_chars
+        self.chunk_overlap = chunk_overlap
+        self.llm_pack_tokens = llm_pack_tokens
+        self.cascade_threshold = cascade_threshold
+        self.cascade_budget = cascade_budget
+        self.streaming = streaming
+        self.stream_window = stream_window
+        
+        # 近似重复文档检测，按数据源统计重复率
+        self.dedup = NearDuplicateDetector() if skip_near_duplicates else None
+        self.dedup_stats = defaultdict(lambda: {'total': 0, 'duplicates': 0})
         
         # 确保输出目录存在
         if not os.path.exists(output_dir):
@@ -48,50 +100,30 @@ class KnowledgeProcessor:
             self.nlp = spacy.blank('zh')
             logger.warning("使用空的中文Pipeline作为备用")
         
+        # 只使用 doc.ents，关闭命名实体识别不需要的组件（词性标注、句法分析等）
+        disabled = self.unused_pipes()
+        if disabled:
+            self.nlp.select_pipes(disable=disabled)
+            logger.info(f"已关闭spaCy组件: {disabled}，保留: {self.nlp.pipe_names}")
+        
         # 加载jieba
         jieba.initialize()
         logger.info("已加载jieba分词")
         
         # 预定义的知识图谱相关术语 - 移到load_custom_dict()调用之前
-        self.kg_terms = [
-            "知识图谱", "本体论", "语义网", "RDF", "SPARQL", "图数据库", 
-            "三元组", "实体", "关系", "属性", "类别", "子类", "推理", 
-            "链接数据", "知识抽取", "知识表示", "知识推理", "知识融合",
-            "本体", "词向量", "语义", "查询", "数据挖掘", "机器学习",
-            "自然语言处理", "NLP", "实体识别", "命名实体", "关系抽取",
-            "知识库", "知识工程", "语义网络", "语义框架", "语义角色",
-            "知识表示与推理", "知识获取", "知识发现", "知识计算", "知识问答",
-            "图谱构建", "图谱应用", "图谱可视化", "图谱查询", "图谱推理",
-            "图谱融合", "图谱存储", "图谱更新", "图谱评估", "图谱标准",
-            "语义搜索", "语义推理", "语义标注", "语义计算", "语义集成"
-        ]
+        self.kg_terms = list(KG_TERMS)
         
         # 加载自定义词典
         self.load_custom_dict()
         
-        # 关系模式
-        self.relation_patterns = [
-            {"pattern": "是", "relation": "is_a"},
-            {"pattern": "包括", "relation": "includes"},
-            {"pattern": "包含", "relation": "contains"},
-            {"pattern": "属于", "relation": "belongs_to"},
-            {"pattern": "由", "relation": "composed_of"},
-            {"pattern": "用于", "relation": "used_for"},
-            {"pattern": "基于", "relation": "based_on"},
-            {"pattern": "应用于", "relation": "applied_to"},
-            {"pattern": "定义为", "relation": "defined_as"},
-            {"pattern": "等同于", "relation": "equivalent_to"},
-            {"pattern": "产生", "relation": "produces"},
-            {"pattern": "导致", "relation": "leads_to"},
-            {"pattern": "依赖于", "relation": "depends_on"},
-            {"pattern": "相关于", "relation": "related_to"},
-            {"pattern": "源自", "relation": "derived_from"},
-            {"pattern": "影响", "relation": "affects"},
-            {"pattern": "支持", "relation": "supports"},
-            {"pattern": "实现", "relation": "implements"},
-            {"pattern": "扩展", "relation": "extends"},
-            {"pattern": "使用", "relation": "uses"}
-        ]
+        # 词典中的全部术语编译为Aho-Corasick自动机，一次扫描即可匹配所有术语
+        self.kg_terms = list(dict.fromkeys(self.kg_terms + load_terms(os.path.join(self.output_dir, 'kg_dict.txt'))))
+        self.term_matcher = TermMatcher(self.kg_terms)
+        logger.info(f"已构建术语匹配自动机，共 {len(self.term_matcher)} 个术语")
+        
+        # 关系模式，由线性时间的模式抽取引擎统一匹配
+        self.relation_patterns = [dict(p) for p in RELATION_PATTERNS]
+        self.relation_engine = RelationPatternEngine(self.relation_patterns)
         
         # 初始化OpenAI API
         if self.use_openai:
@@ -107,6 +139,42 @@ class KnowledgeProcessor:
             except Exception as e:
                 logger.error(f"初始化OpenAI API失败: {str(e)}")
                 self.use_openai = False
+        
+        # 大模型抽取结果的持久缓存
+        self.llm_cache = None
+        if self.use_openai and llm_cache:
+            self.llm_cache = LLMCache(os.path.join(self.output_dir, 'llm_cache.sqlite'),
+                                      max_bytes=llm_cache_max_mb * 1024 * 1024,
+                                      max_age=llm_cache_max_age_days * 24 * 3600 if llm_cache_max_age_days else None)
+            logger.info(f"已启用大模型缓存: {self.llm_cache.db_path}，{self.llm_cache.stats()['entries']} 个条目")
+        
+        # 级联抽取的文档选择器，以上次运行输出的图谱计算新颖度
+        self.cascade = None
+        if self.use_openai and cascade:
+            self.cascade = CascadeSelector.from_graph(self.output_dir, threshold=cascade_threshold,
+                                                      budget=cascade_budget)
+        
+        # 同步抽取共用的OpenAI客户端（首次使用时创建）和并发抽取器
+        self.openai_client = None
+        self.llm_extractor = None
+        if self.use_openai and self.llm_concurrency > 1:
+            self.llm_extractor = AsyncRelationExtractor(concurrency=self.llm_concurrency,
+                                                        rpm=self.llm_rpm, tpm=self.llm_tpm, cache=self.llm_cache,
+                                                        pack_tokens=self.llm_pack_tokens,
+                                                        max_chars=self.llm_chunk_chars)
+    
+    def unused_pipes(self):
+        """返回命名实体识别用不到的spaCy组件名称
+
+        保留ner以及ner所监听的共享组件（如tok2vec），其余组件全部关闭。
+        """
+        if 'ner' not in self.nlp.pipe_names:
+            return []
+        keep = {'ner'}
+        for name in self.nlp.pipe_names:
+            if 'ner' in getattr(self.nlp.get_pipe(name), 'listening_components', []):
+                keep.add(name)
+        return [name for name in self.nlp.pipe_names if name not in keep]
     
     def load_custom_dict(self):
         """加载自定义词典"""
@@ -123,39 +191,64 @@ class KnowledgeProcessor:
         jieba.load_userdict(kg_dict_path)
         logger.info(f"已加载自定义词典: {kg_dict_path}")
     
-    def load_data(self, filename):
+    def normalize_agent_item(self, item):
+        """规范化agent抓取的数据条目，确保每个条目都有所需的字段"""
+        return {
+            'title': item.get('title', ''),
+            'url': item.get('url', ''),
+            'summary': item.get('summary', ''),
+            'content': item.get('content', ''),
+            'source': item.get('source', 'agent')
+        }
+    
+    def load_data(self, filename, stream=False):
         """加载数据文件
         
         Args:
-            filename: 文件名
+            filename: 文件名，.jsonl 文件按行惰性读取
+            stream: 是否逐个元素惰性读取 .json 文件，而不是一次载入整个数组
         
         Returns:
-            加载的数据
+            加载的数据（.json 文件为列表，.jsonl 文件或 stream 为True时为生成器）
         """
         filepath = os.path.join(self.input_dir, filename)
+        # 对于从agent获取的数据，其结构可能不同，需要特殊处理
+        is_agent_data = os.path.splitext(filename)[0] == 'agent_kg_data'
+        
+        if filename.endswith('.jsonl') or stream:
+            data = iter_jsonl(filepath) if filename.endswith('.jsonl') else iter_json_array(filepath)
+            if is_agent_data:
+                return (self.normalize_agent_item(item) for item in data)
+            return data
+        
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             
-            # 对于从agent获取的数据，其结构可能不同，需要特殊处理
-            if filename == 'agent_kg_data.json':
-                # 确保数据格式一致，每个条目都有所需的字段
-                processed_data = []
-                for item in data:
-                    processed_item = {
-                        'title': item.get('title', ''),
-                        'url': item.get('url', ''),
-                        'summary': item.get('summary', ''),
-                        'content': item.get('content', ''),
-                        'source': item.get('source', 'agent')
-                    }
-                    processed_data.append(processed_item)
-                return processed_data
+            if is_agent_data:
+                return [self.normalize_agent_item(item) for item in data]
             return data
         except Exception as e:
             logger.error(f"加载数据文件 {filepath} 失败: {str(e)}")
             return []
     
+    def list_data_files(self):
+        """列出输入目录中待处理的数据文件
+        
+        同名的 .jsonl 和 .json 同时存在时（.json 为导出副本），只处理 .jsonl。
+        
+        Returns:
+            文件名列表
+        """
+        files = os.listdir(self.input_dir)
+        jsonl_stems = {os.path.splitext(f)[0] for f in files if f.endswith('.jsonl')}
+        data_files = []
+        for f in sorted(files):
+            stem, ext = os.path.splitext(f)
+            if ext == '.jsonl' or (ext == '.json' and stem not in jsonl_stems):
+                data_files.append(f)
+        return data_files
+    
     def clean_text(self, text):
         """清洗文本数据
         
@@ -179,6 +272,33 @@ class KnowledgeProcessor:
         
         return clean.strip()
     
+    def is_duplicate(self, item, text):
+        """判断文档是否与之前处理过的文档近似重复
+        
+        Args:
+            item: 文档数据条目
+            text: 用于比较的正文
+        
+        Returns:
+            是否重复
+        """
+        stats = self.dedup_stats[item.get('source', 'unknown')]
+        stats['total'] += 1
+        
+        duplicate_of = self.dedup.add(item.get('url') or item.get('title', ''), text)
+        if duplicate_of is None:
+            return False
+        
+        stats['duplicates'] += 1
+        logger.info(f"跳过近似重复文档: {item.get('url') or item.get('title', '')}（与 {duplicate_of} 重复）")
+        return True
+    
+    def report_duplicates(self):
+        """按数据源输出重复率"""
+        for source, stats in self.dedup_stats.items():
+            ratio = stats['duplicates'] / stats['total'] if stats['total'] else 0
+            logger.info(f"数据源 {source}: 共 {stats['total']} 篇，近似重复 {stats['duplicates']} 篇，重复率 {ratio:.1%}")
+    
     def extract_entities_with_jieba(self, text):
         """使用jieba提取实体
         
@@ -250,32 +370,70 @@ class KnowledgeProcessor:
         
         return entities
     
-    def extract_entities(self, text):
+    def doc_entities(self, doc):
+        """将spaCy文档中的命名实体转换为实体列表"""
+        return [entity for _, _, entity in self.doc_entity_spans(doc)]
+    
+    def doc_entity_spans(self, doc):
+        """将spaCy文档中的命名实体转换为 (起始位置, 结束位置, 实体) 列表"""
+        return [(ent.start_char, ent.end_char, {
+            'text': ent.text,
+            'label': ent.label_,
+            'type': 'NER'
+        }) for ent in doc.ents if len(ent.text) > 1]  # 过滤单字实体
+    
+    def extract_ner_entities_batch(self, texts):
+        """使用 nlp.pipe 批量提取命名实体
+        
+        超过 ner_chunk_chars 的文本按句子切分为重叠窗口，全部窗口一起成批处理，
+        再按原文位置合并，重叠区域中的同一实体只保留一次。
+        
+        Args:
+            texts: 文本列表
+        
+        Returns:
+            与texts一一对应的命名实体列表
+        """
+        chunks_list = [sliding_windows(text, self.ner_chunk_chars, self.chunk_overlap) for text in texts]
+        chunk_texts = [chunk.text for chunks in chunks_list for chunk in chunks]
+        
+        spans = None
+        try:
+            docs = self.nlp.pipe(chunk_texts, batch_size=self.ner_batch_size, n_process=self.ner_processes)
+            spans = [self.doc_entity_spans(doc) for doc in docs]
+        except Exception as e:
+            logger.warning(f"使用spaCy批量提取实体失败，改为逐篇处理: {str(e)}")
+        
+        if spans is None:
+            spans = []
+            for chunk_text in chunk_texts:
+                try:
+                    spans.append(self.doc_entity_spans(self.nlp(chunk_text)))
+                except Exception as e:
+                    logger.warning(f"使用spaCy提取实体失败: {str(e)}")
+                    spans.append([])
+        
+        results = []
+        position = 0
+        for chunks in chunks_list:
+            results.append(merge_chunk_entities(zip(chunks, spans[position:position + len(chunks)])))
+            position += len(chunks)
+        return results
+    
+    def extract_entities(self, text, ner_entities=None):
         """从文本中提取实体
         
         Args:
             text: 输入文本
+            ner_entities: 已通过 extract_ner_entities_batch 得到的命名实体，为None时单独调用spaCy
         
         Returns:
             提取的实体列表
         """
-        entities = []
-        
         # 使用spaCy提取命名实体
-        try:
-            # 限制文本长度，避免处理过大的文本
-            doc = self.nlp(text[:10000])
-            
-            # 提取命名实体
-            for ent in doc.ents:
-                if len(ent.text) > 1:  # 过滤单字实体
-                    entities.append({
-                        'text': ent.text,
-                        'label': ent.label_,
-                        'type': 'NER'
-                    })
-        except Exception as e:
-            logger.warning(f"使用spaCy提取实体失败: {str(e)}")
+        if ner_entities is None:
+            ner_entities = self.extract_ner_entities_batch([text])[0]
+        entities = list(ner_entities)
         
         # 使用jieba提取实体
         jieba_entities = self.extract_entities_with_jieba(text)
@@ -285,14 +443,13 @@ class KnowledgeProcessor:
         regex_entities = self.extract_entities_with_regex(text)
         entities.extend(regex_entities)
         
-        # 查找预定义术语
-        for term in self.kg_terms:
-            if term in text:
-                entities.append({
-                    'text': term,
-                    'label': 'KG_TERM',
-                    'type': 'TERM'
-                })
+        # 查找预定义术语（按术语顺序）
+        for term in self.term_matcher.matched_terms(text):
+            entities.append({
+                'text': term,
+                'label': 'KG_TERM',
+                'type': 'TERM'
+            })
         
         # 去重
         unique_entities = []
@@ -304,6 +461,18 @@ class KnowledgeProcessor:
         
         return unique_entities
     
+    def extract_entities_batch(self, texts):
+        """批量提取实体，命名实体识别通过 nlp.pipe 成批完成
+        
+        Args:
+            texts: 文本列表
+        
+        Returns:
+            与texts一一对应的实体列表
+        """
+        ner_batch = self.extract_ner_entities_batch(texts)
+        return [self.extract_entities(text, ner_entities) for text, ner_entities in zip(texts, ner_batch)]
+    
     def extract_relations_with_patterns(self, text, entities):
         """使用模式匹配提取关系
         
@@ -314,33 +483,8 @@ class KnowledgeProcessor:
         Returns:
             关系三元组列表
         """
-        relations = []
-        entity_texts = [e['text'] for e in entities]
-        
-        # 基于模式的关系提取
-        for pattern in self.relation_patterns:
-            # 查找包含当前关系模式的句子
-            sentences = re.split(r'[。！？.!?]', text)
-            for sentence in sentences:
-                if pattern['pattern'] in sentence:
-                    # 寻找句子中的两个实体，它们之间有这种关系
-                    for entity1 in entity_texts:
-                        if entity1 in sentence:
-                            for entity2 in entity_texts:
-                                # 避免自关系，并确保实体确实在句子中
-                                if entity1 != entity2 and entity2 in sentence:
-                                    # 检查是否符合关系模式
-                                    if self.check_relation_pattern(sentence, entity1, pattern['pattern'], entity2):
-                                        relations.append({
-                                            'subject': entity1,
-                                            'predicate': pattern['relation'],
-                                            'object': entity2,
-                                            'sentence': sentence.strip(),
-                                            'confidence': 0.8,
-                                            'method': 'pattern'
-                                        })
-        
-        return relations
+        # 只切分一次句子，一次扫描匹配全部实体和关系词，结果与逐模式、逐实体对检查 check_relation_pattern 相同
+        return self.relation_engine.extract(text, entities)
     
     def check_relation_pattern(self, sentence, entity1, relation, entity2):
         """检查句子是否符合关系模式
@@ -379,13 +523,44 @@ class KnowledgeProcessor:
             
         return True
     
-    def extract_relations_with_openai(self, text, entities, max_tokens=8000):
+    def llm_chunks(self, text, entities, max_chars=None):
+        """把文档切分为大模型关系抽取的窗口
+        
+        Args:
+            text: 输入文本
+            entities: 已提取的实体列表
+            max_chars: 窗口长度，默认为 llm_chunk_chars
+        
+        Returns:
+            [(Chunk, 窗口中出现的实体列表)]，短文档只有一个窗口并使用全部实体
+        """
+        chunks = sliding_windows(text, max_chars or self.llm_chunk_chars, self.chunk_overlap)
+        if len(chunks) == 1:
+            return [(chunks[0], entities)]
+        return [(chunk, [e for e in entities if e['text'] in chunk.text]) for chunk in chunks]
+    
+    def merge_llm_chunks(self, chunk_results):
+        """合并各窗口的大模型抽取结果
+        
+        Args:
+            chunk_results: [(Chunk, 关系列表)] 列表
+        
+        Returns:
+            关系列表
+        """
+        if len(chunk_results) == 1:
+            return chunk_results[0][1]
+        return merge_chunk_relations(chunk_results)
+    
+    def extract_relations_with_openai(self, text, entities, max_tokens=None):
         """使用OpenAI API提取关系
         
+        超过窗口长度的文档按句子切分为重叠窗口，逐个窗口请求后合并，覆盖整篇文档。
+        
         Args:
             text: 输入文本
             entities: 已提取的实体列表
-            max_tokens: 最大token数
+            max_tokens: 单个请求的最大文本长度，默认为 llm_chunk_chars；窗口按此长度切分，不会被截断
         
         Returns:
             关系三元组列表
@@ -393,129 +568,80 @@ class KnowledgeProcessor:
         if not self.use_openai or not os.environ.get("OPENAI_API_KEY"):
             logger.warning("OpenAI API不可用，跳过大模型关系抽取")
             return []
-            
-        relations = []
         
-        # 准备实体列表
-        entity_texts = [e['text'] for e in entities]
-        entity_list = ", ".join(entity_texts[:30])  # 限制实体数量
+        max_chars = min(max_tokens, self.llm_chunk_chars) if max_tokens else self.llm_chunk_chars
+        chunk_results = [(chunk, self.request_relations(chunk.text, chunk_entities, max_chars))
+                         for chunk, chunk_entities in self.llm_chunks(text, entities, max_chars)]
+        return self.merge_llm_chunks(chunk_results)
+    
+    def request_relations(self, text, entities, max_tokens=None):
+        """对一段文本发送一次大模型关系抽取请求（优先读取缓存）
         
-        # 截断文本，避免超出token限制
-        if len(text) > max_tokens:
-            text = text[:max_tokens]
+        Args:
+            text: 输入文本
+            entities: 已提取的实体列表
+            max_tokens: 最大文本长度，默认为 llm_chunk_chars（与窗口长度一致）
         
-        # 构建提示
-        prompt = f"""
-请从以下文本中提取实体之间的关系，并以JSON格式返回三元组(主体,关系,客体)。
-文本内容: {text}
-
-已识别的实体: {entity_list}
-
-请分析文本，找出这些实体之间的关系。关系类型主要包括（尽可能规约到以下关系）:
-- is_a (是一种)
-- includes (包括)
-- contains (包含)
-- belongs_to (属于)
-- composed_of (由...组成)
-- used_for (用于)
-- based_on (基于)
-- applied_to (应用于)
-- defined_as (定义为)
-- equivalent_to (等同于)
-- produces (产生)
-- leads_to (导致)
-- depends_on (依赖于)
-- related_to (相关于)
-- derived_from (源自)
-- affects (影响)
-- supports (支持)
-- implements (实现)
-- extends (扩展)
-- uses (使用)
-注意，所有的关系类型必须使用英文（例如"is_a"是正确的，但是"是一种"则是错误的），括号里的中文仅供你参考。
-请严格按照以下格式返回结果:
-[
-  {{
-    "subject": "实体1",
-    "predicate": "关系类型",
-    "object": "实体2",
-    "sentence": "包含这种关系的原始句子",
-    "confidence": 0.9
-  }}
-]
-注意，所有的关系类型必须使用英文（例如"is_a"是正确的，但是"是一种"则是错误的）
-只返回JSON数组，不要有其他文字说明。
-"""
+        Returns:
+            关系三元组列表
+        """
+        prompt = build_relation_prompt(text, entities, max_chars=max_tokens or self.llm_chunk_chars)
+        messages = build_messages(prompt)
+        
+        if self.llm_cache is not None:
+            cached = self.llm_cache.get(messages, LLM_MODEL, LLM_TEMPERATURE)
+            if cached is not None:
+                return cached
         
         try:
-            # 调用OpenAI API - 更新的API调用方式
-            from openai import OpenAI
-            client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+            # 所有文档共用一个客户端，复用HTTP连接
+            if self.openai_client is None:
+                from openai import OpenAI
+                self.openai_client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
             
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "你是一个专业的知识图谱关系提取助手，擅长从文本中识别实体间的语义关系。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=2000
+            response = self.openai_client.chat.completions.create(
+                model=LLM_MODEL,
+                messages=messages,
+                temperature=LLM_TEMPERATURE,
+                max_tokens=LLM_MAX_TOKENS
             )
             
             # 解析响应
-            result = response.choices[0].message.content.strip()
-            
-            try:
-                # 直接尝试解析整个JSON
-                extracted_relations = json.loads(result)
-                for relation in extracted_relations:
-                    # 添加方法标记
-                    relation['method'] = 'openai'
-                    relations.append(relation)
-                
-                logger.info(f"使用OpenAI API提取了 {len(relations)} 个关系")
-            except json.JSONDecodeError:
-                # 尝试提取JSON部分
-                json_match = re.search(r'\[\s*\{.*\}\s*\]', result, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(0)
-                    try:
-                        extracted_relations = json.loads(json_str)
-                        for relation in extracted_relations:
-                            # 添加方法标记
-                            relation['method'] = 'openai'
-                            relations.append(relation)
-                        
-                        logger.info(f"使用OpenAI API提取了 {len(relations)} 个关系")
-                    except json.JSONDecodeError as e:
-                        logger.error(f"解析OpenAI响应JSON失败: {str(e)}")
-                else:
-                    logger.warning("OpenAI响应中未找到有效的JSON数据")
-                
+            relations = parse_relations(response.choices[0].message.content)
+            if relations is None:
+                # 无法解析的响应不写入缓存，下次运行重新请求
+                return []
+            logger.info(f"使用OpenAI API提取了 {len(relations)} 个关系")
+            if self.llm_cache is not None:
+                self.llm_cache.put(messages, LLM_MODEL, LLM_TEMPERATURE, relations)
+            return relations
         except Exception as e:
             logger.error(f"调用OpenAI API失败: {str(e)}")
-        
-        return relations
+            return []
     
-    def extract_relations(self, text, entities):
+    def extract_relations(self, text, entities, openai_relations=None, pattern_relations=None):
         """从文本中提取实体间的关系
         
         Args:
             text: 输入文本
             entities: 已提取的实体列表
+            openai_relations: 并发抽取已得到的大模型关系，为None时同步调用大模型
+            pattern_relations: 已得到的模式匹配关系，为None时重新匹配
         
         Returns:
             实体关系三元组列表
         """
         # 使用模式匹配提取关系
-        pattern_relations = self.extract_relations_with_patterns(text, entities)
+        if pattern_relations is None:
+            pattern_relations = self.extract_relations_with_patterns(text, entities)
         
         # 使用OpenAI API提取关系
-        openai_relations = []
-        if self.use_openai and os.environ.get("OPENAI_API_KEY"):
-            logger.info("开始使用OpenAI API提取关系...")
-            openai_relations = self.extract_relations_with_openai(text, entities)
-            logger.info(f"OpenAI API返回了 {len(openai_relations)} 个关系")
+        if openai_relations is None:
+            openai_relations = []
+            if self.use_openai and os.environ.get("OPENAI_API_KEY"):
+                logger.info("开始使用OpenAI API提取关系...")
+                openai_relations = self.extract_relations_with_openai(text, entities)
+                logger.info(f"OpenAI API返回了 {len(openai_relations)} 个关系")
         
         # 合并关系
         all_relations = pattern_relations + openai_relations
@@ -525,6 +651,28 @@ class KnowledgeProcessor:
         
         return all_relations
     
+    def iter_texts(self, filename, stream=False):
+        """读取数据文件，产出清洗并去除近似重复后的文档文本
+        
+        Args:
+            filename: 文件名
+            stream: 是否逐个元素惰性读取 .json 文件
+        
+        Yields:
+            待抽取的文档文本（标题、摘要和正文）
+        """
+        for item in self.load_data(filename, stream):
+            # 清洗文本
+            summary = self.clean_text(item.get('summary', ''))
+            content = self.clean_text(item.get('content', ''))
+            
+            # 跳过近似重复的文档，避免重复抽取和大模型调用
+            if self.dedup is not None and self.is_duplicate(item, f"{summary} {content}"):
+                continue
+            
+            # 组合文本进行分析
+            yield f"{item.get('title', '')}. {summary} {content}"
+    
     def process_file(self, filename):
         """处理单个数据文件
         
@@ -535,29 +683,81 @@ class KnowledgeProcessor:
             处理后的实体和关系
         """
         logger.info(f"处理文件: {filename}")
-        data = self.load_data(filename)
         
         all_entities = []
         all_relations = []
         
-        for item in data:
-            # 清洗文本
-            summary = self.clean_text(item.get('summary', ''))
-            content = self.clean_text(item.get('content', ''))
-            
-            # 组合文本进行分析
-            text = f"{item.get('title', '')}. {summary} {content}"
-            
-            # 提取实体
-            entities = self.extract_entities(text)
-            all_entities.extend(entities)
-            
-            # 提取关系
-            relations = self.extract_relations(text, entities)
-            all_relations.extend(relations)
+        # 按批收集文档，使spaCy可以用 nlp.pipe 成批处理
+        batch = []
+        batch_limit = self.ner_batch_size * max(1, self.ner_processes)
+        for text in self.iter_texts(filename):
+            batch.append(text)
+            if len(batch) >= batch_limit:
+                for entities, relations in self.process_texts(batch):
+                    all_entities.extend(entities)
+                    all_relations.extend(relations)
+                batch = []
+        
+        if batch:
+            for entities, relations in self.process_texts(batch):
+                all_entities.extend(entities)
+                all_relations.extend(relations)
         
         return all_entities, all_relations
     
+    def request_relations_batch(self, texts, entities_batch):
+        """并发请求大模型抽取一批文档的关系
+        
+        整批文档的耗时约为最慢的若干个请求，而不是全部请求耗时之和；长文档的各个窗口也一起并发请求。
+        
+        Args:
+            texts: 文档文本列表
+            entities_batch: 与texts一一对应的实体列表
+        
+        Returns:
+            与texts一一对应的大模型关系列表
+        """
+        chunks_list = [self.llm_chunks(text, entities) for text, entities in zip(texts, entities_batch)]
+        chunk_relations = iter(self.llm_extractor.extract(
+            [(chunk.text, chunk_entities) for chunks in chunks_list for chunk, chunk_entities in chunks]))
+        return [self.merge_llm_chunks([(chunk, next(chunk_relations)) for chunk, _ in chunks])
+                for chunks in chunks_list]
+    
+    def process_texts(self, texts):
+        """对一批文档提取实体和关系
+        
+        Args:
+            texts: 文档文本列表
+        
+        Returns:
+            与texts一一对应的 (实体列表, 关系列表)
+        """
+        entities_batch = self.extract_entities_batch(texts)
+        pattern_batch = [self.extract_relations_with_patterns(text, entities)
+                         for text, entities in zip(texts, entities_batch)]
+        
+        # 级联模式：只有预期收益高的文档调用大模型，其余文档只保留模式匹配的结果
+        llm_enabled = self.use_openai and os.environ.get("OPENAI_API_KEY")
+        selected = [True] * len(texts)
+        if self.cascade is not None and llm_enabled:
+            selected, _ = self.cascade.select(list(zip(texts, entities_batch, pattern_batch)))
+        
+        # None 表示由 extract_relations 同步调用大模型
+        openai_batch = [None if flag else [] for flag in selected]
+        if self.llm_extractor is not None and llm_enabled:
+            indices = [i for i, flag in enumerate(selected) if flag]
+            requested = self.request_relations_batch([texts[i] for i in indices], [entities_batch[i] for i in indices])
+            for i, relations in zip(indices, requested):
+                openai_batch[i] = relations
+        
+        results = []
+        for text, entities, pattern_relations, openai_relations in zip(texts, entities_batch, pattern_batch, openai_batch):
+            relations = self.extract_relations(text, entities, openai_relations, pattern_relations)
+            if self.cascade is not None:
+                self.cascade.observe(entities, relations)
+            results.append((entities, relations))
+        return results
+    
     def merge_and_deduplicate(self, entities_list, relations_list):
         """合并和去重处理后的实体和关系
         
@@ -626,8 +826,8 @@ class KnowledgeProcessor:
     def run(self):
         """运行处理器处理所有数据"""
         try:
-            # json_files = [f for f in os.listdir(self.input_dir) if f.endswith('.json') and ('baidu' in f or 'wiki' in f or 'csdn' in f)]
-            json_files = [f for f in os.listdir(self.input_dir) if f.endswith('.json') and ('agent' in f)]
+            # json_files = [f for f in self.list_data_files() if ('baidu' in f or 'wiki' in f or 'csdn' in f)]
+            json_files = [f for f in self.list_data_files() if ('agent' in f)]
             
             if not json_files:
                 logger.error(f"在 {self.input_dir} 目录中没有找到JSON数据文件")
@@ -635,23 +835,47 @@ class KnowledgeProcessor:
                 self.create_placeholder_data()
                 return
             
-            entities_list = []
-            relations_list = []
+            if self.streaming:
+                # 延迟导入：streaming 模块依赖 parallel 模块，parallel 模块依赖本模块
+                from knowledge_graph.processor.streaming import StreamingPipeline
+                StreamingPipeline(self, self.stream_window).run(json_files)
+                self.report_run_stats()
+                return
             
-            for json_file in json_files:
-                entities, relations = self.process_file(json_file)
-                entities_list.append(entities)
-                relations_list.append(relations)
+            if self.processes > 1:
+                # 延迟导入：parallel 模块依赖本模块
+                from knowledge_graph.processor.parallel import ParallelProcessor
+                entities_list, relations_list = ParallelProcessor(self, self.processes).process_files(json_files)
+            else:
+                entities_list = []
+                relations_list = []
+                for json_file in json_files:
+                    entities, relations = self.process_file(json_file)
+                    entities_list.append(entities)
+                    relations_list.append(relations)
             
             # 合并和去重
             unique_entities, unique_relations = self.merge_and_deduplicate(entities_list, relations_list)
             
             # 保存处理后的数据
             self.save_processed_data(unique_entities, unique_relations)
+            self.report_run_stats()
         except Exception as e:
             logger.error(f"处理器运行失败: {str(e)}")
             # 确保流程不中断
             self.create_placeholder_data()
+        finally:
+            if self.llm_extractor is not None:
+                self.llm_extractor.close()
+    
+    def report_run_stats(self):
+        """输出近似重复、大模型缓存和级联抽取的统计（多进程时缓存和级联统计由子进程汇总输出）"""
+        if self.dedup is not None:
+            self.report_duplicates()
+        if self.llm_cache is not None and self.processes <= 1:
+            logger.info(f"大模型缓存统计: {self.llm_cache.stats()}")
+        if self.cascade is not None and self.processes <= 1:
+            logger.info(f"级联抽取统计: {self.cascade.summary()}")
     
     def create_placeholder_data(self):
         """创建占位数据，确保后续流程能继续"""
@@ -0,0 +1,178 @@
+import re
+from bisect import bisect_left, bisect_right
+from knowledge_graph.utils.term_matcher import TermMatcher
+
+# 关系模式：关系提示词及对应的关系类型
+RELATION_PATTERNS = [
+    {"pattern": "是", "relation": "is_a"},
+    {"pattern": "包括", "relation": "includes"},
+    {"pattern": "包含", "relation": "contains"},
+    {"pattern": "属于", "relation": "belongs_to"},
+    {"pattern": "由", "relation": "composed_of"},
+    {"pattern": "用于", "relation": "used_for"},
+    {"pattern": "基于", "relation": "based_on"},
+    {"pattern": "应用于", "relation": "applied_to"},
+    {"pattern": "定义为", "relation": "defined_as"},
+    {"pattern": "等同于", "relation": "equivalent_to"},
+    {"pattern": "产生", "relation": "produces"},
+    {"pattern": "导致", "relation": "leads_to"},
+    {"pattern": "依赖于", "relation": "depends_on"},
+    {"pattern": "相关于", "relation": "related_to"},
+    {"pattern": "源自", "relation": "derived_from"},
+    {"pattern": "影响", "relation": "affects"},
+    {"pattern": "支持", "relation": "supports"},
+    {"pattern": "实现", "relation": "implements"},
+    {"pattern": "扩展", "relation": "extends"},
+    {"pattern": "使用", "relation": "uses"}
+]
+
+SENTENCE_SPLIT_RE = re.compile(r'[。！？.!?]')
+
+
+class SentenceIndex:
+    """单个句子中实体首次出现位置和关系提示词出现位置的索引"""
+
+    def __init__(self, sentence, first_pos, cue_starts):
+        self.sentence = sentence.strip()
+        # 实体术语编号 -> 在句子中首次出现的位置
+        self.first_pos = first_pos
+        # 提示词术语编号 -> 出现位置的升序列表
+        self.cue_starts = cue_starts
+        # 按首次出现位置排序的 (位置, 实体术语编号)，用于按位置区间查找实体
+        self.by_pos = sorted((pos, term_id) for term_id, pos in first_pos.items())
+        self.positions = [pos for pos, _ in self.by_pos]
+
+
+class RelationPatternEngine:
+    """线性时间的模式关系抽取
+
+    文本只切分一次句子；每个文档把实体和全部关系提示词编译为一个Aho-Corasick自动机，
+    每个句子扫描一遍即可得到实体首次出现位置和提示词位置。之后对每个主体实体用二分查找
+    定位其后第一个提示词，再在距离限制内按位置区间取出候选客体实体，
+    不再对实体两两组合做子串查找。
+
+    判定规则与输出顺序（模式 → 句子 → 主体 → 客体，主体/客体按实体列表顺序）
+    与原有的逐模式、逐实体对查找实现完全一致。
+    """
+
+    def __init__(self, relation_patterns=None, max_gap=20, confidence=0.8):
+        """初始化抽取引擎
+
+        Args:
+            relation_patterns: 关系模式列表，每项为 {"pattern": 提示词, "relation": 关系类型}
+            max_gap: 提示词结尾到客体实体的最大距离（字符）
+            confidence: 抽取结果的置信度
+        """
+        self.relation_patterns = relation_patterns if relation_patterns is not None else RELATION_PATTERNS
+        self.max_gap = max_gap
+        self.confidence = confidence
+
+    def index_sentences(self, text, matcher, is_entity, is_cue, has_empty_entity=False):
+        """切分句子并为每个句子建立索引"""
+        indexes = []
+        for sentence in SENTENCE_SPLIT_RE.split(text):
+            first_pos = {}
+            cue_starts = {}
+            # 自动机按结束位置递增产出匹配；同一术语长度固定，因此第一次产出即首次出现位置
+            for start, _, term_id in matcher.finditer(sentence):
+                if is_entity[term_id] and term_id not in first_pos:
+                    first_pos[term_id] = start
+                if is_cue[term_id]:
+                    cue_starts.setdefault(term_id, []).append(start)
+            if has_empty_entity:
+                first_pos[-1] = 0
+            indexes.append(SentenceIndex(sentence, first_pos, cue_starts))
+        return indexes
+
+    def extract(self, text, entities):
+        """使用模式匹配提取关系
+
+        Args:
+            text: 输入文本
+            entities: 已提取的实体列表
+
+        Returns:
+            关系三元组列表
+        """
+        entity_texts = [e['text'] for e in entities]
+        if not entity_texts or not text:
+            return []
+
+        matcher = TermMatcher()
+        cue_ids = [matcher.add(p['pattern']) for p in self.relation_patterns]
+        # 空字符串实体（任何句子都“包含”它，位置为0）单独用 -1 表示
+        entity_ids = [matcher.add(t) if t else -1 for t in entity_texts]
+        matcher.build()
+
+        size = len(matcher)
+        is_entity = [False] * size
+        is_cue = [False] * size
+        for term_id in entity_ids:
+            if term_id >= 0:
+                is_entity[term_id] = True
+        for term_id in cue_ids:
+            if term_id >= 0:
+                is_cue[term_id] = True
+
+        # 每个实体术语编号对应的实体列表下标（实体列表中可能有重复文本）
+        indices_by_id = {}
+        for index, term_id in enumerate(entity_ids):
+            indices_by_id.setdefault(term_id, []).append(index)
+
+        sentences = self.index_sentences(text, matcher, is_entity, is_cue, has_empty_entity=-1 in indices_by_id)
+
+        relations = []
+        for pattern, cue_id in zip(self.relation_patterns, cue_ids):
+            if cue_id < 0:
+                continue
+            cue_length = len(pattern['pattern'])
+            for index in sentences:
+                starts = index.cue_starts.get(cue_id)
+                if not starts:
+                    continue
+                # 句子中出现的实体，按实体列表顺序
+                present = sorted(i for term_id in index.first_pos for i in indices_by_id[term_id])
+                for subject_index in present:
+                    subject_id = entity_ids[subject_index]
+                    subject = entity_texts[subject_index]
+                    # 主体之后第一个提示词
+                    k = bisect_left(starts, index.first_pos[subject_id] + len(subject))
+                    if k == len(starts):
+                        continue
+                    rel_pos = starts[k]
+                    # 客体首次出现位置须在 [提示词位置, 提示词结尾 + max_gap] 内
+                    lo = bisect_left(index.positions, rel_pos)
+                    hi = bisect_right(index.positions, rel_pos + cue_length + self.max_gap)
+                    objects = sorted(i for _, term_id in index.by_pos[lo:hi]
+                                     if term_id != subject_id for i in indices_by_id[term_id])
+                    for object_index in objects:
+                        relations.append({
+                            'subject': subject,
+                            'predicate': pattern['relation'],
+                            'object': entity_texts[object_index],
+                            'sentence': index.sentence,
+                            'confidence': self.confidence,
+                            'method': 'pattern'
+                        })
+        return relations
+
+
+def cooccurring_pairs(text, entity_texts, max_entities_per_sentence=50):
+    """找出在同一句子中共同出现的实体对
+
+    Args:
+        text: 输入文本
+        entity_texts: 实体文本列表
+        max_entities_per_sentence: 每个句子最多参与组合的实体数，避免超长句子产生过多组合
+
+    Returns:
+        无序实体对 (按字典序排列的二元组) 的集合
+    """
+    matcher = TermMatcher(entity_texts)
+    pairs = set()
+    for sentence in SENTENCE_SPLIT_RE.split(text):
+        present = matcher.matched_terms(sentence)[:max_entities_per_sentence]
+        for i, first in enumerate(present):
+            for second in present[i + 1:]:
+                pairs.add((first, second) if first < second else (second, first))
+    return pairs
@@ -0,0 +1,190 @@
+import os
+import csv
+import time
+import hashlib
+import logging
+from itertools import islice
+from knowledge_graph.utils.jsonl import JsonArraySink
+
+logger = logging.getLogger(__name__)
+
+# CSV输出的列，与 save_processed_data 由实体/关系字典生成的列一致（其余字段只写入JSON）
+ENTITY_FIELDS = ['text', 'label', 'type']
+RELATION_FIELDS = ['subject', 'predicate', 'object', 'sentence', 'confidence', 'method']
+
+
+def key_hash(key):
+    """把去重键压缩为64位整数，已见集合只保存哈希值而不是完整字符串"""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HashedSeenSet:
+    """只保存键哈希值的已见集合，用于增量去重"""
+
+    def __init__(self):
+        self._hashes = set()
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def add(self, key):
+        """加入一个键
+
+        Returns:
+            该键此前是否未出现过
+        """
+        h = key_hash(key)
+        if h in self._hashes:
+            return False
+        self._hashes.add(h)
+        return True
+
+
+class CsvSink:
+    """逐行写入CSV文件"""
+
+    def __init__(self, filepath, fieldnames):
+        self.filepath = filepath
+        self._file = open(filepath, 'w', encoding='utf-8', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames, extrasaction='ignore',
+                                      lineterminator='\n')
+        self._writer.writeheader()
+
+    def write(self, record):
+        self._writer.writerow(record)
+
+    def close(self):
+        self._file.close()
+
+
+class ProcessedDataSink:
+    """增量写入实体和关系，并按 merge_and_deduplicate 的规则去重
+
+    实体按文本、关系按 主体|关系|客体 去重，保留第一次出现的记录；结果依次追加到
+    entities.json / relations.json（JSON数组）和 entities.csv / relations.csv 的临时文件，
+    全部写完后再替换原文件。处理期间原有的图谱文件保持不变，级联抽取（包括子进程）仍可读取上次运行的图谱，
+    中途失败也不会留下不完整的输出。
+    """
+
+    def __init__(self, output_dir):
+        """初始化输出文件
+
+        Args:
+            output_dir: 输出目录
+        """
+        self.output_dir = output_dir
+        self.entity_seen = HashedSeenSet()
+        self.relation_seen = HashedSeenSet()
+        self.entities_json = JsonArraySink(self.temp_path('entities.json'))
+        self.relations_json = JsonArraySink(self.temp_path('relations.json'))
+        self.entities_csv = CsvSink(self.temp_path('entities.csv'), ENTITY_FIELDS)
+        self.relations_csv = CsvSink(self.temp_path('relations.csv'), RELATION_FIELDS)
+
+    def temp_path(self, filename):
+        """输出文件对应的临时文件路径"""
+        return os.path.join(self.output_dir, filename + '.tmp')
+
+    @property
+    def sinks(self):
+        return (self.entities_json, self.relations_json, self.entities_csv, self.relations_csv)
+
+    def write(self, entities, relations):
+        """写入一篇文档的实体和关系（跳过已写入过的）"""
+        for entity in entities:
+            if self.entity_seen.add(entity['text']):
+                self.entities_json.write(entity)
+                self.entities_csv.write(entity)
+        for relation in relations:
+            if self.relation_seen.add(f"{relation['subject']}|{relation['predicate']}|{relation['object']}"):
+                self.relations_json.write(relation)
+                self.relations_csv.write(relation)
+
+    def close(self, commit=True):
+        """关闭输出文件
+
+        Args:
+            commit: 为True时用临时文件替换原输出文件，否则删除临时文件、保留原输出
+        """
+        for sink in self.sinks:
+            sink.close()
+            if commit:
+                os.replace(sink.filepath, sink.filepath[:-len('.tmp')])
+            else:
+                os.remove(sink.filepath)
+        if commit:
+            logger.info(f"实体数据已保存到: {os.path.join(self.output_dir, 'entities.json')}, "
+                        f"共 {self.entities_json.count} 个实体")
+            logger.info(f"关系数据已保存到: {os.path.join(self.output_dir, 'relations.json')}, "
+                        f"共 {self.relations_json.count} 个关系")
+
+
+def iter_windows(items, size):
+    """把迭代器按固定大小分组
+
+    Yields:
+        每组最多size个元素的列表
+    """
+    iterator = iter(items)
+    while True:
+        window = list(islice(iterator, size))
+        if not window:
+            return
+        yield window
+
+
+class StreamingPipeline:
+    """流式处理模式
+
+    文档以生成器的形式依次经过读取（JSON数组逐个元素解析）、清洗、近似重复检测、抽取和去重，
+    结果增量写入输出文件。同时驻留内存的文档最多为一个窗口（多进程时为在途的文档块），
+    文档内容占用的内存不随语料规模增长；去重和近似重复检测的状态（已见键的哈希、文档指纹和LSH索引、
+    级联模式的已知实体和实体对）仍按不同键的数量 O(唯一键数) 增长，但每个键只占固定的几十字节。
+    """
+
+    def __init__(self, processor, window=64):
+        """初始化流式处理
+
+        Args:
+            processor: KnowledgeProcessor 实例
+            window: 每次送入抽取的文档数
+        """
+        self.processor = processor
+        self.window = max(1, window)
+
+    def iter_documents(self, filenames):
+        """依次产出全部文件中清洗、去重后的文档文本"""
+        for filename in filenames:
+            logger.info(f"处理文件: {filename}")
+            yield from self.processor.iter_texts(filename, stream=True)
+
+    def iter_results(self, filenames):
+        """依次产出每篇文档的 (实体列表, 关系列表)"""
+        if self.processor.processes > 1:
+            # 延迟导入：parallel 模块依赖 processor 模块
+            from knowledge_graph.processor.parallel import ParallelProcessor
+            parallel = ParallelProcessor(self.processor, self.processor.processes, chunksize=self.window, stream=True)
+            for _, entities, relations in parallel.iter_results(filenames):
+                yield entities, relations
+            return
+        for window in iter_windows(self.iter_documents(filenames), self.window):
+            yield from self.processor.process_texts(window)
+
+    def run(self, filenames):
+        """流式处理数据文件并增量写入结果
+
+        Returns:
+            (写入的实体数, 写入的关系数)
+        """
+        start_time = time.time()
+        sink = ProcessedDataSink(self.processor.output_dir)
+        documents = 0
+        try:
+            for entities, relations in self.iter_results(filenames):
+                sink.write(entities, relations)
+                documents += 1
+        except BaseException:
+            sink.close(commit=False)
+            raise
+        sink.close()
+        logger.info(f"流式处理完成: {documents} 个文档，耗时 {time.time() - start_time:.2f} 秒")
+        return sink.entities_json.count, sink.relations_json.count
@@ -1,10 +1,25 @@
 from pydantic import BaseModel, SecretStr
 from typing import List
 import asyncio
-from browser_use import Agent, Controller
+import logging
+from browser_use import Agent, Browser, BrowserConfig, Controller
+from browser_use.browser.context import BrowserContextConfig
 from langchain_openai import ChatOpenAI
 import os
 
+logger = logging.getLogger(__name__)
+
+# 本地OpenAI兼容接口（LM Studio）的默认配置
+LLM_BASE_URL = 'http://localhost:1234/v1'
+LLM_MODEL = 'gemma-3-27b-it'
+LLM_API_KEY = 'lm-studio'
+
+# 并行模式下拆分主题的子方向
+SUBTOPIC_ASPECTS = ['定义与基本概念', '关键技术与方法', '构建流程与工具', '典型应用案例', '发展历史与研究前沿']
+
+# 任务描述中最多列出的已抓取网址数，避免提示过长
+MAX_COVERED_URLS = 50
+
 # Define the output format as a Pydantic model
 
 
@@ -27,7 +42,14 @@ class Posts(BaseModel):
 controller = Controller(output_model=Posts)
 
 
-async def agent_crawler(topic="知识图谱", pages=5):
+def build_task(topic="知识图谱", pages=5, covered_urls=None):
+    """构造Agent的抓取任务描述
+
+    Args:
+        topic: 主题
+        pages: 需要抓取的网页数
+        covered_urls: 已经抓取过的网址，Agent应跳过这些网页
+    """
     task = f"""
 你是一个网页资料搜集专家，你需要爬取和给定主题有关的网页，你需要至少爬取{pages}个有关的网页。现在抓取有关"{topic}"主题的网页。提取关键信息并按照以下格式整理：
 1. 标题(title)：提取网页的主标题
@@ -41,24 +63,161 @@ async def agent_crawler(topic="知识图谱", pages=5):
 9. 来源(source)：说明信息的来源（例如：维基百科、新闻网站、学术期刊等）
 请确保信息准确、完整，并保持原始格式的关键部分。如果有非简体中文内容，一律翻译为简体中文。你应该做适当概括，但是不应该省略内容。你应该适当的访问网页内你认为和{topic}主题有关的链接。
 """
+    if covered_urls:
+        covered = '\n'.join(list(covered_urls)[:MAX_COVERED_URLS])
+        task += f"""以下网址已经抓取过（already covered），不要访问或返回这些网页，请寻找新的网页：
+{covered}
+"""
+    return task
+
+
+def create_llm(base_url=LLM_BASE_URL, model=LLM_MODEL, api_key=LLM_API_KEY):
+    """创建OpenAI兼容接口的对话模型客户端，可在多个Agent之间共享"""
     # model = ChatOpenAI(model='gpt-4o')
-    # api_key = "sk-9e5b856d67324a71b82faaaba13ba7dc"
-    api_key = 'lm-studio'
-    model = ChatOpenAI(base_url='http://localhost:1234/v1', model='gemma-3-27b-it', api_key=SecretStr(api_key))
-    agent = Agent(task=task, llm=model, controller=controller)
+    return ChatOpenAI(base_url=base_url, model=model, api_key=SecretStr(api_key))
+
+
+def parse_posts(history):
+    """从Agent运行历史中解析结构化结果
+
+    Returns:
+        Post列表，没有结果时返回空列表
+    """
+    result = history.final_result()
+    if not result:
+        return []
+    return Posts.model_validate_json(result).posts
+
+
+async def agent_crawler(topic="知识图谱", pages=5, llm=None, browser=None, browser_context=None, covered_urls=None):
+    task = build_task(topic, pages, covered_urls)
+    model = llm or create_llm()
+    agent = Agent(task=task, llm=model, controller=controller, browser=browser, browser_context=browser_context)
     
     history = await agent.run()
     
-    result = history.final_result()
+    posts = parse_posts(history)
     
-    if result:
-        parsed: Posts = Posts.model_validate_json(result)
-        print(parsed.posts)
-        return parsed.posts
+    if posts:
+        print(posts)
+        return posts
     else:
         print('No result')
 
 
+def split_topic(topic, pages, agents):
+    """将主题拆分为多个子任务
+
+    Args:
+        topic: 主题
+        pages: 总共需要抓取的网页数
+        agents: 子任务数
+
+    Returns:
+        (子主题, 网页数) 列表
+    """
+    agents = max(1, agents)
+    aspects = [f"{topic}的{aspect}" for aspect in SUBTOPIC_ASPECTS]
+    # 子任务数超过预设方向时循环使用，并以序号区分
+    subtopics = [aspects[i % len(aspects)] + (f"（第{i // len(aspects) + 1}组）" if i >= len(aspects) else '')
+                 for i in range(agents)]
+    base, extra = divmod(pages, agents)
+    return [(subtopic, max(1, base + (1 if i < extra else 0))) for i, subtopic in enumerate(subtopics)]
+
+
+class BrowserPool:
+    """浏览器上下文池：一个浏览器进程中预先创建多个相互隔离的上下文，供并行的Agent轮流使用"""
+
+    def __init__(self, size=3, headless=True):
+        """初始化浏览器池
+
+        Args:
+            size: 上下文数量，即最大并行Agent数
+            headless: 是否以无界面模式运行浏览器
+        """
+        self.size = size
+        self.browser = Browser(config=BrowserConfig(headless=headless))
+        self._contexts = []
+        self._idle = asyncio.Queue()
+
+    async def start(self):
+        for _ in range(self.size):
+            context = await self.browser.new_context(config=BrowserContextConfig())
+            self._contexts.append(context)
+            self._idle.put_nowait(context)
+        return self
+
+    async def acquire(self):
+        """取出一个空闲的浏览器上下文，没有空闲上下文时等待"""
+        return await self._idle.get()
+
+    def release(self, context):
+        """归还浏览器上下文"""
+        self._idle.put_nowait(context)
+
+    async def close(self):
+        for context in self._contexts:
+            try:
+                await context.close()
+            except Exception as e:
+                logger.warning(f"关闭浏览器上下文失败: {str(e)}")
+        self._contexts = []
+        await self.browser.close()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+async def parallel_agent_crawler(topic="知识图谱", pages=10, agents=3, headless=True, llm=None, covered_urls=None):
+    """将主题拆分为子任务，由多个Agent共享一个LLM客户端和浏览器池并行抓取
+
+    Args:
+        topic: 主题
+        pages: 总共需要抓取的网页数
+        agents: 并行Agent数
+        headless: 是否以无界面模式运行浏览器
+        llm: 共享的对话模型客户端，默认连接本地OpenAI兼容接口
+        covered_urls: 已经抓取过的网址，Agent应跳过这些网页
+
+    Yields:
+        每个Agent完成后逐条产出其抓取的Post（按URL去重）
+    """
+    llm = llm or create_llm()
+    subtasks = split_topic(topic, pages, agents)
+    seen_urls = set()
+
+    async with BrowserPool(size=min(agents, len(subtasks)), headless=headless) as pool:
+        async def run_subtask(subtopic, sub_pages):
+            context = await pool.acquire()
+            try:
+                history = await Agent(task=build_task(subtopic, sub_pages, covered_urls), llm=llm, controller=controller,
+                                      browser=pool.browser, browser_context=context).run()
+                return subtopic, parse_posts(history)
+            except Exception as e:
+                logger.error(f"Agent子任务 {subtopic} 失败: {str(e)}")
+                return subtopic, []
+            finally:
+                pool.release(context)
+
+        tasks = [asyncio.create_task(run_subtask(subtopic, sub_pages)) for subtopic, sub_pages in subtasks]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                subtopic, posts = await finished
+                logger.info(f"Agent子任务 {subtopic} 完成，得到 {len(posts)} 条结果")
+                for post in posts:
+                    if post.url in seen_urls:
+                        continue
+                    seen_urls.add(post.url)
+                    yield post
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
 if __name__ == '__main__':
     api_key = os.getenv("OPENAI_API_KEY")
     if api_key:
@@ -0,0 +1,207 @@
+import os
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class JsonlSink:
+    """逐条追加写入JSONL文件
+
+    默认每写一条立即刷新到磁盘；deferred 为真时记录先缓存在内存中，
+    调用 flush() 时才写入（例如与抓取检查点同时落盘，中断后文件内容与检查点一致）。
+    """
+
+    def __init__(self, filepath, append=False, deferred=False):
+        """初始化输出文件
+
+        Args:
+            filepath: JSONL文件路径
+            append: 是否追加到已有文件（否则清空重写）
+            deferred: 是否缓存记录直到 flush() 或 close()
+        """
+        self.filepath = filepath
+        self.deferred = deferred
+        self.count = 0
+        self._pending = []
+        self._lock = threading.Lock()
+        directory = os.path.dirname(filepath)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._file = open(filepath, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, record):
+        """写入一条记录"""
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            self.count += 1
+            if self.deferred:
+                self._pending.append(line)
+                return
+            self._file.write(line)
+            self._file.flush()
+
+    def flush(self):
+        """把缓存的记录写入磁盘"""
+        with self._lock:
+            if self._file.closed:
+                return
+            if self._pending:
+                self._file.write(''.join(self._pending))
+                self._pending = []
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def iter_jsonl(filepath):
+    """惰性读取JSONL文件
+
+    无法解析的行（例如程序中断时写了一半的最后一行）会被跳过。
+
+    Args:
+        filepath: JSONL文件路径
+
+    Yields:
+        每行解析得到的对象
+    """
+    try:
+        f = open(filepath, 'r', encoding='utf-8')
+    except OSError as e:
+        logger.error(f"打开数据文件 {filepath} 失败: {str(e)}")
+        return
+
+    with f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"跳过 {filepath} 第 {line_no} 行: {str(e)}")
+
+
+class JsonArraySink:
+    """逐条写入JSON数组文件，输出格式与 json.dump(列表, ensure_ascii=False, indent=2) 相同"""
+
+    def __init__(self, filepath, indent=2):
+        """初始化输出文件
+
+        Args:
+            filepath: JSON文件路径
+            indent: 缩进空格数
+        """
+        self.filepath = filepath
+        self.indent = indent
+        self.count = 0
+        directory = os.path.dirname(filepath)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._file = open(filepath, 'w', encoding='utf-8')
+
+    def write(self, record):
+        """写入一个数组元素"""
+        prefix = ' ' * self.indent
+        text = json.dumps(record, ensure_ascii=False, indent=self.indent)
+        self._file.write(('[\n' if self.count == 0 else ',\n') + prefix + text.replace('\n', '\n' + prefix))
+        self.count += 1
+
+    def close(self):
+        """写入数组结尾并关闭文件"""
+        self._file.write('\n]' if self.count else '[]')
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def iter_json_array(filepath, chunk_size=1 << 16):
+    """逐个读取JSON数组文件中的元素，不把整个文件载入内存
+
+    Args:
+        filepath: 顶层为数组的JSON文件路径
+        chunk_size: 每次读取的字符数
+
+    Yields:
+        数组中的每个元素
+    """
+    try:
+        f = open(filepath, 'r', encoding='utf-8')
+    except OSError as e:
+        logger.error(f"打开数据文件 {filepath} 失败: {str(e)}")
+        return
+
+    decoder = json.JSONDecoder()
+    with f:
+        buffer = ''
+        pos = 0
+        eof = False
+        started = False
+
+        def fill():
+            nonlocal buffer, pos, eof
+            # 至少读入与未解析部分等长的内容：跨越缓冲区的大元素每次重试时缓冲区翻倍，
+            # raw_decode 的重复解析总量与元素大小成正比，而不是 O(元素大小²/chunk_size)
+            data = f.read(max(chunk_size, len(buffer) - pos))
+            if not data:
+                eof = True
+            # 丢弃已解析的部分，避免缓冲区无限增长
+            buffer = buffer[pos:] + data
+            pos = 0
+
+        while True:
+            # 跳过空白和元素之间的逗号
+            while True:
+                while pos < len(buffer) and (buffer[pos].isspace() or (started and buffer[pos] == ',')):
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    break
+                fill()
+
+            if pos >= len(buffer):
+                if started:
+                    logger.warning(f"数据文件 {filepath} 的JSON数组不完整")
+                return
+            if not started:
+                if buffer[pos] != '[':
+                    logger.error(f"数据文件 {filepath} 的顶层不是JSON数组")
+                    return
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                return
+
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if eof:
+                    logger.error(f"解析数据文件 {filepath} 失败: {str(e)}")
+                    return
+                # 元素跨越了缓冲区末尾，继续读取
+                fill()
+                continue
+            # 数字等元素可能在缓冲区末尾被截断（如 1.5 只读到 1.），读到其后的分隔符之前不产出
+            after = end
+            while after < len(buffer) and buffer[after].isspace():
+                after += 1
+            if not eof and (after >= len(buffer) or buffer[after] not in ',]'):
+                fill()
+                continue
+            pos = end
+            yield item
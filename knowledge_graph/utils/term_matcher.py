@@ -0,0 +1,158 @@
+from array import array
+from collections import deque
+from knowledge_graph.utils.terms import load_terms
+
+# 边的键为 (节点编号 << CHAR_BITS) | 字符码位，Unicode码位不超过21位
+CHAR_BITS = 21
+
+
+class TermMatcher:
+    """基于Aho-Corasick自动机的多模式术语匹配
+
+    一次扫描文本即可找出全部术语（包括互相重叠、互为子串的术语）及其位置，
+    匹配耗时与术语数量无关。为控制十万级术语时的内存占用，所有边存放在一个
+    以整数为键的字典中，失败指针、输出指针和终止标记使用紧凑的 array 存储。
+    """
+
+    def __init__(self, terms=()):
+        """初始化匹配器
+
+        Args:
+            terms: 术语列表，匹配结果中的术语编号即术语在列表中的顺序（重复术语只保留第一次）
+        """
+        self.terms = []
+        self._term_ids = {}
+        self._goto = {}
+        self._terminal = array('i', [-1])
+        self._fail = None
+        self._output = None
+        for term in terms:
+            self.add(term)
+        self.build()
+
+    @classmethod
+    def from_dict_file(cls, dict_path, extra_terms=()):
+        """从jieba格式的词典文件构建匹配器
+
+        Args:
+            dict_path: 词典文件路径（每行: 词 词频 词性）
+            extra_terms: 额外的术语，排在词典术语之前
+
+        Returns:
+            TermMatcher实例
+        """
+        return cls(list(extra_terms) + load_terms(dict_path))
+
+    def __len__(self):
+        return len(self.terms)
+
+    def add(self, term):
+        """加入一个术语，加入后需要调用 build() 重新构建失败指针
+
+        Returns:
+            术语编号
+        """
+        if not term:
+            return -1
+        if term in self._term_ids:
+            return self._term_ids[term]
+
+        node = 0
+        for ch in term:
+            key = (node << CHAR_BITS) | ord(ch)
+            child = self._goto.get(key)
+            if child is None:
+                child = len(self._terminal)
+                self._goto[key] = child
+                self._terminal.append(-1)
+            node = child
+
+        term_id = len(self.terms)
+        self.terms.append(term)
+        self._term_ids[term] = term_id
+        self._terminal[node] = term_id
+        self._fail = None
+        return term_id
+
+    def build(self):
+        """按广度优先顺序计算失败指针和输出指针"""
+        size = len(self._terminal)
+        fail = array('i', bytes(4 * size))
+        output = array('i', bytes(4 * size))
+
+        # 临时的子节点表，只在构建时使用
+        children = [None] * size
+        mask = (1 << CHAR_BITS) - 1
+        for key, child in self._goto.items():
+            parent = key >> CHAR_BITS
+            if children[parent] is None:
+                children[parent] = []
+            children[parent].append((key & mask, child))
+
+        queue = deque(child for _, child in (children[0] or ()))
+        while queue:
+            node = queue.popleft()
+            for code, child in children[node] or ():
+                state = fail[node]
+                while True:
+                    target = self._goto.get((state << CHAR_BITS) | code)
+                    if target is not None or state == 0:
+                        break
+                    state = fail[state]
+                fail[child] = target if target is not None else 0
+                # 输出指针指向失败链上最近的终止节点
+                suffix = fail[child]
+                output[child] = suffix if self._terminal[suffix] >= 0 else output[suffix]
+                queue.append(child)
+
+        self._fail = fail
+        self._output = output
+
+    def finditer(self, text):
+        """扫描文本，产出所有术语出现
+
+        Args:
+            text: 输入文本
+
+        Yields:
+            (起始位置, 结束位置, 术语编号)，按结束位置递增
+        """
+        if self._fail is None:
+            self.build()
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        terminal = self._terminal
+        terms = self.terms
+
+        node = 0
+        for end, ch in enumerate(text, 1):
+            code = ord(ch)
+            while True:
+                target = goto.get((node << CHAR_BITS) | code)
+                if target is not None or node == 0:
+                    break
+                node = fail[node]
+            node = target if target is not None else 0
+
+            match = node if terminal[node] >= 0 else output[node]
+            while match:
+                term_id = terminal[match]
+                yield end - len(terms[term_id]), end, term_id
+                match = output[match]
+
+    def find_all(self, text):
+        """返回文本中所有术语出现
+
+        Returns:
+            [(起始位置, 结束位置, 术语)] 列表
+        """
+        return [(start, end, self.terms[term_id]) for start, end, term_id in self.finditer(text)]
+
+    def matched_terms(self, text):
+        """返回文本中出现过的不同术语，按术语编号（加入顺序）排列
+
+        结果与依次判断 `term in text` 得到的列表相同。
+        """
+        term_ids = {term_id for _, _, term_id in self.finditer(text)}
+        return [self.terms[term_id] for term_id in sorted(term_ids)]
@@ -0,0 +1,38 @@
+import os
+
+# 预定义的知识图谱相关术语，处理器和爬虫共用
+KG_TERMS = [
+    "知识图谱", "本体论", "语义网", "RDF", "SPARQL", "图数据库", 
+    "三元组", "实体", "关系", "属性", "类别", "子类", "推理", 
+    "链接数据", "知识抽取", "知识表示", "知识推理", "知识融合",
+    "本体", "词向量", "语义", "查询", "数据挖掘", "机器学习",
+    "自然语言处理", "NLP", "实体识别", "命名实体", "关系抽取",
+    "知识库", "知识工程", "语义网络", "语义框架", "语义角色",
+    "知识表示与推理", "知识获取", "知识发现", "知识计算", "知识问答",
+    "图谱构建", "图谱应用", "图谱可视化", "图谱查询", "图谱推理",
+    "图谱融合", "图谱存储", "图谱更新", "图谱评估", "图谱标准",
+    "语义搜索", "语义推理", "语义标注", "语义计算", "语义集成"
+]
+
+
+def load_terms(dict_path):
+    """从jieba格式的词典文件（每行: 词 词频 词性）读取术语
+
+    Args:
+        dict_path: 词典文件路径
+
+    Returns:
+        术语列表（保持文件中的顺序并去重），文件不存在时返回预定义术语
+    """
+    if not os.path.exists(dict_path):
+        return list(KG_TERMS)
+
+    terms = []
+    seen = set()
+    with open(dict_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.strip().split()
+            if parts and parts[0] not in seen:
+                seen.add(parts[0])
+                terms.append(parts[0])
+    return terms
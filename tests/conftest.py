@@ -0,0 +1,61 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class FakeOpenAIServer:
+    """本地的 Chat Completions 接口，记录收到的提示并按 reply 返回结果
+
+    reply(prompt) 返回助手消息文本，或 (HTTP状态码, 错误信息) 表示请求失败。
+    """
+
+    def __init__(self):
+        self.prompts = []
+        self.reply = lambda prompt: '[]'
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                prompt = body['messages'][-1]['content']
+                with server._lock:
+                    server.prompts.append(prompt)
+                result = server.reply(prompt)
+                if isinstance(result, tuple):
+                    status, payload = result[0], {'error': {'message': result[1], 'type': 'server_error'}}
+                else:
+                    status = 200
+                    payload = {'id': 'chatcmpl-test', 'object': 'chat.completion', 'created': 0,
+                               'model': body['model'],
+                               'choices': [{'index': 0, 'finish_reason': 'stop',
+                                            'message': {'role': 'assistant', 'content': result}}]}
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    """启动本地假OpenAI服务，并让 OpenAI/AsyncOpenAI 客户端连接到它"""
+    server = FakeOpenAIServer()
+    thread = threading.Thread(target=server.httpd.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv('OPENAI_BASE_URL', server.url)
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
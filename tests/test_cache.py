@@ -0,0 +1,35 @@
+import random
+
+from knowledge_graph.crawler.cache import ResponseCache
+
+
+def stored_bytes(cache):
+    return cache.conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+
+def test_running_total_matches_index(tmp_path):
+    """写入、覆盖和淘汰之后，累计的总大小与索引中的 SUM(size) 一致，并且不超过上限"""
+    rng = random.Random(5)
+    cache = ResponseCache(str(tmp_path / 'cache'), max_bytes=20000)
+    for _ in range(200):
+        url = f"https://example.com/page/{rng.randrange(40)}"
+        cache.put(url, '知' * rng.randint(10, 3000), etag=str(rng.random()))
+        assert cache.total_bytes == stored_bytes(cache)
+        assert cache.total_bytes <= cache.max_bytes
+    cache.close()
+
+    reopened = ResponseCache(str(tmp_path / 'cache'), max_bytes=20000)
+    assert reopened.total_bytes == stored_bytes(reopened)
+    assert reopened.stats()['bytes'] == reopened.total_bytes
+
+
+def test_lookup_does_not_count_as_hit(tmp_path):
+    """查询缓存本身不计入命中，由调用方按条目是否被使用记录"""
+    cache = ResponseCache(str(tmp_path / 'cache'))
+    cache.put('https://example.com/a', '正文', etag='"v1"')
+    assert cache.get('https://example.com/a')['etag'] == '"v1"'
+    assert cache.get('https://example.com/b') is None
+    assert (cache.hits, cache.misses) == (0, 0)
+    cache.record(True)
+    cache.record(False)
+    assert (cache.stats()['hits'], cache.stats()['misses']) == (1, 1)
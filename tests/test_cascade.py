@@ -0,0 +1,143 @@
+import pytest
+
+from knowledge_graph.processor.cascade import CascadeSelector, SharedBudget, evaluate_cascade, pair_of
+
+
+def entities(*texts):
+    return [{'text': text} for text in texts]
+
+
+def relation(subject, predicate, obj):
+    return {'subject': subject, 'predicate': predicate, 'object': obj}
+
+
+def test_scores_follow_density_uncovered_and_novelty():
+    """实体密度、模式未覆盖率和新颖度按定义计算，得分为三者的加权和"""
+    text = 'RDF与SPARQL相关，二者都用于语义网。本体论也很重要。'
+    doc_entities = entities('RDF', 'SPARQL', '本体论')
+    selector = CascadeSelector(density_ref=20.0)
+
+    scored = selector.score(text, doc_entities, [])
+    density = 3 * 100 / len(text) / 20.0
+    assert scored['density'] == round(density, 4)
+    assert (scored['pairs'], scored['uncovered'], scored['novelty']) == (1, 1.0, 1.0)
+    assert scored['score'] == round(0.3 * density + 0.4 + 0.3, 4)
+
+    # 模式关系覆盖了唯一的共现实体对（主客体顺序无关），当前图谱中已有该实体对
+    covered = CascadeSelector(density_ref=20.0, known_pairs=[('SPARQL', 'RDF')])
+    scored = covered.score(text, doc_entities, [relation('SPARQL', 'uses', 'RDF')])
+    assert (scored['uncovered'], scored['novelty']) == (0.0, 0.0)
+    assert scored['score'] == round(0.3 * density, 4)
+
+    # 没有共现实体对时，新颖度按实体计算
+    lone = CascadeSelector(known_entities=['本体论'])
+    assert lone.score('本体论。语义网。', entities('本体论', '语义网'), [])['novelty'] == 0.5
+    assert lone.score('本体论。', entities('本体论'), [])['novelty'] == 0.0
+    assert lone.score('没有实体。', [], [])['score'] == 0.0
+
+
+def novelty_documents():
+    """新颖度依次为 1、0.5、0、1 的四篇文档（已知实体对为 知识图谱-本体论）"""
+    return [
+        ('RDF和SPARQL。', entities('RDF', 'SPARQL'), []),
+        ('知识图谱和本体论。知识图谱和语义网。', entities('知识图谱', '本体论', '语义网'), []),
+        ('知识图谱和本体论。', entities('知识图谱', '本体论'), []),
+        ('实体和关系。', entities('实体', '关系'), []),
+    ]
+
+
+def test_threshold_and_budget():
+    """低于阈值的文档不调用大模型；超出预算时按得分从高到低选择，预算跨批次累计"""
+    selector = CascadeSelector(threshold=0.5, budget=2, weights=(0, 0, 1), known_pairs=[('知识图谱', '本体论')])
+    selected, scores = selector.select(novelty_documents())
+    assert [s['score'] for s in scores] == [1.0, 0.5, 0.0, 1.0]
+    assert selected == [True, False, False, True]
+    assert selector.stats == {'documents': 4, 'llm_calls': 2, 'below_threshold': 1, 'over_budget': 1}
+
+    selected, _ = selector.select(novelty_documents())
+    assert selected == [False] * 4
+    assert selector.summary()['saved'] == 6
+
+    unlimited = CascadeSelector(threshold=0.5, weights=(0, 0, 1), known_pairs=[('知识图谱', '本体论')])
+    assert unlimited.select(novelty_documents())[0] == [True, True, False, True]
+
+
+def test_shared_budget_pool_replaces_local_budget():
+    """设置 budget_pool 时从共享预算领取调用次数，多个选择器合计不超过预算"""
+    pool = SharedBudget(3)
+    selectors = [CascadeSelector(threshold=0.5, budget=3, weights=(0, 0, 1), budget_pool=pool) for _ in range(2)]
+    calls = [sum(selector.select(novelty_documents())[0]) for selector in selectors]
+    assert calls == [3, 0]
+    assert pool.remaining == 0
+
+
+class LabelledProcessor:
+    """返回固定实体、模式关系和大模型关系的处理器，用于评估级联抽取"""
+
+    use_openai = True
+    llm_extractor = object()
+
+    def __init__(self, output_dir, documents):
+        self.output_dir = output_dir
+        self.documents = {text: value for text, *value in documents}
+        self.llm_requests = 0
+
+    def extract_entities_batch(self, texts):
+        return [self.documents[text][0] for text in texts]
+
+    def extract_relations_with_patterns(self, text, doc_entities):
+        return self.documents[text][1]
+
+    def request_relations_batch(self, texts, entities_batch):
+        self.llm_requests += len(texts)
+        return [self.documents[text][2] for text in texts]
+
+
+LABELLED = [
+    # (文本, 实体, 模式关系, 大模型关系, 标注关系)
+    ('知识图谱包括本体论。', entities('知识图谱', '本体论'), [relation('知识图谱', 'includes', '本体论')],
+     [relation('知识图谱', 'includes', '本体论'), relation('本体论', 'belongs_to', '知识图谱')],
+     [relation('知识图谱', 'includes', '本体论'), relation('本体论', 'belongs_to', '知识图谱')]),
+    ('RDF和SPARQL。', entities('RDF', 'SPARQL'), [], [relation('SPARQL', 'uses', 'RDF')],
+     [relation('SPARQL', 'uses', 'RDF')]),
+    ('语义网。', entities('语义网'), [], [], [relation('语义网', 'is_a', '技术')]),
+]
+
+
+@pytest.fixture
+def labelled(tmp_path, monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    processor = LabelledProcessor(str(tmp_path), [(text, e, p, l) for text, e, p, l, _ in LABELLED])
+    samples = [{'text': text, 'relations': gold} for text, *_, gold in LABELLED]
+    return processor, samples
+
+
+def test_evaluate_cascade_reports_saved_calls_and_recall(labelled):
+    """评估报告中的节省调用数和各模式的召回率与手工计算一致"""
+    processor, samples = labelled
+    # 得分：0.3+0+0.3=0.6、0.3+0.4+0.3=1.0、0.3+0+0.3=0.6，阈值0.7时只有第二篇调用大模型
+    report = evaluate_cascade(processor, samples, threshold=0.7)
+    assert [s['score'] for s in report['scores']] == [0.6, 1.0, 0.6]
+    assert (report['llm_calls_full'], report['llm_calls_cascade'], report['llm_calls_saved']) == (3, 1, 2)
+    assert processor.llm_requests == 3
+    assert report['recall_patterns_only'] == round((0.5 + 0 + 0) / 3, 4)
+    assert report['recall_full'] == round((1 + 1 + 0) / 3, 4)
+    assert report['recall_cascade'] == round((0.5 + 1 + 0) / 3, 4)
+    assert report['recall_lost'] == round(report['recall_full'] - report['recall_cascade'], 4)
+
+
+def test_evaluate_cascade_budget(labelled):
+    """预算为0时级联抽取的召回率等于只用模式匹配，不设预算且阈值为0时等于全量抽取"""
+    processor, samples = labelled
+    report = evaluate_cascade(processor, samples, threshold=0.0, budget=0)
+    assert report['llm_calls_cascade'] == 0
+    assert report['recall_cascade'] == report['recall_patterns_only']
+
+    report = evaluate_cascade(processor, samples, threshold=0.0)
+    assert report['llm_calls_saved'] == 0
+    assert report['recall_cascade'] == report['recall_full']
+    assert report['recall_lost'] == 0.0
+
+
+def test_pair_of_is_unordered():
+    assert pair_of('b', 'a') == pair_of('a', 'b') == ('a', 'b')
@@ -0,0 +1,75 @@
+import random
+
+from knowledge_graph.processor.chunking import (Chunk, merge_chunk_entities, merge_chunk_relations, sentence_spans,
+                                                sliding_windows)
+from knowledge_graph.utils.term_matcher import TermMatcher
+
+TERMS = ['知识图谱', '实体识别', '关系抽取', '本体论', 'SPARQL']
+
+
+def random_text(rng, sentences):
+    parts = []
+    for _ in range(sentences):
+        words = [rng.choice(TERMS + ['的', '是', '一种', '用于', '数据', '方法', '系统']) for _ in range(rng.randint(1, 25))]
+        parts.append(''.join(words) + rng.choice('。！？\n'))
+    return ''.join(parts)
+
+
+def test_short_text_is_a_single_window():
+    """不超过窗口长度的文本与切分前完全相同（只有一个窗口）"""
+    text = '知识图谱是一种语义网络。'
+    assert sliding_windows(text, 100) == [Chunk(0, len(text), text)]
+
+
+def test_windows_cover_text_on_sentence_boundaries():
+    """窗口按位置排列、覆盖全文、不超过最大长度，边界落在句子边界上，相邻窗口重叠不超过 overlap"""
+    rng = random.Random(22)
+    for _ in range(100):
+        text = random_text(rng, rng.randint(1, 80))
+        max_chars = rng.randint(40, 400)
+        overlap = rng.randint(0, max_chars // 2)
+        chunks = sliding_windows(text, max_chars, overlap)
+        boundaries = {start for start, _ in sentence_spans(text, max_chars)} | {len(text)}
+
+        assert chunks[0].start == 0 and chunks[-1].end == len(text)
+        for chunk in chunks:
+            assert chunk.text == text[chunk.start:chunk.end]
+            assert len(chunk.text) <= max_chars
+            assert chunk.start in boundaries and chunk.end in boundaries
+        for previous, current in zip(chunks, chunks[1:]):
+            assert previous.start < current.start <= previous.end
+            assert previous.end - current.start <= overlap
+
+
+def test_merged_chunk_entities_match_whole_document():
+    """逐窗口识别后合并的实体，与整篇文档一次识别的结果相同（重叠区域不重复）"""
+    rng = random.Random(23)
+    matcher = TermMatcher(TERMS)
+    for _ in range(50):
+        text = random_text(rng, rng.randint(5, 60))
+        whole = [{'text': term, 'label': 'KG_TERM'} for _, _, term in sorted(matcher.find_all(text))]
+        chunk_results = [(chunk, [(start, end, {'text': term, 'label': 'KG_TERM'})
+                                  for start, end, term in matcher.find_all(chunk.text)])
+                         for chunk in sliding_windows(text, 200, 60)]
+        assert merge_chunk_entities(chunk_results) == whole
+
+
+def test_relations_in_the_overlap_are_kept_once():
+    text = '甲是乙。丙是丁。戊是己。'
+    first, second = Chunk(0, 8, text[:8]), Chunk(4, 12, text[4:])
+    relation = {'subject': '丙', 'predicate': 'is_a', 'object': '丁', 'sentence': '丙是丁'}
+    merged = merge_chunk_relations([(first, [dict(relation)]), (second, [dict(relation)])])
+    assert merged == [relation]
+
+
+def test_llm_prompt_is_not_truncated_below_the_window_size(fake_openai, tmp_path):
+    """大模型窗口大于8000字时，每个窗口完整地出现在提示中"""
+    from knowledge_graph.processor.processor import KnowledgeProcessor
+
+    processor = KnowledgeProcessor(input_dir=str(tmp_path), output_dir=str(tmp_path), llm_concurrency=1,
+                                   llm_cache=False, llm_chunk_chars=12000)
+    text = '知识图谱是一种语义网络。' * 900
+    processor.extract_relations_with_openai(text, [])
+    windows = [chunk.text for chunk in sliding_windows(text, 12000, processor.chunk_overlap)]
+    assert len(fake_openai.prompts) == len(windows) > 0
+    assert all(window in prompt for window, prompt in zip(windows, fake_openai.prompts))
@@ -0,0 +1,79 @@
+import random
+
+from knowledge_graph.processor.dedup import NearDuplicateDetector
+
+BASE = ("知识图谱是一种用图结构描述实体及其关系的知识表示方法，广泛应用于搜索引擎、问答系统和推荐系统。"
+        "构建知识图谱通常包括知识抽取、知识融合、知识推理和知识存储等步骤。")
+
+
+def brute_force_duplicate(detector, fingerprints, text):
+    """不使用LSH索引，与全部已加入文档逐一比较汉明距离"""
+    normalized = detector.normalize(text)
+    fingerprint = detector.fingerprint(normalized)
+    return any(bin(fingerprint ^ other).count('1') <= detector.max_distance for other in fingerprints)
+
+
+def test_lsh_index_matches_pairwise_comparison():
+    """LSH分段索引的判定结果与逐对比较完全一致（max_distance < bands 时不漏检）"""
+    rng = random.Random(7)
+    alphabet = "知识图谱实体关系抽取融合推理存储查询语义网络本体数据模型方法系统应用"
+    documents = []
+    for _ in range(60):
+        base = ''.join(rng.choice(alphabet) for _ in range(120))
+        documents.append(base)
+        # 少量编辑后的副本
+        edited = list(base)
+        for _ in range(rng.randint(0, 6)):
+            edited[rng.randrange(len(edited))] = rng.choice(alphabet)
+        documents.append(''.join(edited))
+
+    detector = NearDuplicateDetector()
+    fingerprints = []
+    for i, text in enumerate(documents):
+        expected = brute_force_duplicate(detector, fingerprints, text)
+        assert (detector.add(i, text) is not None) == expected
+        if not expected:
+            fingerprints.append(detector.fingerprint(detector.normalize(text)))
+
+
+def test_reformatted_copy_is_duplicate():
+    """只有空白、标点和大小写差异的转载被识别为重复，内容不同的文档不受影响"""
+    detector = NearDuplicateDetector()
+    assert detector.add('a', BASE) is None
+    assert detector.add('b', BASE.replace('，', ', ').replace('。', '.\n')) == 'a'
+    assert detector.add('c', "SPARQL是RDF数据的标准查询语言，支持基本图模式匹配、过滤、聚合和子查询等功能。") is None
+
+
+def reference_fingerprint(detector, text):
+    """逐个shingle、逐位累加权重的SimHash实现"""
+    import hashlib
+    from collections import Counter
+
+    size = detector.shingle_size
+    shingles = Counter(text[i:i + size] for i in range(max(1, len(text) - size + 1)))
+    weights = [0] * 64
+    for shingle, count in shingles.items():
+        h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(64):
+            weights[bit] += count if h >> bit & 1 else -count
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def test_fingerprint_matches_bitwise_reference():
+    """向量化的指纹与逐位计算的结果相同（包括重复shingle和短文本）"""
+    detector = NearDuplicateDetector()
+    rng = random.Random(3)
+    texts = [BASE, BASE * 3, 'ab', 'a', '知识图谱知识图谱知识图谱']
+    texts += [''.join(rng.choice('知识图谱实体关系abc') for _ in range(rng.randint(1, 400))) for _ in range(30)]
+    for text in texts:
+        normalized = detector.normalize(text)
+        assert detector.fingerprint(normalized) == reference_fingerprint(detector, normalized)
+
+
+def test_exact_copy_of_dropped_near_duplicate_reports_the_kept_document():
+    """被判为近似重复而丢弃的文档不登记为精确副本的来源"""
+    detector = NearDuplicateDetector()
+    near = BASE + '知识图谱'
+    assert detector.add('a', BASE) is None
+    assert detector.add('b', near) == 'a'
+    assert detector.add('c', near) == 'a'
@@ -0,0 +1,147 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from knowledge_graph.crawler.session import is_html_content_type, read_limited
+
+PAGES = {
+    '/ok': (200, 'text/html; charset=utf-8', '<html><body>知识图谱</body></html>'.encode('utf-8')),
+    '/large': (200, 'text/html', b'<p>' + b'x' * 300000 + b'</p>'),
+    '/pdf': (200, 'application/pdf', b'%PDF-1.4'),
+    '/missing': (404, 'text/html', b'not found'),
+    '/unavailable': (503, 'text/html', b'try later'),
+}
+# 两个互相链接的维基百科页面
+for _name, _link in (('kg', 'ontology'), ('ontology', 'kg')):
+    PAGES[f'/wiki/{_name}'] = (200, 'text/html; charset=utf-8',
+                               f'<html><body><h1 id="firstHeading">{_name}</h1><div id="mw-content-text">'
+                               f'<p>知识图谱是语义网络。</p><a href="/wiki/{_link}">{_link}</a></div></body></html>'.encode('utf-8'))
+
+
+# 带ETag的页面：/stable 内容不变（条件请求返回304），/changing 每次请求内容都不同
+ETAG_VERSIONS = {'/stable': 0, '/changing': 0}
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path in ETAG_VERSIONS:
+            if self.path == '/changing':
+                ETAG_VERSIONS[self.path] += 1
+            etag = f'"{ETAG_VERSIONS[self.path]}"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            body = f'<html><body>版本 {etag}</body></html>'.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        status, content_type, body = PAGES.get(self.path, (404, 'text/plain', b'not found'))
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        # /large 不声明长度，只能在下载时按上限截断
+        if self.path != '/large':
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_read_limited_matches_full_download(server):
+    """未超过上限时流式读取的正文与一次性下载相同，超过上限时截断"""
+    expected = requests.get(server + '/large').content
+    with requests.get(server + '/large', stream=True) as response:
+        body, truncated = read_limited(response, 1 << 20, chunk_size=4096)
+    assert (bytes(body), truncated) == (expected, False)
+
+    with requests.get(server + '/large', stream=True) as response:
+        body, truncated = read_limited(response, 100000, chunk_size=4096)
+    assert truncated
+    assert expected.startswith(bytes(body))
+
+
+def test_html_content_types():
+    assert is_html_content_type('text/html; charset=utf-8')
+    assert is_html_content_type(None)
+    assert not is_html_content_type('application/pdf')
+
+
+def make_crawler(tmp_path, use_cache=0):
+    # 爬虫模块依赖 browser_use（浏览器代理），未安装时跳过
+    spider = pytest.importorskip('knowledge_graph.crawler.spider')
+    crawler = spider.KnowledgeGraphCrawler(output_dir=str(tmp_path), use_agent=0, use_cache=use_cache, use_archive=0,
+                                           retries=0, max_page_mb=0.2)
+    crawler.throttle.wait = lambda url: 0.0
+    return crawler
+
+
+@pytest.fixture
+def crawler(tmp_path):
+    return make_crawler(tmp_path)
+
+
+def test_error_responses_are_counted(crawler, server):
+    """4xx/5xx响应与成功响应一样计入状态码和延迟统计"""
+    assert crawler.fetch_html(server + '/missing') is None
+    assert crawler.fetch_html(server + '/ok') is not None
+    assert crawler.fetch_html(server + '/unavailable') is None
+
+    host = server.split('//', 1)[1]
+    statuses = {key[2]: count for key, count in crawler.telemetry.statuses.items() if key[0] == host}
+    assert statuses == {'404': 1, '200': 1, '503': 1}
+    assert sum(hist.count for key, hist in crawler.telemetry.latency.items() if key[0] == host) == 3
+
+
+def test_skipped_pages(crawler, server):
+    """非HTML页面不下载正文，超过大小上限的页面被截断"""
+    assert crawler.fetch_html(server + '/pdf') is None
+    text = crawler.fetch_html(server + '/large')
+    assert text is not None and len(text) <= crawler.max_page_bytes
+
+    host = server.split('//', 1)[1]
+    skipped = {key[2]: count for key, count in crawler.telemetry.skipped.items() if key[0] == host}
+    assert skipped == {'content_type': 1, 'truncated': 1}
+
+
+def test_parse_and_extract_are_timed_once_per_page(crawler, server):
+    """每个页面的文档树构建记入parse阶段、字段抽取记入extract阶段，各记录一次"""
+    crawler.wiki_base_url = server
+    pages = list(crawler.iter_wikipedia(keyword='kg', max_pages=2))
+    assert len(pages) == 2
+
+    host = server.split('//', 1)[1]
+    counts = {key[2]: hist.count for key, hist in crawler.telemetry.phases.items() if key[0] == host}
+    assert counts['parse'] == counts['extract'] == 2
+
+
+def test_cache_hits_count_only_served_entries(tmp_path, server):
+    """304时计为缓存命中；条件请求返回200和新正文时计为未命中"""
+    crawler = make_crawler(tmp_path, use_cache=1)
+    first = crawler.fetch_html(server + '/stable')
+    assert crawler.fetch_html(server + '/stable') == first
+    crawler.fetch_html(server + '/changing')
+    assert crawler.fetch_html(server + '/changing') != first
+
+    stats = crawler.cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 3)
+    host = server.split('//', 1)[1]
+    cache_counts = {key[2]: count for key, count in crawler.telemetry.cache.items() if key[0] == host}
+    assert cache_counts == {'hit': 1, 'miss': 3}
@@ -0,0 +1,110 @@
+from knowledge_graph.crawler.frontier import CrawlFrontier
+
+URLS = [f"https://example.com/page/{i}" for i in range(12)]
+
+
+def drain(frontier, name):
+    popped = []
+    while True:
+        item = frontier.pop(name)
+        if item is None:
+            return popped
+        frontier.mark_visited(item[0])
+        popped.append(item)
+
+
+def fill(frontier, name):
+    frontier.start(name, URLS[:2])
+    for i, url in enumerate(URLS[2:]):
+        frontier.push(name, url, score=i % 4, depth=1 + i % 3)
+
+
+def test_resume_from_checkpoint_matches_uninterrupted_run(tmp_path):
+    """从检查点恢复后的出队顺序与未中断时相同（FIFO和优先级两种模式）"""
+    for prioritized in (False, True):
+        reference = CrawlFrontier(prioritized=prioritized)
+        fill(reference, 'q')
+        expected = drain(reference, 'q')
+
+        path = str(tmp_path / f"frontier_{prioritized}.json")
+        frontier = CrawlFrontier(checkpoint_path=path, prioritized=prioritized)
+        fill(frontier, 'q')
+        head = [frontier.pop('q') for _ in range(3)]
+        for url, _ in head:
+            frontier.mark_visited(url)
+        frontier.checkpoint()
+
+        resumed = CrawlFrontier(checkpoint_path=path, prioritized=prioritized)
+        assert resumed.load()
+        resumed.start('q', URLS[:2])
+        assert head + drain(resumed, 'q') == expected
+
+
+def test_visited_urls_are_not_requeued(tmp_path):
+    """已访问的URL（按规范化URL判断）在恢复后不会再次入队"""
+    path = str(tmp_path / 'frontier.json')
+    frontier = CrawlFrontier(checkpoint_path=path)
+    frontier.start('q', [URLS[0]])
+    frontier.mark_visited(frontier.pop('q')[0])
+    frontier.checkpoint()
+
+    resumed = CrawlFrontier(checkpoint_path=path)
+    resumed.load()
+    assert not resumed.push('q', URLS[0] + '#section')
+    assert resumed.pop('q') is None
+
+
+class Killed(Exception):
+    pass
+
+
+def crawl(frontier, sink, kill_after=None):
+    """与 iter_baidu_baike 相同的抓取循环：出队、标记已访问、写入页面、记录进度"""
+    frontier.start('q', URLS[:1])
+    written = 0
+    while True:
+        entry = frontier.pop('q')
+        if entry is None:
+            break
+        url, depth = entry
+        if not frontier.mark_visited(url):
+            continue
+        if kill_after is not None and written == kill_after:
+            raise Killed()
+        sink.write({'url': url})
+        written += 1
+        frontier.record_page('q')
+        index = URLS.index(url)
+        for next_url in URLS[index + 1:index + 3]:
+            frontier.push('q', next_url, depth=depth + 1)
+    frontier.finish('q')
+
+
+def test_resumed_crawl_writes_each_page_once(tmp_path):
+    """中断后恢复抓取，JSONL中的页面与未中断时相同，检查点之后的页面不会重复写入"""
+    from knowledge_graph.utils.jsonl import JsonlSink, iter_jsonl
+
+    reference_path = str(tmp_path / 'reference.jsonl')
+    with JsonlSink(reference_path, deferred=True) as sink:
+        crawl(CrawlFrontier(checkpoint_interval=3), sink)
+    expected = [record['url'] for record in iter_jsonl(reference_path)]
+    assert len(expected) == len(URLS)
+
+    path = str(tmp_path / 'pages.jsonl')
+    checkpoint_path = str(tmp_path / 'frontier.json')
+    frontier = CrawlFrontier(checkpoint_path=checkpoint_path, checkpoint_interval=3)
+    sink = JsonlSink(path, deferred=True)
+    frontier.add_flush_hook(sink.flush)
+    try:
+        # 第3页之后保存过检查点，第4、5页已写入但尚未到下一个检查点时进程被终止
+        crawl(frontier, sink, kill_after=5)
+    except Killed:
+        pass
+    assert [record['url'] for record in iter_jsonl(path)] == expected[:3]
+
+    resumed = CrawlFrontier(checkpoint_path=checkpoint_path, checkpoint_interval=3)
+    assert resumed.load()
+    with JsonlSink(path, append=True, deferred=True) as sink:
+        resumed.add_flush_hook(sink.flush)
+        crawl(resumed, sink)
+    assert [record['url'] for record in iter_jsonl(path)] == expected
@@ -0,0 +1,98 @@
+import json
+import time
+
+import pytest
+
+from knowledge_graph.processor.llm import AsyncRelationExtractor, build_messages
+from knowledge_graph.processor.llm_cache import LLMCache
+
+RELATIONS = [{'subject': '知识图谱', 'predicate': 'is_a', 'object': '语义网络', 'method': 'openai'}]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = LLMCache(str(tmp_path / 'llm_cache.sqlite'))
+    yield cache
+    cache.close()
+
+
+def test_round_trip_and_key(cache):
+    """相同的提示、模型和温度命中缓存，任一项不同都不命中"""
+    messages = build_messages('提示')
+    cache.put(messages, 'gpt-3.5-turbo', 0.3, RELATIONS)
+    assert cache.get(messages, 'gpt-3.5-turbo', 0.3) == RELATIONS
+    assert cache.get(build_messages('另一个提示'), 'gpt-3.5-turbo', 0.3) is None
+    assert cache.get(messages, 'gpt-4', 0.3) is None
+    assert cache.get(messages, 'gpt-3.5-turbo', 0.0) is None
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_expired_entries_are_misses(cache):
+    messages = build_messages('提示')
+    cache.put(messages, 'm', 0.3, RELATIONS)
+    cache.conn.execute('UPDATE completions SET created_at = ?', (time.time() - cache.max_age - 1,))
+    assert cache.get(messages, 'm', 0.3) is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    """超过大小上限时淘汰最久未访问的条目"""
+    entry_size = len(json.dumps(RELATIONS, ensure_ascii=False).encode('utf-8'))
+    cache = LLMCache(str(tmp_path / 'llm_cache.sqlite'), max_bytes=2 * entry_size)
+    try:
+        first, second, third = (build_messages(f'提示{i}') for i in range(3))
+        cache.put(first, 'm', 0.3, RELATIONS)
+        time.sleep(0.01)
+        cache.put(second, 'm', 0.3, RELATIONS)
+        time.sleep(0.01)
+        assert cache.get(first, 'm', 0.3) == RELATIONS
+        time.sleep(0.01)
+        cache.put(third, 'm', 0.3, RELATIONS)
+
+        assert cache.get(second, 'm', 0.3) is None
+        assert cache.get(first, 'm', 0.3) == RELATIONS
+        assert cache.get(third, 'm', 0.3) == RELATIONS
+    finally:
+        cache.close()
+
+
+def test_cache_hits_skip_the_api(fake_openai, cache):
+    """第二次抽取同样的文档全部命中缓存，不再请求API，结果相同"""
+    fake_openai.reply = lambda prompt: json.dumps(RELATIONS, ensure_ascii=False)
+    documents = [(f"文档{i}", [{'text': '知识图谱'}]) for i in range(3)]
+    for _ in range(2):
+        extractor = AsyncRelationExtractor(cache=cache, rpm=None, tpm=None)
+        try:
+            assert extractor.extract(documents) == [RELATIONS] * 3
+        finally:
+            extractor.close()
+    assert len(fake_openai.prompts) == 3
+
+
+def test_unparseable_replies_are_not_cached(fake_openai, cache):
+    """无法解析的响应不写入缓存，下次运行重新请求"""
+    documents = [("文档", [{'text': '知识图谱'}])]
+    fake_openai.reply = lambda prompt: '抱歉，我无法完成这个请求'
+    extractor = AsyncRelationExtractor(cache=cache, rpm=None, tpm=None)
+    try:
+        assert extractor.extract(documents) == [[]]
+        assert cache.stats()['entries'] == 0
+
+        fake_openai.reply = lambda prompt: json.dumps(RELATIONS, ensure_ascii=False)
+        assert extractor.extract(documents) == [RELATIONS]
+        assert cache.stats()['entries'] == 1
+    finally:
+        extractor.close()
+
+
+def test_unparseable_replies_are_not_cached_on_the_sync_path(fake_openai, tmp_path):
+    from knowledge_graph.processor.processor import KnowledgeProcessor
+
+    processor = KnowledgeProcessor(input_dir=str(tmp_path), output_dir=str(tmp_path), llm_concurrency=1)
+    fake_openai.reply = lambda prompt: '抱歉'
+    assert processor.request_relations('知识图谱是一种语义网络', []) == []
+    assert processor.llm_cache.stats()['entries'] == 0
+
+    fake_openai.reply = lambda prompt: '[]'
+    assert processor.request_relations('知识图谱是一种语义网络', []) == []
+    assert processor.llm_cache.stats()['entries'] == 1
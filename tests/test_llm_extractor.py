@@ -0,0 +1,69 @@
+import asyncio
+import json
+import time
+
+from knowledge_graph.processor.llm import AsyncRelationExtractor, RateLimiter
+
+
+def echo_relation(prompt):
+    """返回以提示中的文本为主体的一个关系"""
+    text = prompt.split('文本内容: ', 1)[1].split('\n', 1)[0]
+    return json.dumps([{'subject': text, 'predicate': 'is_a', 'object': 'x', 'sentence': text}], ensure_ascii=False)
+
+
+def test_rate_limiter_window_spans_event_loops():
+    """同一个限速器在多次 asyncio.run 之间保持窗口内的请求记录"""
+    limiter = RateLimiter(rpm=3, tpm=None, window=0.3)
+
+    async def acquire(count):
+        for _ in range(count):
+            await limiter.acquire()
+
+    asyncio.run(acquire(3))
+    start = time.monotonic()
+    asyncio.run(acquire(1))
+    assert time.monotonic() - start >= 0.2
+
+
+def test_concurrent_results_keep_document_order(fake_openai):
+    """并发请求的结果按文档顺序返回，与逐个请求的结果相同"""
+    fake_openai.reply = echo_relation
+    extractor = AsyncRelationExtractor(concurrency=8, rpm=None, tpm=None)
+    documents = [(f"文档{i}", [{'text': '知识图谱'}]) for i in range(20)]
+    try:
+        relations = extractor.extract(documents)
+    finally:
+        extractor.close()
+    assert [r[0]['subject'] for r in relations] == [text for text, _ in documents]
+    assert all(r[0]['method'] == 'openai' for r in relations)
+
+
+def test_retries_on_server_errors(fake_openai):
+    """429/5xx响应退避后重试"""
+    attempts = {}
+
+    def flaky(prompt):
+        attempts[prompt] = attempts.get(prompt, 0) + 1
+        return (503, 'overloaded') if attempts[prompt] == 1 else echo_relation(prompt)
+
+    fake_openai.reply = flaky
+    extractor = AsyncRelationExtractor(concurrency=4, rpm=None, tpm=None, base_delay=0.01, max_delay=0.05)
+    try:
+        relations = extractor.extract([("文档", [])])
+    finally:
+        extractor.close()
+    assert relations[0][0]['subject'] == '文档'
+    assert extractor.stats['retries'] == 1
+
+
+def test_client_and_limiter_are_shared_across_batches(fake_openai):
+    """多次 extract 共用同一个客户端和限速器，RPM/TPM限制对整个运行生效"""
+    extractor = AsyncRelationExtractor(concurrency=4, rpm=1000, tpm=None)
+    try:
+        extractor.extract([("文档1", []), ("文档2", [])])
+        client = extractor._client
+        extractor.extract([("文档3", [])])
+        assert extractor._client is client
+        assert len(extractor.limiter._events) == 3
+    finally:
+        extractor.close()
@@ -0,0 +1,106 @@
+import json
+import random
+import re
+
+from knowledge_graph.processor.llm import (AsyncRelationExtractor, build_document_block, count_tokens,
+                                           pack_documents, parse_packed_relations)
+
+PACKED_DOCUMENT = re.compile(r'文档编号: (D\d+)\n文本内容: (.*)\n')
+
+
+def relation_for(text):
+    return {'subject': text, 'predicate': 'is_a', 'object': 'x', 'sentence': text}
+
+
+def packed_reply(prompt, drop=()):
+    """按文档编号返回每篇文档的关系，单文档提示返回关系数组；drop 中的文档编号不出现在响应里"""
+    documents = PACKED_DOCUMENT.findall(prompt)
+    if not documents:
+        text = prompt.split('文本内容: ', 1)[1].split('\n', 1)[0]
+        return json.dumps([relation_for(text)], ensure_ascii=False)
+    grouped = {doc_id: [relation_for(text)] for doc_id, text in documents if text not in drop}
+    return json.dumps(grouped, ensure_ascii=False)
+
+
+def test_pack_documents_respects_budget():
+    """每篇文档恰好属于一个分组，多文档分组的token总数不超过预算、文档数不超过上限，过长文档单独成组"""
+    rng = random.Random(11)
+    for _ in range(50):
+        counts = [rng.randint(1, 400) for _ in range(rng.randint(1, 60))]
+        budget, max_docs = rng.choice([(300, 8), (500, 3), (1000, 8)])
+        groups = pack_documents(counts, budget, max_docs)
+        assert sorted(i for group in groups for i in group) == list(range(len(counts)))
+        for group in groups:
+            if len(group) > 1:
+                assert sum(counts[i] for i in group) <= budget
+                assert len(group) <= max_docs
+                assert all(counts[i] <= budget // 2 for i in group)
+
+
+def test_extractor_packs_by_llm_pack_tokens():
+    """抽取器按 pack_tokens 对文档块的token数分组"""
+    documents = [(f"文档{i}" + '知识' * (i % 7 * 10), [{'text': '知识图谱'}]) for i in range(30)]
+    extractor = AsyncRelationExtractor(pack_tokens=300, pack_max_docs=8)
+    groups = extractor.pack(documents)
+    assert len(groups) < len(documents)
+    for group in groups:
+        tokens = [count_tokens(build_document_block('D0', *documents[i])) for i in group]
+        assert len(group) == 1 or sum(tokens) <= 300
+    assert AsyncRelationExtractor(pack_tokens=0).pack(documents) == [[i] for i in range(len(documents))]
+
+
+def test_packed_reply_is_split_back_to_documents(fake_openai):
+    """按文档编号分组的响应拆回对应的文档，与逐篇请求的结果相同"""
+    fake_openai.reply = packed_reply
+    documents = [(f"文档{i}", [{'text': '知识图谱'}]) for i in range(12)]
+    extractor = AsyncRelationExtractor(concurrency=4, rpm=None, tpm=None, pack_tokens=3000, pack_max_docs=4)
+    try:
+        relations = extractor.extract(documents)
+    finally:
+        extractor.close()
+    assert [[r['subject'] for r in document_relations] for document_relations in relations] == \
+        [[text] for text, _ in documents]
+    assert len(fake_openai.prompts) == 3
+    assert extractor.stats['packed_documents'] == 12
+
+
+def test_parse_packed_relations_marks_missing_documents():
+    """缺少的文档编号和无效的值标记为None，其余文档的关系不受影响；无法解析的响应返回None"""
+    reply = json.dumps({'D1': [relation_for('a')], 'd3': [], 'D2': 'none', 'X9': [relation_for('b')],
+                        'D7': [relation_for('c')]})
+    parsed = parse_packed_relations(reply, 4)
+    assert [r['subject'] for r in parsed[0]] == ['a']
+    assert parsed[1] is None
+    assert parsed[2] == []
+    assert parsed[3] is None
+    assert parse_packed_relations('模型没有返回JSON', 4) is None
+    assert parse_packed_relations('[]', 4) is None
+
+
+def test_missing_document_is_retried_alone(fake_openai):
+    """响应缺少某篇文档时只逐篇重新请求该文档，同一批的其他文档保留打包结果"""
+    fake_openai.reply = lambda prompt: packed_reply(prompt, drop={'文档2'})
+    documents = [(f"文档{i}", [{'text': '知识图谱'}]) for i in range(4)]
+    extractor = AsyncRelationExtractor(concurrency=4, rpm=None, tpm=None, pack_tokens=3000, pack_max_docs=4)
+    try:
+        relations = extractor.extract(documents)
+    finally:
+        extractor.close()
+    assert [[r['subject'] for r in document_relations] for document_relations in relations] == \
+        [[text] for text, _ in documents]
+    assert len(fake_openai.prompts) == 2
+    assert '文档编号' not in fake_openai.prompts[1] and '文档2' in fake_openai.prompts[1]
+
+
+def test_unparseable_packed_reply_falls_back_to_single_requests(fake_openai):
+    """整个打包响应无法解析时，该批文档逐篇重新请求"""
+    fake_openai.reply = lambda prompt: '无法解析' if '文档编号' in prompt else packed_reply(prompt)
+    documents = [(f"文档{i}", [{'text': '知识图谱'}]) for i in range(3)]
+    extractor = AsyncRelationExtractor(concurrency=4, rpm=None, tpm=None, pack_tokens=3000, pack_max_docs=4)
+    try:
+        relations = extractor.extract(documents)
+    finally:
+        extractor.close()
+    assert [[r['subject'] for r in document_relations] for document_relations in relations] == \
+        [[text] for text, _ in documents]
+    assert len(fake_openai.prompts) == 4
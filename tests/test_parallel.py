@@ -0,0 +1,67 @@
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from knowledge_graph.processor.cascade import SharedBudget
+from knowledge_graph.processor.llm import SharedRateLimiter
+
+_budget = None
+_limiter = None
+
+
+def _init(budget, limiter):
+    global _budget, _limiter
+    _budget, _limiter = budget, limiter
+
+
+def _take(count):
+    return _budget.take(count)
+
+
+def _try_acquire(tokens):
+    return _limiter.try_acquire(tokens) == 0
+
+
+def test_shared_budget_is_not_split_between_workers():
+    """预算小于进程数时，所有子进程合计仍能用满预算，且不会超出"""
+    budget = SharedBudget(3)
+    with ProcessPoolExecutor(max_workers=4, initializer=_init, initargs=(budget, None)) as executor:
+        granted = list(executor.map(_take, [1] * 10))
+    assert sum(granted) == 3
+    assert budget.remaining == 0
+
+
+def test_shared_rate_limiter_caps_requests_across_workers():
+    """RPM小于进程数时，全部子进程在一个窗口内合计获得的请求数不超过RPM"""
+    limiter = SharedRateLimiter(rpm=3, tpm=None, window=3600)
+    with ProcessPoolExecutor(max_workers=4, initializer=_init, initargs=(None, limiter)) as executor:
+        allowed = list(executor.map(_try_acquire, [0] * 12))
+    assert sum(allowed) == 3
+
+
+def test_shared_rate_limiter_caps_tokens_and_refills():
+    """TPM按token数限制，额度按窗口速度恢复"""
+    limiter = SharedRateLimiter(rpm=None, tpm=100, window=0.2)
+    assert limiter.try_acquire(60) == 0
+    wait = limiter.try_acquire(60)
+    assert 0 < wait <= 0.2
+    time.sleep(wait + 0.01)
+    assert limiter.try_acquire(60) == 0
+
+
+def test_parallel_cascade_uses_the_whole_budget(tmp_path, fake_openai):
+    """级联预算小于进程数时，多进程处理调用大模型的次数等于预算（而不是平分后取整为0）"""
+    from knowledge_graph.processor.processor import KnowledgeProcessor
+    from knowledge_graph.processor.parallel import ParallelProcessor
+
+    texts = ['知识图谱 本体论', '语义网 知识表示', 'SPARQL RDF', '实体识别 关系抽取', '知识融合 知识推理', '图数据库 链接数据']
+    input_dir, output_dir = tmp_path / 'input', tmp_path / 'output'
+    input_dir.mkdir()
+    with open(input_dir / 'docs.json', 'w', encoding='utf-8') as f:
+        json.dump([{'title': '', 'summary': '', 'content': text} for text in texts], f, ensure_ascii=False)
+
+    processor = KnowledgeProcessor(input_dir=str(input_dir), output_dir=str(output_dir), use_openai=True,
+                                   cascade=True, cascade_threshold=0.0, cascade_budget=2, llm_pack_tokens=0,
+                                   llm_cache=False, skip_near_duplicates=False, processes=4)
+    ParallelProcessor(processor, 4, chunksize=1).process_files(['docs.json'])
+    assert len(fake_openai.prompts) == 2
@@ -0,0 +1,40 @@
+import pytest
+
+from benchmarks.bench_parser import run_backend, synthetic_pages
+from knowledge_graph.crawler.extractors import get_backend
+
+# 含实体引用、嵌套标签、多余空白和缺失字段的页面
+EDGE_PAGES = [
+    ('https://baike.baidu.com/item/RDF',
+     '<html><body><h1> RDF&nbsp;资源描述框架 </h1><div class="lemma-summary">RDF&amp;OWL <b>是</b>'
+     '<i>语义网</i>的基础。</div><div class="main-content"><p>  第一段\n <a href="/item/三元组">三元组</a> </p>'
+     '<p></p><p>第二段<a href="https://example.com/x">外链</a></p></div></body></html>'),
+    ('https://zh.wikipedia.org/wiki/SPARQL',
+     '<html><body><h1 id="firstHeading">SPARQL</h1><div id="mw-content-text">'
+     '<p>SPARQL&#x662F;<a href="/wiki/RDF">RDF</a>查询语言<sup>[1]</sup>。</p>'
+     '<p><a href="/wiki/Special:Random">随机</a><a href="#cite">注释</a></p></div></body></html>'),
+    ('https://blog.csdn.net/u/article/details/1',
+     '<html><body><div id="article_content"><p>没有标题的文章</p></div></body></html>'),
+]
+
+
+@pytest.mark.parametrize('pages', [synthetic_pages(count=2), EDGE_PAGES], ids=['synthetic', 'edge'])
+def test_lxml_backend_matches_bs4(pages):
+    """lxml/XPath后端的抽取结果（字段与候选链接）与BeautifulSoup后端完全一致"""
+    _, expected = run_backend('bs4', pages, repeat=1)
+    _, actual = run_backend('lxml', pages, repeat=1)
+    assert actual == expected
+
+
+def test_csdn_search_links_match():
+    html = ('<html><body><div class="blog-list-box"><a class="blog-title" href="https://blog.csdn.net/a/1">A</a></div>'
+            '<div class="blog-list-box"><a class="blog-title">无链接</a></div>'
+            '<div class="blog-list-box other"><a class="blog-title x" href="https://blog.csdn.net/b/2">B</a></div>'
+            '</body></html>')
+    bs4, lxml = get_backend('bs4'), get_backend('lxml')
+    assert lxml.extract_csdn_search(lxml.parse(html)) == bs4.extract_csdn_search(bs4.parse(html))
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_backend('html5lib')
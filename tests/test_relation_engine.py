@@ -0,0 +1,50 @@
+import json
+import os
+import random
+
+from benchmarks.bench_relations import reference_extract, synthetic_documents
+from knowledge_graph.processor.relation_engine import RELATION_PATTERNS, RelationPatternEngine
+from knowledge_graph.utils.terms import KG_TERMS
+
+TERMS = ['知识图谱', '图谱', '知识', '实体识别', '实体', '关系抽取', '本体论', '语义网', '语义网络', 'RDF', 'SPARQL']
+CUES = [p['pattern'] for p in RELATION_PATTERNS]
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'knowledge_graph', 'data')
+
+
+def entities_of(terms):
+    return [{'text': term, 'label': 'KG_TERM', 'type': 'TERM'} for term in terms]
+
+
+def test_matches_reference_on_random_text():
+    """随机文本（包含互相嵌套的实体、重复出现的关系词、超过20字的间隔）与原有实现结果完全一致"""
+    rng = random.Random(18)
+    fillers = ['，', '的', '以及', '。', '！', '?', '在很多很多很多很多很多的场景下', ' ']
+    engine = RelationPatternEngine()
+    for _ in range(300):
+        pieces = [rng.choice(TERMS + CUES + fillers) for _ in range(rng.randint(0, 30))]
+        text = ''.join(pieces)
+        entities = entities_of(rng.sample(TERMS, rng.randint(0, len(TERMS))))
+        assert engine.extract(text, entities) == reference_extract(text, entities)
+
+
+def test_matches_reference_on_synthetic_documents():
+    engine = RelationPatternEngine()
+    entities = entities_of(TERMS + ['机器学习', '深度学习', '神经网络', '知识库', '三元组'])
+    for text in synthetic_documents(5):
+        assert engine.extract(text, entities) == reference_extract(text, entities)
+
+
+def test_matches_reference_on_bundled_data():
+    """仓库自带的抓取数据上（以文中出现的预定义术语为实体）与原有实现结果一致"""
+    engine = RelationPatternEngine()
+    checked = 0
+    for filename in ('wiki_kg_data.json', 'agent_kg_data.json'):
+        with open(os.path.join(DATA_DIR, filename), encoding='utf-8') as f:
+            items = json.load(f)
+        for item in items:
+            text = f"{item.get('title', '')}. {item.get('summary', '')} {item.get('content', '')}"
+            entities = entities_of([term for term in KG_TERMS if term in text])
+            expected = reference_extract(text, entities)
+            assert engine.extract(text, entities) == expected
+            checked += len(expected)
+    assert checked > 0
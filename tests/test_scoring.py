@@ -0,0 +1,31 @@
+from knowledge_graph.crawler.scoring import LinkScorer
+from knowledge_graph.utils.terms import KG_TERMS
+
+
+def test_empty_dictionary_falls_back_to_builtin_terms(tmp_path):
+    """词典文件为空时仍使用预定义术语，相关链接得分高于无关链接"""
+    dict_path = tmp_path / 'kg_dict.txt'
+    dict_path.write_text('', encoding='utf-8')
+    scorer = LinkScorer.from_dict_file(str(dict_path))
+
+    assert set(scorer.terms) == {t for t in KG_TERMS if len(t) > 1}
+    assert scorer.score('知识图谱', depth=1) > 0
+    assert scorer.score('知识图谱', depth=1) > scorer.score('今日天气', depth=1)
+
+
+def test_dictionary_terms_are_added(tmp_path):
+    """词典中的术语与预定义术语合并"""
+    dict_path = tmp_path / 'kg_dict.txt'
+    dict_path.write_text('图神经网络 10 n\n', encoding='utf-8')
+    scorer = LinkScorer.from_dict_file(str(dict_path))
+
+    assert '图神经网络' in scorer.terms
+    assert '知识图谱' in scorer.terms
+    assert scorer.score('图神经网络') > scorer.score('图神经')
+
+
+def test_relevance_order_prefers_matching_anchors():
+    """锚文本与术语匹配越多、链接越浅，得分越高"""
+    scorer = LinkScorer(['知识图谱', '本体论'])
+    assert scorer.score('关于知识图谱与本体论') > scorer.score('关于知识图谱') > scorer.score('其他')
+    assert scorer.score('知识图谱', depth=0) > scorer.score('知识图谱', depth=2)
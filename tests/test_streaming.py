@@ -0,0 +1,162 @@
+import json
+import os
+
+import pytest
+
+from knowledge_graph.processor.relation_engine import cooccurring_pairs
+from knowledge_graph.processor.streaming import ProcessedDataSink, StreamingPipeline
+from knowledge_graph.utils.jsonl import JsonArraySink, iter_json_array
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'knowledge_graph', 'data')
+OUTPUT_FILES = ('entities.json', 'relations.json', 'entities.csv', 'relations.csv')
+RECORDS = [{'text': '知识图谱', 'n': 1.5, 'nested': {'a': [1, 2, {'b': None}]}}, [], {}, 'x"y\\z', 0, True,
+           {'text': '换行\n与制表\t', 'list': ['}', ']', ',']}]
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_json_array_sink_matches_json_dump(tmp_path):
+    """逐条写入的JSON数组与 json.dump(列表, ensure_ascii=False, indent=2) 逐字节相同"""
+    for records in (RECORDS, []):
+        with JsonArraySink(str(tmp_path / 'stream.json')) as sink:
+            for record in records:
+                sink.write(record)
+        with open(tmp_path / 'dump.json', 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False, indent=2)
+        assert read_bytes(tmp_path / 'stream.json') == read_bytes(tmp_path / 'dump.json')
+
+
+def test_iter_json_array_matches_json_load(tmp_path):
+    """任意缓冲区大小下逐个读取的元素与 json.load 的结果相同"""
+    path = tmp_path / 'data.json'
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(RECORDS * 20, f, ensure_ascii=False, indent=1)
+    for chunk_size in (1, 2, 7, 64, 1 << 16):
+        assert list(iter_json_array(str(path), chunk_size=chunk_size)) == RECORDS * 20
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_streaming_output_matches_batch_output(tmp_path, processes):
+    """流式处理的输出文件与批量处理（merge_and_deduplicate + save_processed_data）逐字节相同"""
+    from knowledge_graph.processor.processor import KnowledgeProcessor
+
+    files = ['wiki_kg_data.json', 'agent_kg_data.json']
+    batch_dir, stream_dir = tmp_path / 'batch', tmp_path / 'stream'
+    batch = KnowledgeProcessor(input_dir=DATA_DIR, output_dir=str(batch_dir), use_openai=False)
+    results = [batch.process_file(filename) for filename in files]
+    batch.save_processed_data(*batch.merge_and_deduplicate([e for e, _ in results], [r for _, r in results]))
+
+    streaming = KnowledgeProcessor(input_dir=DATA_DIR, output_dir=str(stream_dir), use_openai=False,
+                                   processes=processes)
+    StreamingPipeline(streaming, window=3).run(files)
+
+    for name in OUTPUT_FILES:
+        assert read_bytes(stream_dir / name) == read_bytes(batch_dir / name), name
+
+
+def test_failed_run_keeps_previous_output(tmp_path):
+    """中途失败时删除临时文件，保留上次的输出"""
+    (tmp_path / 'entities.json').write_text('["old"]', encoding='utf-8')
+    sink = ProcessedDataSink(str(tmp_path))
+    sink.write([{'text': '新实体', 'label': 'KG_TERM', 'type': 'TERM'}], [])
+    sink.close(commit=False)
+    assert (tmp_path / 'entities.json').read_text(encoding='utf-8') == '["old"]'
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+def test_parallel_cascade_reads_the_previous_graph(tmp_path, fake_openai):
+    """流式 + 多进程时，子进程的级联选择器读取的是上次运行的图谱，而不是被清空的输出文件
+
+    上次的图谱已包含文档中全部共现实体对，新颖度为0，得分低于阈值，不应调用大模型。
+    """
+    from knowledge_graph.processor.processor import KnowledgeProcessor
+
+    texts = ['知识图谱 本体论 语义网 知识表示', 'SPARQL RDF 知识图谱 语义网', '实体识别 关系抽取 知识融合']
+    input_dir, output_dir = tmp_path / 'input', tmp_path / 'output'
+    input_dir.mkdir()
+    with open(input_dir / 'docs.json', 'w', encoding='utf-8') as f:
+        json.dump([{'title': '', 'summary': '', 'content': text} for text in texts], f, ensure_ascii=False)
+
+    # 以文档中全部共现实体对作为上次运行的图谱
+    probe = KnowledgeProcessor(input_dir=str(input_dir), output_dir=str(output_dir), use_openai=False)
+    documents = list(probe.iter_texts('docs.json'))
+    entities, relations = [], []
+    for text, doc_entities in zip(documents, probe.extract_entities_batch(documents)):
+        entities.extend(doc_entities)
+        pairs = cooccurring_pairs(text, [e['text'] for e in doc_entities])
+        relations.extend({'subject': a, 'predicate': 'related_to', 'object': b} for a, b in pairs)
+    assert relations
+    probe.save_processed_data(entities, relations)
+
+    processor = KnowledgeProcessor(input_dir=str(input_dir), output_dir=str(output_dir), use_openai=True,
+                                   cascade=True, cascade_threshold=0.71, processes=2, skip_near_duplicates=False)
+    StreamingPipeline(processor, window=1).run(['docs.json'])
+    assert fake_openai.prompts == []
+
+
+class CountingProcessor:
+    """记录读取和处理进度的最小处理器，用于检查同时驻留内存的文档数"""
+
+    processes = 1
+
+    def __init__(self, output_dir, documents):
+        self.output_dir = output_dir
+        self.documents = documents
+        self.read = 0
+        self.done = 0
+        self.max_in_flight = 0
+
+    def iter_texts(self, filename, stream=False):
+        for i in range(self.documents):
+            self.read += 1
+            self.max_in_flight = max(self.max_in_flight, self.read - self.done)
+            yield f'文档{i}'
+
+    def process_texts(self, texts):
+        for text in texts:
+            self.done += 1
+            # 实体只有10种，关系只有5种：去重状态应只随唯一键数增长
+            n = int(text[2:])
+            yield ([{'text': f'实体{n % 10}', 'label': 'KG_TERM', 'type': 'TERM'}],
+                   [{'subject': f'实体{n % 10}', 'predicate': 'related_to', 'object': f'实体{n % 5}'}])
+
+
+def test_memory_is_bounded_by_window_and_unique_keys(tmp_path, monkeypatch):
+    """驻留内存的文档不超过一个窗口，去重状态的大小等于唯一键数而不是文档数"""
+    sinks = []
+    original_init = ProcessedDataSink.__init__
+
+    def record_sink(self, output_dir):
+        original_init(self, output_dir)
+        sinks.append(self)
+
+    monkeypatch.setattr(ProcessedDataSink, '__init__', record_sink)
+    processor = CountingProcessor(str(tmp_path), documents=1000)
+    assert StreamingPipeline(processor, window=8).run(['docs.json']) == (10, 10)
+    assert processor.done == 1000
+    assert processor.max_in_flight <= 8
+    assert len(sinks[0].entity_seen) == 10
+    assert len(sinks[0].relation_seen) == 10
+
+
+def test_iter_json_array_large_element_is_decoded_in_linear_time(tmp_path, monkeypatch):
+    """跨越多个缓冲区的大元素，重复解析的字符总数与元素大小成正比"""
+    path = tmp_path / 'large.json'
+    element = {'content': '知识图谱' * 50000, 'tags': list(range(2000))}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([element, 1.5, element], f, ensure_ascii=False)
+    size = os.path.getsize(path)
+
+    decoded = []
+    raw_decode = json.JSONDecoder.raw_decode
+
+    def counting_raw_decode(self, s, idx=0):
+        decoded.append(len(s) - idx)
+        return raw_decode(self, s, idx)
+
+    monkeypatch.setattr(json.JSONDecoder, 'raw_decode', counting_raw_decode)
+    assert list(iter_json_array(str(path), chunk_size=64)) == [element, 1.5, element]
+    assert sum(decoded) < 8 * size
@@ -0,0 +1,68 @@
+import json
+import threading
+
+from knowledge_graph.crawler.telemetry import CrawlTelemetry, Histogram, LATENCY_BUCKETS
+
+
+def test_histogram_matches_raw_observations():
+    """分桶计数、总和、极值与原始观测值一致，分位数为所在分桶的上界"""
+    values = [0.01, 0.07, 0.2, 0.2, 0.4, 0.9, 3.0, 12.0, 45.0]
+    hist = Histogram(LATENCY_BUCKETS)
+    for value in values:
+        hist.observe(value)
+
+    assert hist.count == len(values)
+    assert abs(hist.sum - sum(values)) < 1e-9
+    assert (hist.min, hist.max) == (min(values), max(values))
+    assert sum(hist.counts) == len(values)
+    for i, count in enumerate(hist.counts[:-1]):
+        lower = LATENCY_BUCKETS[i - 1] if i else float('-inf')
+        assert count == sum(1 for v in values if lower < v <= LATENCY_BUCKETS[i])
+    assert hist.quantile(0.5) == 0.5
+    assert hist.quantile(1.0) == 45.0
+
+
+def test_status_counts_per_host_and_function():
+    """状态码按主机和抓取方法计数，连接失败记为error"""
+    telemetry = CrawlTelemetry()
+    telemetry.set_function('crawl_wikipedia')
+    telemetry.observe_request('https://zh.wikipedia.org/wiki/A', 0.1, 100, 200)
+    telemetry.observe_request('https://zh.wikipedia.org/wiki/B', 0.2, 0, 404)
+    telemetry.observe_request('https://zh.wikipedia.org/wiki/C', 0.3, status=None)
+
+    status = telemetry.snapshot()['hosts']['zh.wikipedia.org']['crawl_wikipedia']['status']
+    assert status == {'200': 1, '404': 1, 'error': 1}
+    assert 'crawler_responses_total{host="zh.wikipedia.org",function="crawl_wikipedia",status="404"} 1' \
+        in telemetry.to_prometheus()
+
+
+def test_concurrent_observations_are_not_lost():
+    """多线程同时记录时计数不丢失"""
+    telemetry = CrawlTelemetry()
+
+    def work():
+        for _ in range(500):
+            telemetry.observe_request('https://example.com/', 0.05, 10, 200)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert telemetry.latency[('example.com', 'other')].count == 4000
+    assert telemetry.statuses[('example.com', 'other', '200')] == 4000
+
+
+def test_export_writes_json_and_prometheus(tmp_path):
+    telemetry = CrawlTelemetry()
+    telemetry.observe_phase('https://example.com/', 'fetch', 0.3)
+    telemetry.observe_queue('baidu', 5)
+    json_path, prom_path = telemetry.export(str(tmp_path))
+
+    with open(json_path, encoding='utf-8') as f:
+        assert json.load(f)['queue_depth']['baidu'][0][1] == 5
+    with open(prom_path, encoding='utf-8') as f:
+        text = f.read()
+    assert 'crawler_phase_seconds_bucket{host="example.com",function="other",phase="fetch",le="0.5"} 1' in text
+    assert 'crawler_queue_depth{queue="baidu"} 5' in text
@@ -0,0 +1,46 @@
+import random
+
+from knowledge_graph.utils.term_matcher import TermMatcher
+from knowledge_graph.utils.terms import KG_TERMS
+
+ALPHABET = 'abcde知识图谱'
+
+
+def naive_occurrences(terms, text):
+    """逐个术语用 str.find 查找全部（可重叠的）出现"""
+    found = set()
+    for term in terms:
+        start = text.find(term)
+        while start >= 0:
+            found.add((start, start + len(term), term))
+            start = text.find(term, start + 1)
+    return found
+
+
+def test_matches_naive_search_on_random_terms():
+    """全部出现位置（含重叠、互为前后缀的术语）与逐词查找一致"""
+    rng = random.Random(17)
+    for _ in range(200):
+        terms = list(dict.fromkeys(''.join(rng.choice(ALPHABET) for _ in range(rng.randint(1, 4)))
+                                   for _ in range(rng.randint(1, 15))))
+        text = ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 60)))
+        matcher = TermMatcher(terms)
+
+        assert set(matcher.find_all(text)) == naive_occurrences(terms, text)
+        assert matcher.matched_terms(text) == [term for term in terms if term in text]
+
+
+def test_matched_terms_keeps_the_old_entity_order():
+    """与原先 `for term in kg_terms: if term in text` 得到的术语和顺序相同"""
+    text = "知识图谱（Knowledge Graph）以RDF三元组表示，可用SPARQL查询，本体论和语义网是其基础。"
+    matcher = TermMatcher(KG_TERMS)
+    assert matcher.matched_terms(text) == [term for term in KG_TERMS if term in text]
+
+
+def test_incremental_add_rebuilds():
+    matcher = TermMatcher(['图谱'])
+    assert matcher.matched_terms('知识图谱') == ['图谱']
+    matcher.add('知识')
+    matcher.build()
+    assert matcher.matched_terms('知识图谱') == ['图谱', '知识']
+    assert len(matcher) == 2
@@ -0,0 +1,50 @@
+from knowledge_graph.crawler.throttle import AdaptiveRateLimiter
+
+URL = 'https://example.com/page'
+
+
+def limiter():
+    throttle = AdaptiveRateLimiter(default_interval=1.0, min_rate=0.01, max_rate=2.0, increase=0.1, decrease=0.5)
+    # 令牌桶初始有一个令牌，不会休眠
+    throttle.wait(URL)
+    return throttle
+
+
+def rate(throttle):
+    return throttle.snapshot()['example.com']['rate']
+
+
+def test_isolated_failure_does_not_slow_down():
+    """错误率不超过阈值时，偶发的连接错误或5xx不减速"""
+    throttle = limiter()
+    throttle.record(URL, latency=0.1, status=200)
+    before = rate(throttle)
+    throttle.record(URL, latency=0.1, status=None)
+    assert rate(throttle) == before
+    throttle.record(URL, latency=0.1, status=500)
+    assert rate(throttle) < before
+
+
+def test_high_error_rate_stops_increase_until_it_recovers():
+    """错误率超过阈值时成功请求不加速，错误率回落到阈值以下后恢复线性加速"""
+    throttle = limiter()
+    for _ in range(3):
+        throttle.record(URL, latency=0.1, status=502)
+    low = rate(throttle)
+    throttle.record(URL, latency=0.1, status=200)
+    assert rate(throttle) == low
+    # 错误率逐步回落，回落到阈值以下的那次成功请求才开始加速
+    while throttle.snapshot()['example.com']['error_rate'] > throttle.error_threshold:
+        assert rate(throttle) == low
+        throttle.record(URL, latency=0.1, status=200)
+    assert rate(throttle) == round(low + 0.1, 3)
+
+
+def test_throttle_status_always_slows_down():
+    """429/503（以及重试中遇到的限流）无论错误率高低都乘性减速"""
+    throttle = limiter()
+    before = rate(throttle)
+    throttle.record(URL, latency=0.1, status=429)
+    assert rate(throttle) == before * 0.5
+    throttle.record(URL, latency=0.1, status=200, throttled=True)
+    assert rate(throttle) == before * 0.25